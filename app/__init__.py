@@ -1,11 +1,14 @@
 from flask import Flask
 from config import Config
 from app.utils.logger import setup_logger
+from app.utils.compression import init_compression
+from app.utils.json_encoding import OrjsonProvider
 
 
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = OrjsonProvider(app)
 
     # Setup logging
     logger = setup_logger(app)
@@ -15,5 +18,12 @@ def create_app(config_class=Config):
     from app.routes import main as main_blueprint
 
     app.register_blueprint(main_blueprint)
+    init_compression(app)
+
+    if app.config.get("PRELOAD_MODELS"):
+        from app.services.model_registry import preload_models
+
+        with app.app_context():
+            preload_models()
 
     return app
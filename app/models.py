@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+from typing import Any, Dict, Optional
+
+
+class Influencer(BaseModel):
+    username: str
+    profile_image: Optional[str] = None
+    follower_count: Optional[int] = None
+
+
+class Score(BaseModel):
+    username: str
+    trust_score: int
+    total_claims: int
+    verified: int = 0
+    questionable: int = 0
+    debunked: int = 0
+    updated_at: float
+
+
+class Report(BaseModel):
+    username: str
+    report: Dict[str, Any]
+    etag: str
+    updated_at: float
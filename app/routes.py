@@ -1,22 +1,96 @@
-from flask import Blueprint, jsonify, current_app
-from app.services.twitter_service import TwitterService
-from app.services.claim_extraction_service import ClaimExtractionService
+import hashlib
+import time
+from flask import (
+    Blueprint,
+    Response,
+    jsonify,
+    current_app,
+    request,
+    stream_with_context,
+)
 from app.services.claim_verification_service import ClaimVerificationService
-from app.services.data_processing_service import DataProcessingService
+from app.services.analysis_service import (
+    AnalysisInProgressError,
+    InfluencerAnalysisService,
+    refresh_in_background,
+    report_has_details,
+)
+from app.services.storage_service import get_storage
+from app.services.claim_index import get_claim_index
+from app.services.leaderboard import get_leaderboard
+from app.services.streaming_pipeline import StreamingAnalysisPipeline
+from app.utils.json_encoding import dumps
+from app.utils.resilience import upstream_stats
+from app.services.embedding_service import batcher_metrics
+from app.services.model_cascade import cascade_stats
+from app.utils.response_shaping import shape_report
 
 main = Blueprint("main", __name__)
 
 
+def shaping_args():
+    """Reads the report shaping options from the query string."""
+    page = request.args.get("page", type=int)
+    per_page = request.args.get("per_page", 50, type=int)
+    articles = request.args.get(
+        "articles",
+        (
+            "normalized"
+            if current_app.config.get("NORMALIZE_ARTICLES", True)
+            else "inline"
+        ),
+    )
+    return {
+        "fields": request.args.get("fields"),
+        "page": max(page, 1) if page is not None else None,
+        "per_page": min(max(per_page, 1), 500),
+        "normalize": articles == "normalized",
+    }
+
+
+def report_response(record, stale=False):
+    """Builds a conditional, shaped JSON response for a stored report."""
+    shaping = shaping_args()
+    response = jsonify(shape_report(record.report, **shaping))
+    # Each shape of the report is its own representation
+    variant = hashlib.sha256(repr(sorted(shaping.items())).encode()).hexdigest()[:8]
+    response.set_etag(f"{record.etag}-{variant}")
+    response.last_modified = record.updated_at
+    response.cache_control.no_cache = True  # Clients must revalidate with the ETag
+    response.headers["X-Report-Age"] = str(int(time.time() - record.updated_at))
+    if stale:
+        response.headers["X-Report-Stale"] = "true"
+    return response.make_conditional(request)
+
+
 @main.route("/api/influencer/<username>")
 def influencer_detail(username):
     try:
         with current_app.app_context():
-            # Get tweets and user info
-            twitter_service = TwitterService()
-            user_info = twitter_service.get_user_info(username)
-            tweets = twitter_service.get_tweets(username, 20)
+            storage = get_storage()
+            refresh = request.args.get("refresh", "false").lower() == "true"
+            details = request.args.get("details", "false").lower() == "true"
 
-            if tweets is None:
+            # Serve the stored report, refreshing it in the background when stale.
+            # A report with explanations serves both variants; one without them
+            # is recomputed for ?details=true and replaced by the fuller report.
+            record = None if refresh else storage.get_report(username)
+            if record is not None and details and not report_has_details(record.report):
+                record = None
+            if record is not None:
+                max_age = current_app.config.get("REPORT_MAX_AGE", 3600)
+                stale = time.time() - record.updated_at > max_age
+                if stale:
+                    refresh_in_background(
+                        current_app._get_current_object(),
+                        username,
+                        report_has_details(record.report),
+                    )
+                return report_response(record, stale)
+
+            record = InfluencerAnalysisService().analyze_coalesced(username, details)
+
+            if record is None:
                 return (
                     jsonify(
                         {
@@ -26,45 +100,137 @@ def influencer_detail(username):
                     429,
                 )
 
-            # Extract and process claims
-            claim_extraction_service = ClaimExtractionService()
-            health_claims = claim_extraction_service.extract_health_claims(tweets)
+            return report_response(record)
 
-            if health_claims:
-                data_processing_service = DataProcessingService()
-                unique_claims = data_processing_service.remove_duplicate_claims(
-                    health_claims
-                )
+    except AnalysisInProgressError as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = "5"
+        return response, 503
+    except Exception as e:
+        current_app.logger.error(f"Error in influencer_detail: {str(e)}")
+        return jsonify({"error": str(e)}), 500
 
-                claim_verification_service = ClaimVerificationService()
-                verification_results = {}
-                for claim in unique_claims:
-                    verification_results[claim] = (
-                        claim_verification_service.verify_claim(claim)
-                    )
 
-            # Calculate trust score
-            trust_score, total_claims = (
-                claim_verification_service.calculate_trust_score(verification_results)
-            )
+@main.route("/api/influencer/<username>/stream")
+def influencer_stream(username):
+    """
+    Streams the analysis of an influencer's whole timeline as newline-delimited
+    JSON events, persisting results as they are produced.
+    """
+    details = request.args.get("details", "false").lower() == "true"
+    pipeline = StreamingAnalysisPipeline()
 
-            return jsonify(
-                {
-                    "username": username,
-                    "profile_image": (
-                        user_info.get("profile_image") if user_info else None
-                    ),
-                    "follower_count": (
-                        user_info.get("follower_count") if user_info else None
-                    ),
-                    "tweets": tweets,
-                    "health_claims": health_claims,
-                    "verification_results": verification_results,
-                    "trust_score": trust_score,
-                    "total_claims": total_claims,
-                }
+    def generate():
+        found = False
+        try:
+            for event in pipeline.run(username, details):
+                found = True
+                yield dumps(event) + "\n"
+            if not found:
+                yield dumps(
+                    {"type": "error", "error": "Unable to fetch tweets."}
+                ) + "\n"
+        except Exception as e:
+            current_app.logger.error(f"Error in influencer_stream: {str(e)}")
+            yield dumps({"type": "error", "error": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
+@main.route("/api/claim/details")
+def claim_details():
+    """
+    Returns the full verification of a single claim, including the explanation.
+
+    With ?username= the influencer's stored verification is reused: its status
+    and articles are kept and only the missing explanation is generated, so it
+    cannot disagree with the report the client already has.
+    """
+    claim = request.args.get("claim", "").strip()
+    if not claim:
+        return jsonify({"error": "Missing 'claim' query parameter"}), 400
+    username = request.args.get("username", "").strip()
+
+    try:
+        storage = get_storage()
+        stored = storage.get_verifications(username).get(claim) if username else None
+        if stored is not None and stored.get("fallback"):
+            # A failed verification has no status worth explaining; redo it
+            stored = None
+        if stored is not None and stored.get("explanation"):
+            return jsonify({"claim": claim, "verification_result": stored})
+
+        claim_verification_service = ClaimVerificationService()
+        if stored is None:
+            result = claim_verification_service.verify_claim(claim)
+        else:
+            result = claim_verification_service.verify_claim(
+                claim,
+                pubmed_results=stored.get("pubmed_results") or [],
+                verification_status=stored["verification_status"],
+            )
+            result.update(
+                {"confidence": stored.get("confidence"), "details_available": True}
             )
+            storage.append_verifications(username, {claim: result})
+        return jsonify({"claim": claim, "verification_result": result})
 
     except Exception as e:
-        current_app.logger.error(f"Error in influencer_detail: {str(e)}")
+        current_app.logger.error(f"Error in claim_details: {str(e)}")
         return jsonify({"error": str(e)}), 500
+
+
+@main.route("/api/claims/canonical")
+def canonical_claims():
+    """Returns the most widely repeated canonical claims across influencers."""
+    claim_index = get_claim_index()
+    if claim_index is None:
+        return jsonify({"error": "The claim index is disabled"}), 404
+
+    limit = min(max(request.args.get("limit", 50, type=int), 1), 500)
+    return jsonify(
+        {"total": len(claim_index), "clusters": claim_index.top_clusters(limit)}
+    )
+
+
+@main.route("/api/claims/canonical/<int:canonical_id>")
+def canonical_claim_detail(canonical_id):
+    """Returns the statistics and member claims of one canonical claim."""
+    claim_index = get_claim_index()
+    if claim_index is None:
+        return jsonify({"error": "The claim index is disabled"}), 404
+
+    stats = claim_index.cluster_stats(canonical_id)
+    if stats is None:
+        return jsonify({"error": "Unknown canonical claim"}), 404
+    return jsonify({**stats, "members": claim_index.members(canonical_id)})
+
+
+@main.route("/api/leaderboard")
+def leaderboard():
+    """Returns the influencers ranked by trust score, filtered and paged."""
+    try:
+        ranking = get_leaderboard().rank(
+            weighting=request.args.get("weighting", "default"),
+            sort=request.args.get("sort", "trust_score"),
+            min_claims=request.args.get("min_claims", 0, type=int),
+            min_score=request.args.get("min_score", type=float),
+            max_score=request.args.get("max_score", type=float),
+            offset=max(request.args.get("offset", 0, type=int), 0),
+            limit=min(max(request.args.get("limit", 50, type=int), 1), 500),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(ranking)
+
+
+@main.route("/api/metrics")
+def metrics():
+    """Returns runtime performance metrics."""
+    return jsonify(
+        {
+            "embedding_batchers": batcher_metrics(),
+            "model_cascades": cascade_stats(),
+            "upstreams": upstream_stats(),
+        }
+    )
@@ -0,0 +1,352 @@
+import threading
+import time
+from flask import current_app
+from app.services.twitter_service import TwitterService
+from app.services.claim_extraction_service import ClaimExtractionService
+from app.services.claim_verification_service import ClaimVerificationService
+from app.services.data_processing_service import DataProcessingService
+from app.models import Score
+from app.services.storage_service import count_statuses, get_storage
+from app.services.leaderboard import record_score
+from app.services.claim_index import get_claim_index
+from app.utils.single_flight import LeaseStore, SingleFlight
+
+# Coalesces concurrent analyses of the same influencer within this process
+_flights = SingleFlight()
+
+_lease_stores = {}
+_lease_stores_lock = threading.Lock()
+
+
+def get_lease_store():
+    """
+    Returns the shared cross-process LeaseStore, or None if leases are disabled.
+    """
+    path = current_app.config.get("ANALYSIS_LEASE_PATH")
+    if not path:
+        return None
+    with _lease_stores_lock:
+        store = _lease_stores.get(path)
+        if store is None:
+            store = LeaseStore(path)
+            _lease_stores[path] = store
+    return store
+
+
+class AnalysisInProgressError(Exception):
+    """
+    Raised when another worker's analysis of the same influencer did not
+    finish within ANALYSIS_LEASE_WAIT_TIMEOUT.
+    """
+
+
+class InfluencerAnalysisService:
+    def analyze(self, username: str, details: bool = False) -> dict | None:
+        """
+        Runs the full analysis of an influencer's recent tweets.
+
+        Args:
+            username: The Twitter handle of the influencer (without the @).
+            details: Whether two-phase verification should always generate explanations.
+
+        Returns:
+            The influencer report as a dictionary.
+            Returns None if the tweets could not be fetched.
+        """
+        # Get tweets and user info
+        twitter_service = TwitterService()
+        user_info = twitter_service.get_user_info(username)
+        tweets = twitter_service.get_tweets(username, 20)
+
+        if tweets is None:
+            return None
+
+        # Extract and process claims
+        claim_extraction_service = ClaimExtractionService()
+        health_claims = claim_extraction_service.extract_health_claims(tweets)
+
+        claim_verification_service = ClaimVerificationService()
+        verification_results = {}
+        canonical_claims = None
+        claim_index = get_claim_index()
+        if health_claims and claim_index is not None:
+            verification_results, canonical_claims = self.verify_canonical_claims(
+                claim_index,
+                claim_verification_service,
+                username,
+                health_claims,
+                details,
+            )
+        elif health_claims:
+            data_processing_service = DataProcessingService()
+            unique_claims = data_processing_service.remove_duplicate_claims(
+                health_claims
+            )
+            verification_results = self.verify_claims(
+                claim_verification_service, unique_claims, details
+            )
+
+        # Calculate trust score
+        trust_score, total_claims = claim_verification_service.calculate_trust_score(
+            verification_results
+        )
+
+        report = {
+            "username": username,
+            "profile_image": (user_info.get("profile_image") if user_info else None),
+            "follower_count": (user_info.get("follower_count") if user_info else None),
+            "tweets": tweets,
+            "health_claims": health_claims,
+            "verification_results": verification_results,
+            "trust_score": trust_score,
+            "total_claims": total_claims,
+        }
+        if canonical_claims is not None:
+            report["canonical_claims"] = canonical_claims
+        return report
+
+    def verify_canonical_claims(
+        self, claim_index, claim_verification_service, username, claims, details=False
+    ):
+        """
+        Verifies claims once per canonical claim, reusing recent verifications
+        of the same canonical claim from any influencer.
+
+        The first claim of each canonical claim stands for it in the report.
+
+        Args:
+            claim_index: The ClaimIndex to assign canonical claim ids with.
+            claim_verification_service: The ClaimVerificationService to use.
+            username: The Twitter handle of the influencer.
+            claims: A list of health claim strings, possibly with duplicates.
+            details: Whether two-phase verification should always generate explanations.
+
+        Returns:
+            A (verification_results, canonical_claims) tuple, where
+            canonical_claims maps every claim to its canonical claim id.
+        """
+        canonical_ids = claim_index.assign(claims, username)
+        representatives = {}
+        for claim, canonical_id in zip(claims, canonical_ids):
+            representatives.setdefault(canonical_id, claim)
+
+        cached = claim_index.get_verifications(
+            list(representatives),
+            max_age=current_app.config.get("CLAIM_VERIFICATION_MAX_AGE", 604800),
+        )
+        if details:
+            # Two-phase results may have been stored without an explanation
+            cached = {
+                canonical_id: result
+                for canonical_id, result in cached.items()
+                if result.get("details_available", True)
+            }
+        current_app.logger.info(
+            f"{len(claims)} claims map to {len(representatives)} canonical claims, "
+            f"{len(cached)} already verified"
+        )
+
+        pending = [
+            claim
+            for canonical_id, claim in representatives.items()
+            if canonical_id not in cached
+        ]
+        fresh = (
+            self.verify_claims(claim_verification_service, pending, details)
+            if pending
+            else {}
+        )
+
+        verification_results = {}
+        for canonical_id, claim in representatives.items():
+            if canonical_id in cached:
+                verification_results[claim] = cached[canonical_id]
+            elif claim in fresh:
+                verification_results[claim] = fresh[claim]
+                # Fallbacks, e.g. claims whose articles could not be searched,
+                # must not stand in for a verdict elsewhere
+                if not fresh[claim].get("fallback"):
+                    claim_index.record_verification(canonical_id, fresh[claim])
+
+        return verification_results, dict(zip(claims, canonical_ids))
+
+    def verify_claims(self, claim_verification_service, claims, details=False):
+        """
+        Verifies claims using the verification mode selected in the app config.
+
+        Args:
+            claim_verification_service: The ClaimVerificationService to use.
+            claims: A list of unique health claim strings.
+            details: Whether two-phase verification should always generate explanations.
+
+        Returns:
+            A dictionary mapping each claim to its verification result.
+        """
+        batch_search = current_app.config.get("PUBMED_BATCH_SEARCH", True)
+
+        if current_app.config.get("BATCH_VERIFICATION"):
+            # Clusters share the articles of their leading claim, so only the
+            # leading claims are looked up
+            return claim_verification_service.verify_claims_batch(
+                claims,
+                max_cluster_size=current_app.config.get("VERIFICATION_BATCH_SIZE", 5),
+                batch_search=batch_search,
+            )
+
+        # Look up the evidence for every claim with a few batched round trips
+        pubmed_results_by_claim = {}
+        if batch_search:
+            pubmed_results_by_claim = claim_verification_service.search_pubmed_many(
+                claims
+            )
+
+        verification_results = {}
+        if current_app.config.get("TWO_PHASE_VERIFICATION"):
+            for claim in claims:
+                verification_results[claim] = (
+                    claim_verification_service.verify_claim_status(
+                        claim,
+                        details=details,
+                        confidence_threshold=current_app.config.get(
+                            "STATUS_CONFIDENCE_THRESHOLD", 0.8
+                        ),
+                        pubmed_results=pubmed_results_by_claim.get(claim),
+                    )
+                )
+        else:
+            for claim in claims:
+                verification_results[claim] = claim_verification_service.verify_claim(
+                    claim, pubmed_results=pubmed_results_by_claim.get(claim)
+                )
+        return verification_results
+
+    def analyze_and_store(self, username: str, details: bool = False):
+        """
+        Analyzes an influencer and persists the report.
+
+        Returns:
+            The stored Report, or None if the tweets could not be fetched.
+        """
+        report = self.analyze(username, details)
+        if report is None:
+            return None
+        record = get_storage().save_report(username, report)
+        record_score(
+            Score(
+                username=username,
+                trust_score=report.get("trust_score", 0),
+                total_claims=report.get("total_claims", 0),
+                updated_at=record.updated_at,
+                **count_statuses(report.get("verification_results") or {}),
+            )
+        )
+        return record
+
+    def analyze_coalesced(self, username: str, details: bool = False):
+        """
+        Analyzes and stores an influencer, sharing the work with concurrent
+        requests for the same influencer and parameters.
+
+        Duplicate requests in this process wait for the in-flight analysis.
+        When ANALYSIS_LEASE_PATH is set, requests in other worker processes
+        wait for the lease holder and then read its stored report.
+
+        Returns:
+            The stored Report, or None if the tweets could not be fetched.
+        """
+        key = f"{username}|details={details}"
+        record, shared = _flights.do(
+            key, lambda: self.analyze_with_lease(key, username, details)
+        )
+        if shared:
+            current_app.logger.info(f"Joined in-flight analysis of {username}")
+        return record
+
+    def analyze_with_lease(self, key: str, username: str, details: bool = False):
+        """
+        Analyzes and stores an influencer unless another process already is,
+        in which case its stored report is returned once it finishes.
+        """
+        leases = get_lease_store()
+        if leases is None:
+            return self.analyze_and_store(username, details)
+
+        ttl = current_app.config.get("ANALYSIS_LEASE_TTL", 600)
+        poll_interval = current_app.config.get("ANALYSIS_LEASE_POLL_INTERVAL", 0.5)
+        wait_timeout = current_app.config.get("ANALYSIS_LEASE_WAIT_TIMEOUT", 25)
+        started = time.time()
+        deadline = time.monotonic() + wait_timeout
+
+        # One wait for another process, then compute here if it produced nothing
+        for _ in range(2):
+            if leases.acquire(key, ttl):
+                try:
+                    return self.analyze_and_store(username, details)
+                finally:
+                    leases.release(key)
+
+            current_app.logger.info(
+                f"Waiting for another worker's analysis of {username}"
+            )
+            while leases.is_held(key):
+                if time.monotonic() >= deadline:
+                    raise AnalysisInProgressError(
+                        f"Another worker is still analyzing {username}"
+                    )
+                time.sleep(poll_interval)
+
+            record = get_storage().get_report(username)
+            if record is not None and record.updated_at >= started:
+                return record
+
+        return self.analyze_and_store(username, details)
+
+
+def report_has_details(report: dict) -> bool:
+    """
+    Returns True if every verification in a report has its explanation, i.e.
+    the report can also be served to ?details=true requests.
+    """
+    return all(
+        result.get("details_available", True)
+        for result in (report.get("verification_results") or {}).values()
+    )
+
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def refresh_in_background(app, username: str, details: bool = False) -> bool:
+    """
+    Re-analyzes an influencer on a background thread and stores the new report.
+
+    At most one refresh per influencer runs at a time in this process.
+
+    Args:
+        app: The Flask application to run the refresh in.
+        username: The Twitter handle of the influencer.
+        details: Whether to generate all explanations, e.g. to keep a report
+            that had them from losing them.
+
+    Returns:
+        True if a refresh was started, False if one was already running.
+    """
+    with _refreshing_lock:
+        if username in _refreshing:
+            return False
+        _refreshing.add(username)
+
+    def refresh():
+        try:
+            with app.app_context():
+                app.logger.info(f"Refreshing stale report for {username}")
+                InfluencerAnalysisService().analyze_coalesced(username, details)
+        except Exception as e:
+            app.logger.error(f"Error refreshing report for {username}: {str(e)}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(username)
+
+    threading.Thread(target=refresh, daemon=True).start()
+    return True
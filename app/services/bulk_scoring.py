@@ -0,0 +1,215 @@
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import socket
+import time
+import uuid
+from typing import List
+from app.utils.task_queue import TaskQueue
+
+
+def load_config(config_path: str):
+    """Imports a config class from a "module.ClassName" path."""
+    module_name, class_name = config_path.rsplit(".", 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def score_task(task) -> dict:
+    """
+    Analyzes and stores one influencer, returning a compact score summary.
+
+    Raises:
+        RuntimeError: If the influencer's tweets could not be fetched, so the
+            task is retried.
+    """
+    from app.services.analysis_service import InfluencerAnalysisService
+    from app.services.storage_service import count_statuses
+
+    record = InfluencerAnalysisService().analyze_and_store(task.username, task.details)
+    if record is None:
+        raise RuntimeError(f"Unable to fetch tweets for {task.username}")
+
+    report = record.report
+    return {
+        "username": task.username,
+        "trust_score": report.get("trust_score", 0),
+        "total_claims": report.get("total_claims", 0),
+        **count_statuses(report.get("verification_results") or {}),
+        "etag": record.etag,
+    }
+
+
+def run_worker(
+    queue_path: str,
+    config_path: str = "config.Config",
+    worker_id: str = None,
+    stop_when_idle: bool = True,
+    threads: int = None,
+    job_id: str = None,
+):
+    """
+    Processes scoring tasks from the queue until it is drained, or forever
+    when stop_when_idle is False.
+
+    Each worker creates its own app and loads the models once before taking
+    tasks. Other workers on the same machine can join by pointing at the same
+    queue.
+
+    Args:
+        queue_path: The SQLite task queue file.
+        config_path: The app config class, as "module.ClassName".
+        worker_id: Identifies the worker in the queue (host and pid by default).
+        stop_when_idle: Whether to exit once no task is pending or running.
+        threads: Caps the CPU threads used by the models in this worker.
+        job_id: Only works on this job's tasks and stops once it is finished,
+            rather than once every job in the queue is.
+    """
+    if threads:
+        # Keeps a pool of workers from oversubscribing the cores
+        for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+            os.environ[variable] = str(threads)
+
+    from app import create_app
+    from app.services.model_registry import preload_models
+
+    app = create_app(load_config(config_path))
+    worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    queue = TaskQueue(queue_path)
+
+    with app.app_context():
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+        preload_models()
+
+        lease_ttl = app.config.get("BULK_TASK_LEASE_TTL", 900)
+        max_attempts = app.config.get("BULK_MAX_ATTEMPTS", 3)
+        poll_interval = app.config.get("BULK_POLL_INTERVAL", 1.0)
+
+        while True:
+            task = queue.claim(worker_id, lease_ttl, max_attempts, job_id)
+            if task is None:
+                if stop_when_idle and not queue.unfinished(job_id):
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            try:
+                result = score_task(task)
+            except Exception as e:
+                app.logger.error(
+                    f"Scoring {task.username} failed (attempt {task.attempts}): {e}"
+                )
+                queue.fail(task.id, worker_id, str(e), max_attempts)
+            else:
+                if not queue.complete(task.id, worker_id, result):
+                    app.logger.warning(
+                        f"Dropped the result for {task.username}: the lease "
+                        "expired and another worker took the task over"
+                    )
+
+
+def run_bulk_scoring(
+    usernames: List[str],
+    workers: int = None,
+    queue_path: str = "data/bulk_queue.sqlite3",
+    config_path: str = "config.Config",
+    details: bool = False,
+    threads_per_worker: int = 1,
+) -> dict:
+    """
+    Scores many influencers with a pool of worker processes.
+
+    Args:
+        usernames: The Twitter handles to score.
+        workers: The number of worker processes (one per core by default).
+            With 0 the tasks run in this process.
+        queue_path: The SQLite task queue file.
+        config_path: The app config class, as "module.ClassName".
+        details: Whether two-phase verification should always generate explanations.
+        threads_per_worker: Caps the CPU threads used by each worker's models.
+
+    Returns:
+        The job id, the per-influencer results ordered by username, the
+        failed influencers, the number of unfinished tasks and the duration.
+    """
+    workers = os.cpu_count() if workers is None else workers
+    job_id = uuid.uuid4().hex
+    queue = TaskQueue(queue_path)
+    # Each influencer once, in a stable order
+    queue.enqueue(job_id, sorted(set(usernames)), details)
+
+    started = time.monotonic()
+    if workers == 0:
+        run_worker(queue_path, config_path, worker_id="inline", job_id=job_id)
+    else:
+        # Fresh interpreters, since forking after torch or threads start is unsafe
+        context = multiprocessing.get_context("spawn")
+        processes = [
+            context.Process(
+                target=run_worker,
+                args=(queue_path, config_path, None, True, threads_per_worker, job_id),
+                name=f"bulk-worker-{i}",
+            )
+            for i in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+
+    return {
+        "job_id": job_id,
+        **queue.results(job_id),
+        # Left over if every worker exited early, e.g. failing to load the models
+        "unfinished": queue.unfinished(job_id),
+        "duration_s": round(time.monotonic() - started, 3),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Score influencers in bulk with a pool of worker processes."
+    )
+    parser.add_argument("usernames", nargs="*", help="Twitter handles to score")
+    parser.add_argument("--file", help="File with one Twitter handle per line")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads-per-worker", type=int, default=1)
+    parser.add_argument("--queue", default="data/bulk_queue.sqlite3")
+    parser.add_argument("--config", default="config.Config")
+    parser.add_argument("--details", action="store_true")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Only run a worker that keeps polling the queue, e.g. on another node",
+    )
+    return parser.parse_args(argv)
+
+
+# Example usage: python -m app.services.bulk_scoring --workers 8 --file handles.txt
+if __name__ == "__main__":
+    args = parse_args()
+    if args.serve:
+        run_worker(
+            args.queue,
+            args.config,
+            stop_when_idle=False,
+            threads=args.threads_per_worker,
+        )
+    else:
+        usernames = list(args.usernames)
+        if args.file:
+            with open(args.file) as handle:
+                usernames += [line.strip() for line in handle if line.strip()]
+        summary = run_bulk_scoring(
+            usernames,
+            workers=args.workers,
+            queue_path=args.queue,
+            config_path=args.config,
+            details=args.details,
+            threads_per_worker=args.threads_per_worker,
+        )
+        print(json.dumps(summary, indent=2))
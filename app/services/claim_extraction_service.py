@@ -1,7 +1,11 @@
-import ollama
 from flask import current_app
 from pydantic import BaseModel
 from typing import List, Optional
+from app.services.extraction_cache import ExtractionCache, get_extraction_cache
+from app.services.model_cascade import get_cascade
+
+# Bump whenever the extraction prompt changes so cached responses are not reused
+PROMPT_VERSION = "1"
 
 
 class HealthClaim(BaseModel):
@@ -14,53 +18,55 @@ class HealthClaimsResponse(BaseModel):
 
 
 class ClaimExtractionService:
-    def __init__(self):
+    def __init__(self, cache: Optional[ExtractionCache] = None):
         self.model_name = "llama3.2:3b"
+        self.temperature = 0.1  # Lower temperature for more consistent outputs
+
+        # Fall back to the configured persistent cache, if any
+        if cache is None and current_app.config.get("EXTRACTION_CACHE_PATH"):
+            cache = get_extraction_cache(current_app.config["EXTRACTION_CACHE_PATH"])
+        self.cache = cache
+
+        # Smaller models answer first when a cascade is configured
+        self.cascade = get_cascade("extraction", self.model_name)
+        self.confidence_cutoff = 0.7
+        self.escalation_margin = current_app.config.get(
+            "CASCADE_CONFIDENCE_MARGIN", 0.1
+        )
+
         current_app.logger.info(
             f"Initialized ClaimExtractionService with model: {self.model_name}"
         )
 
-    def extract_health_claims(self, tweets: List[str]) -> List[str]:
+    def extract_health_claims(
+        self, tweets: List[str], confidence_threshold: float = None
+    ) -> List[str]:
         """
         Extracts potential health claims from a list of tweets using structured output.
+
+        Args:
+            tweets: A list of tweet strings.
+            confidence_threshold: The minimum confidence for a claim to be included
+                (0.7 by default).
+
+        Returns:
+            A list of health claim strings.
         """
+        if confidence_threshold is None:
+            confidence_threshold = self.confidence_cutoff
+
         health_claims = []
         current_app.logger.info(
             f"Starting health claim extraction for {len(tweets)} tweets"
         )
 
         for tweet in tweets:
-            prompt = f"""
-            Identify any health claims made by the author in the following tweet. For each claim, rate your confidence (0.0-1.0) in the scientific validity of the claim based on current medical consensus.
-            
-            A confidence of:
-            - 1.0: Strongly supported by multiple peer-reviewed studies
-            - 0.7-0.9: Supported by some scientific evidence
-            - 0.4-0.6: Limited or mixed scientific evidence
-            - 0.0-0.3: Little to no scientific support or contradicts current evidence
-            
-            Tweet: {tweet}
-            
-            Respond using JSON format.
-            """
             try:
-                response = ollama.chat(
-                    model=self.model_name,
-                    messages=[{"role": "user", "content": prompt}],
-                    format=HealthClaimsResponse.model_json_schema(),
-                    options={
-                        "temperature": 0.1
-                    },  # Lower temperature for more consistent outputs
-                )
-
-                # Parse and validate response using Pydantic
-                claims_response = HealthClaimsResponse.model_validate_json(
-                    response["message"]["content"]
-                )
+                claims_response = self.extract_claims_response(tweet)
 
                 # Add claims with sufficient confidence
                 for claim in claims_response.claims:
-                    if claim.confidence >= 0.7:  # Only include high confidence claims
+                    if claim.confidence >= confidence_threshold:
                         current_app.logger.info(
                             f"Found health claim: {claim.claim} (confidence: {claim.confidence})"
                         )
@@ -73,15 +79,76 @@ class ClaimExtractionService:
         current_app.logger.info(f"Extracted {len(health_claims)} health claims")
         return health_claims
 
+    def extract_claims_response(self, tweet: str) -> HealthClaimsResponse:
+        """
+        Returns the full parsed extraction response for a single tweet.
+
+        Responses are served from the extraction cache when available. The
+        cached response includes every claim regardless of confidence, so the
+        cutoff can change without re-running the LLM.
+
+        Args:
+            tweet: The tweet text.
+
+        Returns:
+            The parsed HealthClaimsResponse.
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = ExtractionCache.make_key(
+                tweet, self.cascade.signature, PROMPT_VERSION, self.temperature
+            )
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                current_app.logger.info("Extraction cache hit")
+                return HealthClaimsResponse.model_validate_json(cached)
+
+        prompt = f"""
+            Identify any health claims made by the author in the following tweet. For each claim, rate your confidence (0.0-1.0) in the scientific validity of the claim based on current medical consensus.
+            
+            A confidence of:
+            - 1.0: Strongly supported by multiple peer-reviewed studies
+            - 0.7-0.9: Supported by some scientific evidence
+            - 0.4-0.6: Limited or mixed scientific evidence
+            - 0.0-0.3: Little to no scientific support or contradicts current evidence
+            
+            Tweet: {tweet}
+            
+            Respond using JSON format.
+            """
+        claims_response = self.cascade.chat(
+            prompt,
+            HealthClaimsResponse,
+            options={"temperature": self.temperature},
+            escalate=self.needs_escalation,
+        )
+
+        if self.cache is not None:
+            self.cache.set(cache_key, claims_response.model_dump_json())
+
+        return claims_response
+
+    def needs_escalation(self, claims_response: HealthClaimsResponse) -> str | None:
+        """
+        Escalates extraction responses with a claim close to the confidence cutoff.
+        """
+        for claim in claims_response.claims:
+            if abs(claim.confidence - self.confidence_cutoff) < self.escalation_margin:
+                return "borderline_confidence"
+        return None
+
 
 # Example usage
 if __name__ == "__main__":
-    service = ClaimExtractionService()
-    example_tweets = [
-        "Eating more fruits and vegetables can improve your immune system.",
-        "Just saw a beautiful sunset today!",
-        "New study shows that exercise reduces the risk of heart disease.",
-    ]
-    extracted_claims = service.extract_health_claims(example_tweets)
+    from app import create_app
+
+    with create_app().app_context():
+        service = ClaimExtractionService()
+        example_tweets = [
+            "Eating more fruits and vegetables can improve your immune system.",
+            "Just saw a beautiful sunset today!",
+            "New study shows that exercise reduces the risk of heart disease.",
+        ]
+        extracted_claims = service.extract_health_claims(example_tweets)
     for claim in extracted_claims:
         print(claim)
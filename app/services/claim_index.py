@@ -0,0 +1,524 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+import numpy as np
+from flask import current_app
+from app.services.embedding_service import get_embedding_batcher
+from app.utils.json_encoding import dumps
+
+
+def text_hash(text: str) -> str:
+    """Identifies a claim text, ignoring case and surrounding whitespace."""
+    return hashlib.sha256(text.strip().lower().encode("utf-8")).hexdigest()
+
+
+class ClaimIndex:
+    """
+    Persistent, incrementally updated clustering of health claims across all
+    influencers.
+
+    Each claim is assigned to a canonical claim id: the nearest cluster
+    centroid if its cosine similarity reaches the threshold, otherwise a new
+    cluster. Members, centroids, mentions and the latest verification of each
+    canonical claim are stored in SQLite; the centroids are also kept in an
+    in-memory matrix so a lookup is one matrix-vector product. The matrix is
+    reloaded whenever another process has changed the database, so workers
+    sharing the file see each other's clusters.
+
+    The encode callable must return normalized embeddings, one row per text.
+    """
+
+    SCHEMA = [
+        """
+        CREATE TABLE IF NOT EXISTS canonical_claims (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            text TEXT NOT NULL,
+            centroid BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            verification TEXT,
+            verified_at REAL,
+            created_at REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS claim_members (
+            hash TEXT PRIMARY KEY,
+            text TEXT NOT NULL,
+            canonical_id INTEGER NOT NULL,
+            embedding BLOB NOT NULL,
+            created_at REAL NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS claim_mentions (
+            hash TEXT NOT NULL,
+            username TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (hash, username)
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS claim_members_canonical "
+        "ON claim_members (canonical_id)",
+    ]
+
+    def __init__(
+        self,
+        path: str,
+        encode: Callable[[List[str]], np.ndarray],
+        similarity_threshold: float = 0.8,
+    ):
+        self.path = path
+        self.encode = encode
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        for statement in self.SCHEMA:
+            self._connection.execute(statement)
+        self._connection.commit()
+
+        self._ids = []
+        self._centroids = None
+        self._data_version = None
+        self._refresh()
+
+    def _refresh(self):
+        """Reloads the centroids if another connection committed changes."""
+        # data_version only changes for commits made by other connections
+        version = self._connection.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._data_version:
+            self._load_centroids()
+            self._data_version = version
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Holds the lock and the database's write lock, with up-to-date
+        centroids, and commits at the end or rolls everything back on error.
+        """
+        with self._lock:
+            # Taking the write lock first stops other processes from changing
+            # the clusters between the refresh and the writes
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._refresh()
+                yield
+                self._connection.commit()
+            except BaseException:
+                self._connection.rollback()
+                self._load_centroids()
+                raise
+
+    def _load_centroids(self):
+        rows = self._connection.execute(
+            "SELECT id, centroid FROM canonical_claims ORDER BY id"
+        ).fetchall()
+        self._ids = [row[0] for row in rows]
+        self._centroids = (
+            np.vstack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+            if rows
+            else None
+        )
+
+    def _set_centroid(self, canonical_id: int, centroid: np.ndarray):
+        position = self._ids.index(canonical_id)
+        self._centroids[position] = centroid
+
+    def _add_centroid(self, canonical_id: int, centroid: np.ndarray):
+        self._ids.append(canonical_id)
+        row = centroid.reshape(1, -1)
+        self._centroids = (
+            row if self._centroids is None else np.vstack([self._centroids, row])
+        )
+
+    def _remove_centroid(self, canonical_id: int):
+        position = self._ids.index(canonical_id)
+        del self._ids[position]
+        self._centroids = np.delete(self._centroids, position, axis=0)
+        if not self._ids:
+            self._centroids = None
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).astype(np.float32)
+
+    def _recompute_centroid(self, canonical_id: int):
+        rows = self._connection.execute(
+            "SELECT embedding FROM claim_members WHERE canonical_id = ?",
+            (canonical_id,),
+        ).fetchall()
+        embeddings = np.vstack(
+            [np.frombuffer(row[0], dtype=np.float32) for row in rows]
+        )
+        centroid = self._normalize(embeddings.mean(axis=0))
+        self._connection.execute(
+            "UPDATE canonical_claims SET centroid = ?, size = ? WHERE id = ?",
+            (centroid.tobytes(), len(rows), canonical_id),
+        )
+        self._set_centroid(canonical_id, centroid)
+
+    def nearest(self, embedding: np.ndarray) -> tuple[Optional[int], float]:
+        """
+        Returns the nearest canonical claim id and its similarity, or (None, 0.0)
+        when the index is empty.
+        """
+        if self._centroids is None:
+            return None, 0.0
+        similarities = self._centroids @ embedding
+        position = int(np.argmax(similarities))
+        return self._ids[position], float(similarities[position])
+
+    def assign(self, claims: List[str], username: str = None) -> List[int]:
+        """
+        Assigns claims to canonical claim ids, creating clusters as needed.
+
+        Claims already in the index keep their canonical id without being
+        re-encoded; new claims are encoded in one batch.
+
+        Args:
+            claims: The health claim strings.
+            username: The influencer who made the claims, for cluster statistics.
+                Their mention counts are replaced by those of this call.
+
+        Returns:
+            The canonical claim id of each claim, in order.
+        """
+        if not claims:
+            return []
+
+        hashes = [text_hash(claim) for claim in claims]
+        known = self._lookup(hashes)
+        new = {}
+        for claim, claim_hash in zip(claims, hashes):
+            if claim_hash not in known:
+                new.setdefault(claim_hash, claim)
+
+        # Encode outside the lock so concurrent assignments are not serialized
+        embeddings = (
+            np.asarray(self.encode(list(new.values())), dtype=np.float32) if new else []
+        )
+
+        with self._transaction():
+            # Another thread or process may have inserted, merged or split some
+            # of the claims' clusters meanwhile
+            known = self._lookup(hashes, locked=True)
+            if new:
+                now = time.time()
+                for (claim_hash, claim), embedding in zip(new.items(), embeddings):
+                    if claim_hash not in known:
+                        known[claim_hash] = self._insert_member(
+                            claim_hash, claim, embedding, now
+                        )
+
+            if username is not None:
+                # Replaced rather than incremented, so re-analyses do not inflate it
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO claim_mentions (hash, username, count) "
+                    "VALUES (?, ?, ?)",
+                    [
+                        (claim_hash, username, count)
+                        for claim_hash, count in Counter(hashes).items()
+                    ],
+                )
+
+        return [known[claim_hash] for claim_hash in hashes]
+
+    def _lookup(self, hashes: List[str], locked: bool = False) -> Dict[str, int]:
+        unique = list(set(hashes))
+        query = (
+            f"SELECT hash, canonical_id FROM claim_members "
+            f"WHERE hash IN ({','.join('?' * len(unique))})"
+        )
+        if locked:
+            return dict(self._connection.execute(query, unique).fetchall())
+        with self._lock:
+            return dict(self._connection.execute(query, unique).fetchall())
+
+    def _insert_member(self, claim_hash, claim, embedding, now) -> int:
+        canonical_id, similarity = self.nearest(embedding)
+
+        if canonical_id is None or similarity < self.similarity_threshold:
+            cursor = self._connection.execute(
+                "INSERT INTO canonical_claims (text, centroid, size, created_at) "
+                "VALUES (?, ?, 1, ?)",
+                (claim, embedding.tobytes(), now),
+            )
+            canonical_id = cursor.lastrowid
+            self._add_centroid(canonical_id, embedding)
+        else:
+            # Running mean of the member embeddings, renormalized
+            size, centroid = self._connection.execute(
+                "SELECT size, centroid FROM canonical_claims WHERE id = ?",
+                (canonical_id,),
+            ).fetchone()
+            centroid = np.frombuffer(centroid, dtype=np.float32)
+            centroid = self._normalize(centroid * size + embedding)
+            self._connection.execute(
+                "UPDATE canonical_claims SET centroid = ?, size = ? WHERE id = ?",
+                (centroid.tobytes(), size + 1, canonical_id),
+            )
+            self._set_centroid(canonical_id, centroid)
+
+        self._connection.execute(
+            "INSERT INTO claim_members VALUES (?, ?, ?, ?, ?)",
+            (claim_hash, claim, canonical_id, embedding.tobytes(), now),
+        )
+        return canonical_id
+
+    def merge(self, target_id: int, source_id: int):
+        """
+        Moves every member of source_id into target_id and removes source_id.
+
+        The target keeps its representative text and its cached verification.
+
+        Raises:
+            ValueError: If the ids are equal or either canonical claim does not exist.
+        """
+        if target_id == source_id:
+            raise ValueError("Cannot merge a canonical claim into itself")
+        with self._transaction():
+            self._require(target_id, source_id)
+            self._connection.execute(
+                "UPDATE claim_members SET canonical_id = ? WHERE canonical_id = ?",
+                (target_id, source_id),
+            )
+            self._connection.execute(
+                "DELETE FROM canonical_claims WHERE id = ?", (source_id,)
+            )
+            self._remove_centroid(source_id)
+            self._recompute_centroid(target_id)
+
+    def _require(self, *canonical_ids: int):
+        rows = self._connection.execute(
+            f"SELECT id FROM canonical_claims "
+            f"WHERE id IN ({','.join('?' * len(canonical_ids))})",
+            canonical_ids,
+        ).fetchall()
+        missing = set(canonical_ids) - {row[0] for row in rows}
+        if missing:
+            raise ValueError(f"Unknown canonical claims: {sorted(missing)}")
+
+    def split(self, canonical_id: int, claims: List[str]) -> int:
+        """
+        Moves the given member claims out of a cluster into a new one.
+
+        The new cluster is represented by the first of the claims and has no
+        cached verification.
+
+        Returns:
+            The new canonical claim id.
+
+        Raises:
+            ValueError: If the canonical claim does not exist or the split would
+                leave either cluster empty.
+        """
+        hashes = [text_hash(claim) for claim in claims]
+        with self._transaction():
+            self._require(canonical_id)
+            members = self._connection.execute(
+                f"SELECT hash, text FROM claim_members WHERE canonical_id = ? "
+                f"AND hash IN ({','.join('?' * len(hashes))})",
+                [canonical_id, *hashes],
+            ).fetchall()
+            remaining = self._connection.execute(
+                "SELECT COUNT(*) FROM claim_members WHERE canonical_id = ?",
+                (canonical_id,),
+            ).fetchone()[0] - len(members)
+            if not members or remaining == 0:
+                raise ValueError("A split must leave members in both clusters")
+
+            text = dict(members).get(hashes[0], members[0][1])
+            # Placeholder centroid and size until the members are moved over
+            centroid = self._centroids[self._ids.index(canonical_id)].copy()
+            cursor = self._connection.execute(
+                "INSERT INTO canonical_claims (text, centroid, size, created_at) "
+                "VALUES (?, ?, 0, ?)",
+                (text, centroid.tobytes(), time.time()),
+            )
+            new_id = cursor.lastrowid
+            self._add_centroid(new_id, centroid)
+            self._connection.executemany(
+                "UPDATE claim_members SET canonical_id = ? WHERE hash = ?",
+                [(new_id, member_hash) for member_hash, _ in members],
+            )
+            self._recompute_centroid(new_id)
+            self._recompute_centroid(canonical_id)
+        return new_id
+
+    def merge_candidates(self, similarity_threshold: float = None) -> List[tuple]:
+        """
+        Finds pairs of clusters whose centroids have drifted together.
+
+        Args:
+            similarity_threshold: The minimum centroid similarity (the assignment
+                threshold by default).
+
+        Returns:
+            (id, id, similarity) tuples, most similar first.
+        """
+        threshold = (
+            self.similarity_threshold
+            if similarity_threshold is None
+            else similarity_threshold
+        )
+        with self._lock:
+            self._refresh()
+            if self._centroids is None:
+                return []
+            similarities = self._centroids @ self._centroids.T
+            ids = list(self._ids)
+        rows, columns = np.triu_indices(len(ids), k=1)
+        close = similarities[rows, columns] >= threshold
+        pairs = [
+            (ids[row], ids[column], float(similarities[row, column]))
+            for row, column in zip(rows[close], columns[close])
+        ]
+        return sorted(pairs, key=lambda pair: -pair[2])
+
+    def record_verification(self, canonical_id: int, verification: dict):
+        """
+        Stores the latest verification result of a canonical claim.
+        """
+        with self._lock:
+            self._connection.execute(
+                "UPDATE canonical_claims SET verification = ?, verified_at = ? "
+                "WHERE id = ?",
+                (dumps(verification), time.time(), canonical_id),
+            )
+            self._connection.commit()
+
+    def get_verifications(
+        self, canonical_ids: List[int], max_age: float = None
+    ) -> Dict[int, dict]:
+        """
+        Returns the stored verification results of canonical claims.
+
+        Args:
+            canonical_ids: The canonical claim ids to look up.
+            max_age: Results older than this many seconds are ignored.
+
+        Returns:
+            A dictionary mapping canonical claim ids to verification results.
+        """
+        if not canonical_ids:
+            return {}
+        oldest = time.time() - max_age if max_age is not None else 0
+        with self._lock:
+            rows = self._connection.execute(
+                f"SELECT id, verification FROM canonical_claims "
+                f"WHERE id IN ({','.join('?' * len(canonical_ids))}) "
+                f"AND verification IS NOT NULL AND verified_at >= ?",
+                [*canonical_ids, oldest],
+            ).fetchall()
+        return {row[0]: json.loads(row[1]) for row in rows}
+
+    def cluster_stats(self, canonical_id: int) -> Optional[dict]:
+        """
+        Returns the statistics of one canonical claim, or None if it does not exist.
+        """
+        stats = self.top_clusters(canonical_id=canonical_id)
+        return stats[0] if stats else None
+
+    def top_clusters(self, limit: int = 50, canonical_id: int = None) -> List[dict]:
+        """
+        Returns cluster statistics, the most widely repeated claims first.
+
+        Args:
+            limit: The maximum number of clusters to return.
+            canonical_id: Restricts the result to one canonical claim.
+
+        Returns:
+            A list of dictionaries with the canonical id, representative text,
+            member count, mentions, distinct influencers and verification status.
+        """
+        query = """
+            SELECT c.id, c.text, c.size, c.verification, c.verified_at,
+                   COALESCE(SUM(m.count), 0), COUNT(DISTINCT m.username)
+            FROM canonical_claims c
+            LEFT JOIN claim_members cm ON cm.canonical_id = c.id
+            LEFT JOIN claim_mentions m ON m.hash = cm.hash
+        """
+        params = []
+        if canonical_id is not None:
+            query += " WHERE c.id = ?"
+            params.append(canonical_id)
+        query += " GROUP BY c.id ORDER BY 7 DESC, 6 DESC, c.id LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [
+            {
+                "id": row[0],
+                "text": row[1],
+                "size": row[2],
+                "mentions": row[5],
+                "influencers": row[6],
+                "verification_status": (
+                    json.loads(row[3]).get("verification_status") if row[3] else None
+                ),
+                "verified_at": row[4],
+            }
+            for row in rows
+        ]
+
+    def members(self, canonical_id: int) -> List[str]:
+        """Returns the member claim texts of a canonical claim."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT text FROM claim_members WHERE canonical_id = ? "
+                "ORDER BY created_at",
+                (canonical_id,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._ids)
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_claim_index() -> Optional[ClaimIndex]:
+    """
+    Returns the shared ClaimIndex for the CLAIM_INDEX_PATH config, or None if
+    the index is disabled.
+    """
+    path = current_app.config.get("CLAIM_INDEX_PATH")
+    if not path:
+        return None
+
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            app = current_app._get_current_object()
+
+            def encode(texts):
+                # The batcher is created on first use, in the app it was built for
+                with app.app_context():
+                    return get_embedding_batcher().encode(texts)
+
+            index = ClaimIndex(
+                path,
+                encode,
+                similarity_threshold=current_app.config.get(
+                    "CLAIM_INDEX_THRESHOLD", 0.8
+                ),
+            )
+            _indexes[path] = index
+    return index
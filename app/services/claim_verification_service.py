@@ -1,11 +1,13 @@
 from typing import List, Dict, Any
-from pymed import PubMed
-from sentence_transformers import SentenceTransformer, util
 from flask import current_app
 import json
-import ollama
 from pydantic import BaseModel
 from enum import Enum
+from app.services.model_registry import get_sentence_transformer
+from app.services.embedding_service import get_embedding_batcher
+from app.services.pubmed_client import EUTILS_BASE_URL, PubMedClient
+from app.services.model_cascade import get_cascade
+from app.utils.resilience import CircuitOpenError, get_upstream
 
 
 class VerificationStatus(str, Enum):
@@ -22,32 +24,92 @@ class VerificationResponse(BaseModel):
     pubmed_results: List[Dict[str, str]]
 
 
+class VerificationStatusResponse(BaseModel):
+    verification_status: VerificationStatus
+    confidence: float
+
+
+class BatchVerificationResponse(BaseModel):
+    results: List[VerificationResponse]
+
+
+class PubMedSearchError(Exception):
+    """Raised when PubMed could not be searched, as opposed to finding nothing."""
+
+
+def fallback_result(verification_status, explanation, pubmed_results) -> dict:
+    """
+    Builds the result of a claim that could not be verified, e.g. because the
+    LLM failed. It is marked with "fallback" so it is never cached or reused
+    as the claim's verdict.
+    """
+    result = VerificationResponse(
+        verification_status=verification_status,
+        explanation=explanation,
+        supporting_points=[],
+        contradicting_points=[],
+        pubmed_results=pubmed_results,
+    ).model_dump()
+    result["fallback"] = True
+    return result
+
+
 class ClaimVerificationService:
     def __init__(self):
+        from pymed import PubMed
+
         self.pubmed = PubMed(
             tool="HealthClaimVerifier", email="sergiorobayoro@example.com"
         )  # Replace with your email
-        self.similarity_model = SentenceTransformer("all-MiniLM-L6-v2")
+        self.pubmed_client = PubMedClient(
+            tool="HealthClaimVerifier",
+            email=current_app.config.get("PUBMED_EMAIL", "sergiorobayoro@example.com"),
+            api_key=current_app.config.get("NCBI_API_KEY"),
+            base_url=current_app.config.get("PUBMED_BASE_URL", EUTILS_BASE_URL),
+            min_interval=current_app.config.get("PUBMED_MIN_INTERVAL"),
+            upstream=get_upstream("pubmed"),
+        )
+        self.similarity_model = get_sentence_transformer()
         self.model_name = "llama3.2:3b"
+
+        # Smaller models answer first when a cascade is configured
+        self.cascade = get_cascade("verification", self.model_name)
+        self.min_status_confidence = current_app.config.get(
+            "CASCADE_MIN_STATUS_CONFIDENCE", 0.6
+        )
+        self.similarity_floor = current_app.config.get("CASCADE_SIMILARITY_FLOOR", 0.3)
         current_app.logger.info("Initialized ClaimVerificationService")
 
-    def search_pubmed(self, query: str, max_results: int = 5) -> List[Dict[str, str]]:
+    def search_pubmed(
+        self, query: str, max_results: int = 5, raise_errors: bool = False
+    ) -> List[Dict[str, str]]:
         """
         Searches PubMed for articles related to a query.
 
         Args:
             query: The search query string.
             max_results: The maximum number of results to return.
+            raise_errors: Whether to raise on errors instead of returning no articles.
 
         Returns:
             A list of PubMed articles with title, abstract, and URL.
 
         Raises:
-            PubMedSearchError: If there's an error accessing PubMed.
+            PubMedSearchError: If there's an error accessing PubMed and
+                raise_errors is set.
         """
         try:
             current_app.logger.info(f"Searching PubMed for: {query}")
-            results = self.pubmed.query(query, max_results=max_results)
+
+            def search(timeout):
+                # Hedged duplicates count against NCBI's rate limit too
+                self.pubmed_client.throttle.wait()
+                return list(self.pubmed.query(query, max_results=max_results))
+
+            # pymed takes no timeout, so a stalled search is abandoned instead
+            results = get_upstream("pubmed").call(
+                search, hedge=True, enforce_timeout=True
+            )
             articles = []
 
             for article in results:
@@ -75,10 +137,62 @@ class ClaimVerificationService:
             current_app.logger.info(f"Found {len(articles)} PubMed articles")
             return articles
 
+        except CircuitOpenError as e:
+            # Fail fast while PubMed is unhealthy instead of waiting on it
+            current_app.logger.warning(f"Skipping PubMed search: {e}")
+            if raise_errors:
+                raise PubMedSearchError(str(e)) from e
+            return []
         except Exception as e:
             current_app.logger.error(f"Error searching PubMed: {e}")
+            if raise_errors:
+                raise PubMedSearchError(str(e)) from e
             return []
 
+    def search_pubmed_many(
+        self, queries: List[str], max_results: int = 5
+    ) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Searches PubMed for many queries with a few batched round trips.
+
+        Args:
+            queries: The search query strings.
+            max_results: The maximum number of results per query.
+
+        Returns:
+            A dictionary mapping each query to its list of PubMed articles.
+            Queries that could not be searched are left out, so they are not
+            mistaken for claims without any research.
+        """
+        try:
+            current_app.logger.info(f"Searching PubMed for {len(queries)} queries")
+            return self.pubmed_client.search_many(queries, max_results)
+
+        except Exception as e:
+            current_app.logger.error(
+                f"Batched PubMed search failed, searching per claim: {e}"
+            )
+
+        results = {}
+        for query in queries:
+            try:
+                results[query] = self.search_pubmed(
+                    query, max_results, raise_errors=True
+                )
+            except PubMedSearchError:
+                continue
+        return results
+
+    def search_unavailable(self, verification_status=None):
+        """
+        Returns the fallback result of a claim whose articles could not be searched.
+        """
+        return fallback_result(
+            verification_status or VerificationStatus.QUESTIONABLE,
+            "Research articles are temporarily unavailable",
+            [],
+        )
+
     def calculate_similarity(self, claim, abstract):
         """
         Calculates the cosine similarity between a claim and an abstract using a Sentence Transformer model.
@@ -93,6 +207,13 @@ class ClaimVerificationService:
         if not abstract:  # Handle cases where the abstract might be empty or None
             return 0.0
 
+        if current_app.config.get("EMBEDDING_BATCHING"):
+            # Normalized embeddings, so the dot product is the cosine similarity
+            embeddings = get_embedding_batcher().encode([claim, abstract])
+            return float(embeddings[0] @ embeddings[1])
+
+        from sentence_transformers import util
+
         claim_embedding = self.similarity_model.encode(claim, convert_to_tensor=True)
         abstract_embedding = self.similarity_model.encode(
             abstract, convert_to_tensor=True
@@ -100,22 +221,55 @@ class ClaimVerificationService:
         similarity = util.pytorch_cos_sim(claim_embedding, abstract_embedding).item()
         return similarity
 
-    def verify_claim(self, claim, max_results=5):
+    def format_articles(self, pubmed_results):
+        """
+        Formats PubMed articles for inclusion in a verification prompt.
+
+        Args:
+            pubmed_results: A list of PubMed articles with title, abstract, and URL.
+
+        Returns:
+            The articles as a prompt fragment.
+        """
+        prompt = ""
+        for i, article in enumerate(pubmed_results, 1):
+            prompt += f"""
+            Article {i}:
+            Title: {article['title']}
+            Abstract: {article['abstract']}
+            Source: {article['url']}
+            """
+        return prompt
+
+    def verify_claim(
+        self, claim, max_results=5, pubmed_results=None, verification_status=None
+    ):
         """
         Verifies a health claim by searching PubMed articles and using LLM to analyze them.
 
         Args:
             claim: The health claim string.
             max_results: The maximum number of PubMed articles to retrieve.
+            pubmed_results: Already retrieved PubMed articles to use instead of searching.
+            verification_status: A status already decided for the claim, e.g. by a
+                status-only verification. Only the explanation and points are
+                generated and the status is kept.
 
         Returns:
             A dictionary with verification results and evidence.
         """
-        pubmed_results = self.search_pubmed(claim, max_results)
+        if pubmed_results is None:
+            try:
+                pubmed_results = self.search_pubmed(
+                    claim, max_results, raise_errors=True
+                )
+            except PubMedSearchError:
+                return self.search_unavailable(verification_status)
+        fallback_status = verification_status or VerificationStatus.QUESTIONABLE
 
         if not pubmed_results:
             return VerificationResponse(
-                verification_status=VerificationStatus.QUESTIONABLE,
+                verification_status=fallback_status,
                 explanation="No relevant research articles found",
                 supporting_points=[],
                 contradicting_points=[],
@@ -130,48 +284,380 @@ class ClaimVerificationService:
         RESEARCH ARTICLES:
         """
 
-        for i, article in enumerate(pubmed_results, 1):
-            prompt += f"""
-            Article {i}:
-            Title: {article['title']}
-            Abstract: {article['abstract']}
-            Source: {article['url']}
-            """
+        prompt += self.format_articles(pubmed_results)
 
-        prompt += """
+        if verification_status is None:
+            prompt += """
         Based on these research articles, determine if the claim is:
         - "Verified" (strong scientific support)
         - "Questionable" (limited or mixed evidence)
         - "Debunked" (contradicts evidence)
         """
 
+            def escalate(response):
+                return self.evidence_conflict(
+                    claim, response.verification_status, pubmed_results
+                )
+
+        else:
+            status = VerificationStatus(verification_status).value
+            prompt += f"""
+        The claim has been assessed as "{status}". Explain this assessment based on
+        these research articles and list the supporting and contradicting points.
+        """
+            escalate = None
+
         try:
-            response = ollama.chat(
-                model=self.model_name,
-                messages=[{"role": "user", "content": prompt}],
-                format=VerificationResponse.model_json_schema(),
+            verification_response = self.cascade.chat(
+                prompt,
+                VerificationResponse,
                 options={"temperature": 0.1},
-            )
-
-            # Parse and validate response using Pydantic
-            verification_response = VerificationResponse.model_validate_json(
-                response["message"]["content"]
+                escalate=escalate,
             )
 
             # Add PubMed results
             verification_response.pubmed_results = pubmed_results
+            if verification_status is not None:
+                verification_response.verification_status = verification_status
 
             return verification_response.model_dump()
 
+        except CircuitOpenError as e:
+            # Fail fast while the LLM is unhealthy instead of waiting on it
+            current_app.logger.warning(f"Skipping claim verification: {str(e)}")
+            return fallback_result(
+                fallback_status,
+                "Verification is temporarily unavailable",
+                pubmed_results,
+            )
         except Exception as e:
             current_app.logger.error(f"Error during claim verification: {str(e)}")
-            return VerificationResponse(
-                verification_status=VerificationStatus.QUESTIONABLE,
-                explanation=f"Error during verification: {str(e)}",
-                supporting_points=[],
-                contradicting_points=[],
+            return fallback_result(
+                fallback_status, f"Error during verification: {str(e)}", pubmed_results
+            )
+
+    def verify_claim_status(
+        self,
+        claim,
+        max_results=5,
+        details=False,
+        confidence_threshold=0.8,
+        pubmed_results=None,
+    ):
+        """
+        Verifies a health claim in two phases to avoid generating unneeded text.
+
+        A short call first asks only for the verification status and a confidence.
+        The full explanation and supporting/contradicting points are generated
+        only when the confidence is below the threshold or details are requested.
+
+        Args:
+            claim: The health claim string.
+            max_results: The maximum number of PubMed articles to retrieve.
+            details: Whether to always generate the full explanation.
+            confidence_threshold: The confidence below which details are generated.
+            pubmed_results: Already retrieved PubMed articles to use instead of searching.
+
+        Returns:
+            A dictionary with verification results, the status confidence and
+            whether the explanation and points were generated.
+        """
+        if pubmed_results is None:
+            try:
+                pubmed_results = self.search_pubmed(
+                    claim, max_results, raise_errors=True
+                )
+            except PubMedSearchError:
+                result = self.search_unavailable()
+                result.update({"confidence": None, "details_available": True})
+                return result
+
+        if not pubmed_results:
+            result = self.verify_claim(claim, pubmed_results=[])
+            result.update({"confidence": 1.0, "details_available": True})
+            return result
+
+        prompt = f"""
+        Analyze this health claim against the following research articles:
+
+        CLAIM: {claim}
+
+        RESEARCH ARTICLES:
+        """
+
+        prompt += self.format_articles(pubmed_results)
+
+        prompt += """
+        Based on these research articles, determine if the claim is:
+        - "Verified" (strong scientific support)
+        - "Questionable" (limited or mixed evidence)
+        - "Debunked" (contradicts evidence)
+
+        Respond only with the status and your confidence (0.0-1.0) in it.
+        """
+
+        def needs_escalation(response):
+            if response.confidence < self.min_status_confidence:
+                return "low_confidence"
+            return self.evidence_conflict(
+                claim, response.verification_status, pubmed_results
+            )
+
+        try:
+            status_response = self.cascade.chat(
+                prompt,
+                VerificationStatusResponse,
+                # The status and confidence need only a handful of tokens
+                options={"temperature": 0.1, "num_predict": 32},
+                escalate=needs_escalation,
+            )
+
+        except Exception as e:
+            current_app.logger.warning(
+                f"Status-only verification failed, running full verification: {str(e)}"
+            )
+            result = self.verify_claim(claim, pubmed_results=pubmed_results)
+            result.update({"confidence": None, "details_available": True})
+            return result
+
+        if status_response.confidence < confidence_threshold:
+            # Unsure: the full verification decides the status again, and the
+            # status-only confidence only holds if it reaches the same status
+            result = self.verify_claim(claim, pubmed_results=pubmed_results)
+            confidence = (
+                status_response.confidence
+                if result["verification_status"] == status_response.verification_status
+                else None
+            )
+            result.update({"confidence": confidence, "details_available": True})
+            return result
+
+        if details:
+            # Confident: only explain the status already decided
+            result = self.verify_claim(
+                claim,
                 pubmed_results=pubmed_results,
-            ).model_dump()
+                verification_status=status_response.verification_status,
+            )
+            result.update(
+                {"confidence": status_response.confidence, "details_available": True}
+            )
+            return result
+
+        result = VerificationResponse(
+            verification_status=status_response.verification_status,
+            explanation="",
+            supporting_points=[],
+            contradicting_points=[],
+            pubmed_results=pubmed_results,
+        ).model_dump()
+        result.update(
+            {"confidence": status_response.confidence, "details_available": False}
+        )
+        return result
+
+    def evidence_conflict(self, claim, verification_status, pubmed_results):
+        """
+        Checks whether a verdict conflicts with the retrieval similarity signal.
+
+        A claim cannot be confidently verified or debunked by articles that are
+        barely related to it, so such verdicts are escalated.
+
+        Returns:
+            "evidence_conflict" if the verdict should be escalated, otherwise None.
+        """
+        if verification_status == VerificationStatus.QUESTIONABLE:
+            return None
+        best_similarity = max(
+            (
+                self.calculate_similarity(claim, article["abstract"])
+                for article in pubmed_results
+            ),
+            default=0.0,
+        )
+        if best_similarity < self.similarity_floor:
+            return "evidence_conflict"
+        return None
+
+    def cluster_claims(self, claims, similarity_threshold=0.6, max_cluster_size=5):
+        """
+        Groups related claims by the similarity of their embeddings.
+
+        Each claim joins the first cluster whose leading claim is similar enough
+        and that still has room, otherwise it starts a new cluster.
+
+        Args:
+            claims: A list of health claim strings.
+            similarity_threshold: The minimum similarity to the cluster's leading claim.
+            max_cluster_size: The maximum number of claims per cluster.
+
+        Returns:
+            A list of clusters, each a list of claim strings.
+        """
+        if not claims:
+            return []
+
+        from sentence_transformers import util
+
+        embeddings = self.similarity_model.encode(claims, convert_to_tensor=True)
+        similarities = util.pytorch_cos_sim(embeddings, embeddings)
+
+        clusters = []  # Lists of claim indices, the first one leading the cluster
+        for i in range(len(claims)):
+            for cluster in clusters:
+                if (
+                    len(cluster) < max_cluster_size
+                    and similarities[cluster[0]][i].item() >= similarity_threshold
+                ):
+                    cluster.append(i)
+                    break
+            else:
+                clusters.append([i])
+
+        current_app.logger.info(
+            f"Grouped {len(claims)} claims into {len(clusters)} clusters"
+        )
+        return [[claims[i] for i in cluster] for cluster in clusters]
+
+    def verify_claims_batch(
+        self,
+        claims,
+        max_results=5,
+        similarity_threshold=0.6,
+        max_cluster_size=5,
+        pubmed_results_by_claim=None,
+        batch_search=False,
+    ):
+        """
+        Verifies many claims, sharing one PubMed search and one LLM call per cluster
+        of related claims.
+
+        Clusters whose batched response fails validation fall back to verifying
+        each claim on its own against the same articles.
+
+        Args:
+            claims: A list of health claim strings.
+            max_results: The maximum number of PubMed articles to retrieve per cluster.
+            similarity_threshold: The minimum similarity for claims to share a cluster.
+            max_cluster_size: The maximum number of claims verified in one call.
+            pubmed_results_by_claim: Already retrieved PubMed articles by claim.
+            batch_search: Whether to look up the articles of all clusters with
+                a few batched round trips instead of one search per cluster.
+
+        Returns:
+            A dictionary mapping each claim to its verification result.
+        """
+        pubmed_results_by_claim = dict(pubmed_results_by_claim or {})
+        verification_results = {}
+
+        clusters = self.cluster_claims(claims, similarity_threshold, max_cluster_size)
+        if batch_search:
+            # Only the leading claims are searched, one per cluster
+            leaders = [
+                cluster[0]
+                for cluster in clusters
+                if cluster[0] not in pubmed_results_by_claim
+            ]
+            if leaders:
+                pubmed_results_by_claim.update(
+                    self.search_pubmed_many(leaders, max_results)
+                )
+
+        for cluster in clusters:
+            # The leading claim stands in for the cluster when searching
+            pubmed_results = pubmed_results_by_claim.get(cluster[0])
+            if pubmed_results is None:
+                try:
+                    pubmed_results = self.search_pubmed(
+                        cluster[0], max_results, raise_errors=True
+                    )
+                except PubMedSearchError:
+                    for claim in cluster:
+                        verification_results[claim] = self.search_unavailable()
+                    continue
+
+            if len(cluster) == 1:
+                verification_results[cluster[0]] = self.verify_claim(
+                    cluster[0], pubmed_results=pubmed_results
+                )
+                continue
+
+            verification_results.update(self.verify_cluster(cluster, pubmed_results))
+
+        return verification_results
+
+    def verify_cluster(self, claims, pubmed_results):
+        """
+        Verifies related claims against a shared set of articles in one LLM call.
+
+        Args:
+            claims: A list of related health claim strings.
+            pubmed_results: The PubMed articles shared by the claims.
+
+        Returns:
+            A dictionary mapping each claim to its verification result.
+        """
+        if not pubmed_results:
+            return {
+                claim: self.verify_claim(claim, pubmed_results=[]) for claim in claims
+            }
+
+        prompt = """
+        Analyze each of these health claims against the following research articles:
+
+        CLAIMS:
+        """
+
+        for i, claim in enumerate(claims, 1):
+            prompt += f"""
+            Claim {i}: {claim}
+            """
+
+        prompt += """
+        RESEARCH ARTICLES:
+        """
+
+        prompt += self.format_articles(pubmed_results)
+
+        prompt += f"""
+        Based on these research articles, return exactly {len(claims)} results, one per
+        claim and in the same order as the claims, determining if each claim is:
+        - "Verified" (strong scientific support)
+        - "Questionable" (limited or mixed evidence)
+        - "Debunked" (contradicts evidence)
+        """
+
+        try:
+            batch_response = self.cascade.chat(
+                prompt,
+                BatchVerificationResponse,
+                options={"temperature": 0.1},
+                escalate=lambda response: (
+                    "result_count_mismatch"
+                    if len(response.results) != len(claims)
+                    else None
+                ),
+            )
+            if len(batch_response.results) != len(claims):
+                raise ValueError(
+                    f"Expected {len(claims)} results, got {len(batch_response.results)}"
+                )
+
+            verification_results = {}
+            for claim, verification_response in zip(claims, batch_response.results):
+                # Add PubMed results
+                verification_response.pubmed_results = pubmed_results
+                verification_results[claim] = verification_response.model_dump()
+            return verification_results
+
+        except Exception as e:
+            current_app.logger.warning(
+                f"Batched verification failed, verifying claims individually: {str(e)}"
+            )
+            return {
+                claim: self.verify_claim(claim, pubmed_results=pubmed_results)
+                for claim in claims
+            }
 
     def calculate_trust_score(self, verification_results):
         """
@@ -189,17 +675,28 @@ class ClaimVerificationService:
         if not verification_results:
             return 0, 0
 
-        points = 0
-        total_claims = len(verification_results)
+        statuses = [
+            result.get("verification_status", "")
+            for result in verification_results.values()
+        ]
+        return self.trust_score_from_counts(
+            statuses.count("Verified"),
+            statuses.count("Debunked"),
+            len(verification_results),
+        )
 
-        for result in verification_results.values():
-            status = result.get("verification_status", "")
-            if status == "Verified":
-                points += 2
-            elif status == "Debunked":
-                points -= 1
+    @staticmethod
+    def trust_score_from_counts(verified, debunked, total_claims):
+        """
+        Calculates the trust score from status counts, so it can be kept up to
+        date incrementally. Uses the same scoring as calculate_trust_score.
 
+        Returns:
+        - score: 0-100 scale
+        - total_claims: number of claims analyzed
+        """
         # Convert to 0-100 scale
+        points = verified * 2 - debunked
         max_possible = total_claims * 2  # If all claims were verified
         if max_possible == 0:
             return 0, 0
@@ -1,10 +1,11 @@
-from sentence_transformers import SentenceTransformer, util
 from flask import current_app
+from app.services.model_registry import get_sentence_transformer
+from app.services.embedding_service import get_embedding_batcher
 
 
 class DataProcessingService:
     def __init__(self):
-        self.similarity_model = SentenceTransformer("all-MiniLM-L6-v2")
+        self.similarity_model = get_sentence_transformer()
         current_app.logger.info(
             "Initialized DataProcessingService with SentenceTransformer"
         )
@@ -23,10 +24,23 @@ class DataProcessingService:
         current_app.logger.info(f"Processing {len(claims)} claims for duplicates")
         unique_claims = []
 
-        for claim in claims:
+        similarities = None
+        if current_app.config.get("EMBEDDING_BATCHING") and claims:
+            try:
+                # One encode call for every claim instead of one per compared pair
+                embeddings = get_embedding_batcher().encode(claims)
+                # Normalized embeddings, so the dot products are cosine similarities
+                similarities = embeddings @ embeddings.T
+            except Exception as e:
+                current_app.logger.error(f"Error encoding claims: {str(e)}")
+
+        for i, claim in enumerate(claims):
             is_duplicate = False
-            for existing_claim in unique_claims:
-                similarity = self.calculate_similarity(claim, existing_claim)
+            for j, existing_claim in unique_claims:
+                if similarities is not None:
+                    similarity = float(similarities[i, j])
+                else:
+                    similarity = self.calculate_similarity(claim, existing_claim)
                 if similarity >= similarity_threshold:
                     current_app.logger.info(
                         f"Found duplicate claim: '{claim}' similar to '{existing_claim}' (score: {similarity:.2f})"
@@ -34,10 +48,10 @@ class DataProcessingService:
                     is_duplicate = True
                     break
             if not is_duplicate:
-                unique_claims.append(claim)
+                unique_claims.append((i, claim))
 
         current_app.logger.info(f"Reduced to {len(unique_claims)} unique claims")
-        return unique_claims
+        return [claim for _, claim in unique_claims]
 
     def calculate_similarity(self, claim1, claim2):
         """
@@ -50,7 +64,14 @@ class DataProcessingService:
         Returns:
             A similarity score (float) between 0 and 1.
         """
+        from sentence_transformers import util
+
         try:
+            if current_app.config.get("EMBEDDING_BATCHING"):
+                # Normalized embeddings, so the dot product is the cosine similarity
+                embeddings = get_embedding_batcher().encode([claim1, claim2])
+                return float(embeddings[0] @ embeddings[1])
+
             claim1_embedding = self.similarity_model.encode(
                 claim1, convert_to_tensor=True
             )
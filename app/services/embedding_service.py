@@ -0,0 +1,211 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import List
+from flask import current_app
+from app.services.model_registry import (
+    DEFAULT_SIMILARITY_MODEL,
+    get_sentence_transformer,
+)
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces encode requests from many threads into batched model calls.
+
+    Callers submit a few texts and get a Future back. A single background
+    thread collects pending requests until either max_batch_size texts are
+    queued or the oldest request has waited max_wait_ms, then encodes them in
+    one call and resolves every Future with its own slice of the embeddings.
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+        logger=None,
+    ):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        # The worker thread runs outside any app context
+        self.logger = logger
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+
+        self._metrics_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._texts = 0
+        self._largest_batch = 0
+        self._queue_waits = deque(maxlen=1000)
+        self._batch_sizes = deque(maxlen=1000)
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so pre-forked workers start their own
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is None or self._pid != os.getpid():
+                self._queue = queue.Queue()
+                self._pid = os.getpid()
+                self._thread = threading.Thread(
+                    target=self._run, name="embedding-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queues texts for encoding.
+
+        Args:
+            texts: The strings to encode.
+
+        Returns:
+            A Future resolving to an array of normalized embeddings, one row per text.
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((list(texts), future, time.monotonic()))
+        return future
+
+    def encode(self, texts: List[str]):
+        """
+        Encodes texts through the batch queue and waits for the result.
+        """
+        return self.submit(texts).result()
+
+    def _collect(self):
+        pending = [self._queue.get()]
+        size = len(pending[0][0])
+        deadline = pending[0][2] + self.max_wait
+
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            size += len(item[0])
+
+        return pending
+
+    def _deliver(self, future, result=None, exception=None):
+        # A failed delivery must not stop the worker, or every later encode hangs
+        try:
+            if not future.set_running_or_notify_cancel():
+                return  # Cancelled by its caller
+            if exception is not None:
+                future.set_exception(exception)
+            else:
+                future.set_result(result)
+        except Exception as e:
+            if self.logger is not None:
+                self.logger.error(f"Error delivering embeddings: {str(e)}")
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            started = time.monotonic()
+            texts = [text for item in pending for text in item[0]]
+
+            try:
+                embeddings = self.model.encode(
+                    texts,
+                    batch_size=max(len(texts), 1),
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                )
+            except Exception as e:
+                for _, future, _ in pending:
+                    self._deliver(future, exception=e)
+                continue
+
+            offset = 0
+            for item_texts, future, _ in pending:
+                self._deliver(future, embeddings[offset : offset + len(item_texts)])
+                offset += len(item_texts)
+
+            with self._metrics_lock:
+                self._batches += 1
+                self._requests += len(pending)
+                self._texts += len(texts)
+                self._largest_batch = max(self._largest_batch, len(texts))
+                self._batch_sizes.append(len(texts))
+                self._queue_waits.extend(
+                    started - submitted for _, _, submitted in pending
+                )
+
+    def metrics(self) -> dict:
+        """
+        Returns batch-size and queue-wait statistics.
+
+        Averages cover every batch; percentiles cover the most recent 1000
+        batches and requests.
+        """
+        with self._metrics_lock:
+            waits = sorted(self._queue_waits)
+            sizes = sorted(self._batch_sizes)
+            batches = self._batches
+            requests = self._requests
+            texts = self._texts
+            largest_batch = self._largest_batch
+
+        def percentile(values, fraction):
+            if not values:
+                return 0.0
+            return values[min(len(values) - 1, int(fraction * len(values)))]
+
+        return {
+            "batches": batches,
+            "requests": requests,
+            "texts": texts,
+            "queue_depth": self._queue.qsize(),
+            "avg_batch_size": texts / batches if batches else 0.0,
+            "p50_batch_size": percentile(sizes, 0.5),
+            "max_batch_size": largest_batch,
+            "p50_queue_wait_ms": percentile(waits, 0.5) * 1000,
+            "p95_queue_wait_ms": percentile(waits, 0.95) * 1000,
+        }
+
+
+_batchers = {}
+_batchers_lock = threading.Lock()
+
+
+def get_embedding_batcher(
+    model_name: str = DEFAULT_SIMILARITY_MODEL,
+) -> EmbeddingBatcher:
+    """
+    Returns the shared EmbeddingBatcher for a model, configured from the current app.
+    """
+    with _batchers_lock:
+        batcher = _batchers.get(model_name)
+        if batcher is None:
+            batcher = EmbeddingBatcher(
+                get_sentence_transformer(model_name),
+                max_batch_size=current_app.config.get("EMBEDDING_MAX_BATCH_SIZE", 64),
+                max_wait_ms=current_app.config.get("EMBEDDING_MAX_WAIT_MS", 5.0),
+                logger=current_app.logger,
+            )
+            _batchers[model_name] = batcher
+    return batcher
+
+
+def batcher_metrics() -> dict:
+    """
+    Returns the metrics of every embedding batcher created so far, by model name.
+    """
+    with _batchers_lock:
+        batchers = dict(_batchers)
+    return {model_name: batcher.metrics() for model_name, batcher in batchers.items()}
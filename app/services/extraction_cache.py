@@ -0,0 +1,107 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class ExtractionCache:
+    """
+    Persistent cache of parsed claim extraction responses.
+
+    Entries are keyed by a hash of the tweet text together with the model name,
+    prompt version and temperature, so any change to how the LLM is called
+    naturally misses the cache. The full parsed response is stored, including
+    claims below the confidence cutoff.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS extraction_cache (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+            """)
+        self._connection.commit()
+
+    @staticmethod
+    def make_key(
+        tweet: str, model_name: str, prompt_version: str, temperature: float
+    ) -> str:
+        """
+        Builds the cache key for one extraction call.
+
+        Args:
+            tweet: The tweet text sent to the model.
+            model_name: The name of the model used for extraction.
+            prompt_version: The version of the extraction prompt.
+            temperature: The sampling temperature used for the call.
+
+        Returns:
+            A hex digest identifying the call.
+        """
+        tweet_hash = hashlib.sha256(tweet.encode("utf-8")).hexdigest()
+        return hashlib.sha256(
+            f"{tweet_hash}|{model_name}|{prompt_version}|{temperature}".encode("utf-8")
+        ).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Returns the cached response JSON for a key, or None on a miss.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT response FROM extraction_cache WHERE key = ?", (key,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, response_json: str):
+        """
+        Stores the response JSON for a key, replacing any previous entry.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO extraction_cache (key, response, created_at) "
+                "VALUES (?, ?, ?)",
+                (key, response_json, time.time()),
+            )
+            self._connection.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM extraction_cache"
+            ).fetchone()[0]
+
+    def clear(self):
+        """Removes every cached entry."""
+        with self._lock:
+            self._connection.execute("DELETE FROM extraction_cache")
+            self._connection.commit()
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_extraction_cache(path: str) -> ExtractionCache:
+    """
+    Returns the shared ExtractionCache for a database path.
+    """
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = ExtractionCache(path)
+            _caches[path] = cache
+    return cache
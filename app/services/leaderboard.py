@@ -0,0 +1,329 @@
+import threading
+import time
+from statistics import NormalDist
+from typing import Callable, Dict, List, Tuple
+import numpy as np
+from flask import current_app
+from app.models import Score
+from app.services.storage_service import get_storage
+
+# Points per verified, questionable and debunked claim. "default" matches
+# ClaimVerificationService.calculate_trust_score.
+WEIGHTINGS: Dict[str, Tuple[float, float, float]] = {
+    "default": (2.0, 0.0, -1.0),
+    "strict": (2.0, 0.0, -2.0),
+    "lenient": (2.0, 1.0, -1.0),
+}
+
+SORT_KEYS = ("trust_score", "lower_bound", "total_claims")
+
+
+def trust_scores(
+    verified, questionable, debunked, weights=WEIGHTINGS["default"], z=1.96
+):
+    """
+    Scores many influencers at once from their status counts.
+
+    The score is the mean points per claim as a percentage of the points of a
+    verified claim, clipped to 0-100. The confidence interval is the normal
+    approximation of that mean after adding z**2 / 2 pseudo-claims at the best
+    and the worst weight (as in the Agresti-Coull interval), so influencers
+    with few claims get wide intervals even when all their claims agree.
+
+    Args:
+        verified: Verified claim counts, one per influencer.
+        questionable: Questionable claim counts.
+        debunked: Debunked claim counts.
+        weights: The points for a verified, questionable and debunked claim.
+        z: The z-value of the confidence level (1.96 for 95%).
+
+    Returns:
+        (scores, lower_bounds, upper_bounds) arrays on the 0-100 scale.
+    """
+    verified = np.asarray(verified, dtype=np.float64)
+    questionable = np.asarray(questionable, dtype=np.float64)
+    debunked = np.asarray(debunked, dtype=np.float64)
+    w_verified, w_questionable, w_debunked = weights
+
+    total = verified + questionable + debunked
+    points = (
+        verified * w_verified + questionable * w_questionable + debunked * w_debunked
+    )
+    squares = (
+        verified * w_verified**2
+        + questionable * w_questionable**2
+        + debunked * w_debunked**2
+    )
+    mean = points / np.maximum(total, 1)
+
+    pseudo = z**2 / 2
+    worst = min(weights)
+    adjusted_total = total + 2 * pseudo
+    adjusted_mean = (points + pseudo * (w_verified + worst)) / adjusted_total
+    variance = (
+        squares + pseudo * (w_verified**2 + worst**2)
+    ) / adjusted_total - adjusted_mean**2
+    margin = z * np.sqrt(np.maximum(variance, 0) / adjusted_total)
+
+    scale = 100 / w_verified
+    has_claims = total > 0
+    scores = np.where(has_claims, np.clip(mean * scale, 0, 100), 0)
+    lower = np.clip((adjusted_mean - margin) * scale, 0, 100)
+    upper = np.clip((adjusted_mean + margin) * scale, 0, 100)
+    # The pseudo-claims can pull a small sample's interval past its raw score
+    lower = np.where(has_claims, np.minimum(lower, scores), 0)
+    upper = np.where(has_claims, np.maximum(upper, scores), 0)
+    return scores, lower, upper
+
+
+class Leaderboard:
+    """
+    Ranks every scored influencer from a columnar, array-backed table of
+    status counts.
+
+    Scores and confidence intervals for all influencers are recomputed in
+    one vectorized pass per weighting, and a sorted index is kept per
+    weighting and sort key. Updates only drop the cached scores and indexes;
+    the next query recomputes them, so a burst of updates costs one pass.
+
+    Updates made while the table is being reloaded are applied on top of the
+    reloaded scores, so a reload never loses them.
+    """
+
+    def __init__(self, capacity: int = 1024, confidence: float = 0.95):
+        self.z = NormalDist().inv_cdf((1 + confidence) / 2)
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._pending = None
+        self._rows = {}
+        self.usernames = np.empty(capacity, dtype=object)
+        self.counts = np.zeros((capacity, 3), dtype=np.int64)
+        self.updated_at = np.zeros(capacity, dtype=np.float64)
+        self._size = 0
+        self._computed = {}
+        self._orders = {}
+        self.loaded_at = 0.0
+
+    def __len__(self):
+        with self._lock:
+            return self._size
+
+    def _grow(self):
+        capacity = len(self.usernames) * 2
+        self.usernames = np.resize(self.usernames, capacity)
+        self.counts = np.resize(self.counts, (capacity, 3))
+        self.updated_at = np.resize(self.updated_at, capacity)
+
+    def _upsert(self, score: Score):
+        row = self._rows.get(score.username)
+        if row is None:
+            if self._size == len(self.usernames):
+                self._grow()
+            row = self._size
+            self._rows[score.username] = row
+            self.usernames[row] = score.username
+            self._size += 1
+        self.counts[row] = (score.verified, score.questionable, score.debunked)
+        self.updated_at[row] = score.updated_at
+
+    @property
+    def loaded(self) -> bool:
+        """Whether the table has been loaded at least once."""
+        return self.loaded_at > 0
+
+    def update(self, scores: List[Score]):
+        """Adds or replaces the status counts of influencers."""
+        with self._lock:
+            for score in scores:
+                self._upsert(score)
+                if self._pending is not None:
+                    self._pending[score.username] = score
+            self._computed.clear()
+            self._orders.clear()
+
+    def load(self, scores: List[Score]):
+        """Replaces the whole table, e.g. with every score in storage."""
+        with self._lock:
+            self._replace(scores)
+
+    def _replace(self, scores):
+        self._rows.clear()
+        self._size = 0
+        for score in scores:
+            self._upsert(score)
+        self._computed.clear()
+        self._orders.clear()
+        self.loaded_at = time.time()
+
+    def reload(self, get_scores: Callable[[], List[Score]], max_age: float):
+        """
+        Reloads the table if it is older than max_age seconds.
+
+        Only one thread reloads at a time; threads that wait for it find the
+        table fresh and return. Updates made while get_scores runs are kept.
+
+        Args:
+            get_scores: Returns every score, e.g. get_storage().get_scores.
+            max_age: The maximum age of the table in seconds.
+        """
+        if time.time() - self.loaded_at <= max_age:
+            return
+        with self._reload_lock:
+            if time.time() - self.loaded_at <= max_age:
+                return
+            with self._lock:
+                self._pending = {}
+            try:
+                scores = get_scores()
+                with self._lock:
+                    self._replace(scores)
+                    for score in self._pending.values():
+                        self._upsert(score)
+            finally:
+                with self._lock:
+                    self._pending = None
+
+    def _scores(self, weighting: str):
+        computed = self._computed.get(weighting)
+        if computed is None:
+            counts = self.counts[: self._size]
+            computed = trust_scores(
+                counts[:, 0],
+                counts[:, 1],
+                counts[:, 2],
+                WEIGHTINGS[weighting],
+                self.z,
+            )
+            self._computed[weighting] = computed
+        return computed
+
+    def _order(self, weighting: str, sort: str):
+        key = (weighting, sort)
+        order = self._orders.get(key)
+        if order is None:
+            if sort == "total_claims":
+                values = self.counts[: self._size].sum(axis=1)
+            else:
+                scores, lower, _ = self._scores(weighting)
+                values = scores if sort == "trust_score" else lower
+            # Highest first; ties broken by username for a stable ranking
+            order = np.lexsort((self.usernames[: self._size].astype(str), -values))
+            self._orders[key] = order
+        return order
+
+    def rank(
+        self,
+        weighting: str = "default",
+        sort: str = "trust_score",
+        min_claims: int = 0,
+        min_score: float = None,
+        max_score: float = None,
+        offset: int = 0,
+        limit: int = 50,
+    ) -> dict:
+        """
+        Returns a page of the ranked, filtered influencers.
+
+        Args:
+            weighting: The name of the weighting in WEIGHTINGS.
+            sort: One of SORT_KEYS. "lower_bound" ranks by the lower end of the
+                confidence interval, favouring consistently reliable influencers
+                with many claims.
+            min_claims: Leaves out influencers with fewer claims.
+            min_score: Leaves out influencers scoring lower.
+            max_score: Leaves out influencers scoring higher.
+            offset: The number of matching influencers to skip.
+            limit: The maximum number of influencers to return.
+
+        Returns:
+            A dictionary with the number of matching influencers and the page
+            of influencers, each with its overall rank.
+
+        Raises:
+            ValueError: If the weighting or sort key is unknown.
+        """
+        if weighting not in WEIGHTINGS:
+            raise ValueError(f"Unknown weighting: {weighting}")
+        if sort not in SORT_KEYS:
+            raise ValueError(f"Unknown sort key: {sort}")
+
+        with self._lock:
+            scores, lower, upper = self._scores(weighting)
+            order = self._order(weighting, sort)
+            counts = self.counts[: self._size]
+            totals = counts.sum(axis=1)
+
+            mask = totals >= min_claims
+            if min_score is not None:
+                mask &= scores >= min_score
+            if max_score is not None:
+                mask &= scores <= max_score
+            matching = order[mask[order]]
+            ranks = np.flatnonzero(mask[order]) + 1
+            page = slice(offset, offset + limit)
+
+            influencers = [
+                {
+                    "rank": int(rank),
+                    "username": self.usernames[row],
+                    "trust_score": round(float(scores[row]), 1),
+                    "confidence_interval": [
+                        round(float(lower[row]), 1),
+                        round(float(upper[row]), 1),
+                    ],
+                    "total_claims": int(totals[row]),
+                    "verified": int(counts[row, 0]),
+                    "questionable": int(counts[row, 1]),
+                    "debunked": int(counts[row, 2]),
+                    "updated_at": float(self.updated_at[row]),
+                }
+                for row, rank in zip(matching[page], ranks[page])
+            ]
+
+        return {"total": int(len(matching)), "influencers": influencers}
+
+
+_leaderboards = {}
+_leaderboards_lock = threading.Lock()
+
+
+def _shared_leaderboard() -> Leaderboard:
+    key = (
+        current_app.config.get("STORAGE_BACKEND", "sqlite"),
+        current_app.config.get("STORAGE_PATH"),
+    )
+    with _leaderboards_lock:
+        leaderboard = _leaderboards.get(key)
+        if leaderboard is None:
+            leaderboard = Leaderboard(
+                confidence=current_app.config.get("LEADERBOARD_CONFIDENCE", 0.95)
+            )
+            _leaderboards[key] = leaderboard
+    return leaderboard
+
+
+def get_leaderboard() -> Leaderboard:
+    """
+    Returns the shared leaderboard for the current app's storage, reloading it
+    from storage every LEADERBOARD_RELOAD_INTERVAL seconds to pick up scores
+    written by other processes.
+    """
+    leaderboard = _shared_leaderboard()
+    leaderboard.reload(
+        get_storage().get_scores,
+        current_app.config.get("LEADERBOARD_RELOAD_INTERVAL", 300),
+    )
+    return leaderboard
+
+
+def record_score(score: Score):
+    """
+    Updates the leaderboard with a score just written to storage.
+
+    A leaderboard that has not been loaded yet is left alone; the first read
+    loads every score, this one included, so writers such as bulk scoring
+    workers never scan storage.
+    """
+    leaderboard = _shared_leaderboard()
+    if leaderboard.loaded:
+        leaderboard.update([score])
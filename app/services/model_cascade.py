@@ -0,0 +1,177 @@
+import math
+import threading
+from typing import Callable, List, Optional, Type
+from flask import current_app
+from pydantic import BaseModel, ValidationError
+from app.utils.resilience import get_upstream
+
+_clients_lock = threading.Lock()
+
+
+def get_ollama_client(timeout: float):
+    """
+    Returns the current app's ollama client for a timeout.
+
+    Timeouts are rounded up to whole seconds, so the adaptive timeouts share
+    a few clients and their connection pools instead of opening one per call.
+    """
+    import ollama
+
+    timeout = math.ceil(timeout)
+    clients = current_app.extensions.setdefault("ollama_clients", {})
+    with _clients_lock:
+        client = clients.get(timeout)
+        if client is None:
+            client = ollama.Client(timeout=timeout)
+            clients[timeout] = client
+    return client
+
+
+class ModelCascade:
+    """
+    Sends each structured LLM call to the smallest model first and escalates
+    to the next tier only when needed.
+
+    A call escalates when the response fails schema validation, or when the
+    caller's escalate check returns a reason (e.g. a borderline confidence).
+    The last tier's answer is always accepted. Per-tier hit and escalation
+    counts are kept for tuning the thresholds.
+    """
+
+    def __init__(self, name: str, models: List[str]):
+        if not models:
+            raise ValueError("A model cascade needs at least one model")
+        self.name = name
+        self.models = list(models)
+        self._lock = threading.Lock()
+        self._stats = {
+            model: {"calls": 0, "accepted": 0, "escalated": {}} for model in models
+        }
+
+    @property
+    def signature(self) -> str:
+        """Identifies the cascade's models, e.g. for cache keys."""
+        return ">".join(self.models)
+
+    def _record(self, model: str, escalation_reason: str = None):
+        with self._lock:
+            stats = self._stats[model]
+            stats["calls"] += 1
+            if escalation_reason is None:
+                stats["accepted"] += 1
+            else:
+                stats["escalated"][escalation_reason] = (
+                    stats["escalated"].get(escalation_reason, 0) + 1
+                )
+
+    def chat(
+        self,
+        prompt: str,
+        response_model: Type[BaseModel],
+        options: dict = None,
+        escalate: Callable[[BaseModel], Optional[str]] = None,
+    ) -> BaseModel:
+        """
+        Runs a structured chat call through the cascade.
+
+        Args:
+            prompt: The user prompt.
+            response_model: The Pydantic model the response must validate against.
+            options: The ollama generation options.
+            escalate: Returns a reason to escalate a valid response, or None to accept it.
+
+        Returns:
+            The validated response from the first tier that was accepted.
+
+        Raises:
+            ValidationError: If the last tier's response fails validation.
+            CircuitOpenError: If ollama has been failing and is not being called.
+        """
+        for tier, model in enumerate(self.models):
+            last_tier = tier == len(self.models) - 1
+
+            # LLM calls are not hedged. The client applies the timeout, so a
+            # stalled generation is cancelled rather than left running. Each
+            # response model and tier has its own latency, e.g. status-only
+            # calls are far shorter than full verifications
+            response = get_upstream("ollama").call(
+                lambda timeout: get_ollama_client(timeout).chat(
+                    model=model,
+                    messages=[{"role": "user", "content": prompt}],
+                    format=response_model.model_json_schema(),
+                    options=options or {},
+                ),
+                kind=f"{response_model.__name__}:{model}",
+            )
+
+            try:
+                # Parse and validate response using Pydantic
+                parsed = response_model.model_validate_json(
+                    response["message"]["content"]
+                )
+            except ValidationError:
+                self._record(model, "invalid")
+                if last_tier:
+                    raise
+                continue
+
+            reason = escalate(parsed) if escalate and not last_tier else None
+            self._record(model, reason)
+            if reason is None:
+                return parsed
+
+            current_app.logger.info(
+                f"Escalating {self.name} call from {model} ({reason})"
+            )
+
+    def stats(self) -> dict:
+        """
+        Returns per-tier call counts, hit rates and escalation reasons.
+        """
+        with self._lock:
+            tiers = []
+            total_calls = sum(stats["calls"] for stats in self._stats.values())
+            entries = self._stats[self.models[0]]["calls"]
+            for model in self.models:
+                stats = self._stats[model]
+                tiers.append(
+                    {
+                        "model": model,
+                        "calls": stats["calls"],
+                        "accepted": stats["accepted"],
+                        "escalated": dict(stats["escalated"]),
+                        # Share of all cascade entries answered by this tier
+                        "hit_rate": stats["accepted"] / entries if entries else 0.0,
+                    }
+                )
+        return {"name": self.name, "total_calls": total_calls, "tiers": tiers}
+
+
+_cascades = {}
+_cascades_lock = threading.Lock()
+
+
+def get_cascade(name: str, default_model: str) -> ModelCascade:
+    """
+    Returns the shared cascade for a call type, using the MODEL_CASCADE config
+    (comma-separated, smallest model first) or just default_model.
+    """
+    configured = current_app.config.get("MODEL_CASCADE") or ""
+    models = [model.strip() for model in configured.split(",") if model.strip()]
+    models = models or [default_model]
+
+    with _cascades_lock:
+        cascade = _cascades.get((name, tuple(models)))
+        if cascade is None:
+            cascade = ModelCascade(name, models)
+            _cascades[(name, tuple(models))] = cascade
+    return cascade
+
+
+def cascade_stats() -> List[dict]:
+    """
+    Returns the stats of every cascade used so far.
+    """
+    with _cascades_lock:
+        cascades = list(_cascades.values())
+    return [cascade.stats() for cascade in cascades]
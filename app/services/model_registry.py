@@ -0,0 +1,63 @@
+import threading
+from flask import current_app
+
+DEFAULT_SIMILARITY_MODEL = "all-MiniLM-L6-v2"
+
+_models = {}
+_lock = threading.Lock()
+
+
+def get_sentence_transformer(model_name: str = DEFAULT_SIMILARITY_MODEL):
+    """
+    Returns a shared SentenceTransformer instance, loading it on first use.
+
+    sentence_transformers (and with it torch and transformers) is only imported
+    here, so importing the services or creating the app stays cheap.
+
+    Args:
+        model_name: The name of the Sentence Transformer model to load.
+
+    Returns:
+        The loaded SentenceTransformer model.
+    """
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+
+    with _lock:
+        model = _models.get(model_name)
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+
+            current_app.logger.info(f"Loading SentenceTransformer model: {model_name}")
+            model = SentenceTransformer(model_name)
+            _models[model_name] = model
+    return model
+
+
+def preload_models(model_names=(DEFAULT_SIMILARITY_MODEL,)):
+    """
+    Loads the heavy models up front.
+
+    Meant to run in the master process of a pre-forking server (e.g. gunicorn
+    with --preload) so the loaded weights are shared copy-on-write by all
+    forked workers instead of being loaded once per worker.
+
+    Args:
+        model_names: The Sentence Transformer models to load.
+    """
+    for model_name in model_names:
+        get_sentence_transformer(model_name)
+
+    # Import the remaining heavy client libraries so workers inherit them too
+    import ollama  # noqa: F401
+    import pymed  # noqa: F401
+    import tweepy  # noqa: F401
+
+    current_app.logger.info(f"Preloaded models: {', '.join(model_names)}")
+
+
+def clear_models():
+    """Drops all cached models (mainly useful in tests)."""
+    with _lock:
+        _models.clear()
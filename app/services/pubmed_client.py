@@ -0,0 +1,228 @@
+import threading
+import time
+import xml.etree.ElementTree as ET
+from typing import Dict, Iterable, List
+from flask import current_app
+
+EUTILS_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+
+
+class Throttle:
+    """
+    Spaces out requests so that at most one starts every min_interval seconds.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._last_request = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            wait = self._last_request + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            self._last_request = time.monotonic()
+
+
+_throttles = {}
+_throttles_lock = threading.Lock()
+
+
+def get_throttle(api_key: str = None, min_interval: float = None) -> Throttle:
+    """
+    Returns the process-wide NCBI throttle for an API key.
+
+    NCBI's limit applies per API key (or per IP without one), not per client,
+    so every client in the process must share it.
+    """
+    # NCBI allows 3 requests per second without an API key and 10 with one
+    if min_interval is None:
+        min_interval = 0.1 if api_key else 0.34
+    with _throttles_lock:
+        throttle = _throttles.get((api_key, min_interval))
+        if throttle is None:
+            throttle = Throttle(min_interval)
+            _throttles[(api_key, min_interval)] = throttle
+    return throttle
+
+
+class PubMedClient:
+    """
+    Minimal NCBI E-utilities client built for looking up many claims at once.
+
+    Searches run one ESearch per query, then the union of all PMIDs is fetched
+    in a few large EFetch calls whose XML is parsed incrementally, so articles
+    shared between queries are only downloaded and parsed once.
+    """
+
+    def __init__(
+        self,
+        tool: str,
+        email: str,
+        api_key: str = None,
+        base_url: str = EUTILS_BASE_URL,
+        efetch_batch_size: int = 200,
+        session=None,
+        min_interval: float = None,
+        upstream=None,
+    ):
+        import requests
+
+        self.tool = tool
+        self.email = email
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.efetch_batch_size = efetch_batch_size
+        self.session = session or requests.Session()
+
+        self.throttle = get_throttle(api_key, min_interval)
+
+        # Adaptive timeouts, hedged searches and a circuit breaker, if given
+        self.upstream = upstream
+
+    def _params(self, **params) -> dict:
+        params.update({"db": "pubmed", "tool": self.tool, "email": self.email})
+        if self.api_key:
+            params["api_key"] = self.api_key
+        return params
+
+    def esearch(self, query: str, max_results: int = 5) -> List[str]:
+        """
+        Searches PubMed and returns the matching PMIDs in relevance order.
+
+        Args:
+            query: The search query string.
+            max_results: The maximum number of PMIDs to return.
+
+        Returns:
+            A list of PMID strings.
+        """
+
+        def search(timeout):
+            # Hedged duplicates are throttled like any other request
+            self.throttle.wait()
+            response = self.session.get(
+                f"{self.base_url}/esearch.fcgi",
+                params=self._params(term=query, retmax=max_results, retmode="json"),
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            return response.json().get("esearchresult", {}).get("idlist", [])
+
+        return self._call(search, hedge=True)
+
+    def _call(self, fn, hedge=False):
+        if self.upstream is None:
+            return fn(None)
+        return self.upstream.call(fn, hedge=hedge)
+
+    def efetch(self, pmids: Iterable[str]) -> Dict[str, Dict[str, str]]:
+        """
+        Fetches articles by PMID in batches, parsing the XML as it streams in.
+
+        Args:
+            pmids: The PMIDs to fetch.
+
+        Returns:
+            A dictionary mapping each PMID to an article with title, abstract, and URL.
+        """
+        pmids = list(dict.fromkeys(pmids))
+        articles = {}
+
+        for start in range(0, len(pmids), self.efetch_batch_size):
+            batch = pmids[start : start + self.efetch_batch_size]
+
+            def fetch(timeout, batch=batch):
+                self.throttle.wait()
+                # POST keeps long ID lists out of the URL
+                response = self.session.post(
+                    f"{self.base_url}/efetch.fcgi",
+                    data=self._params(id=",".join(batch), retmode="xml"),
+                    stream=True,
+                    timeout=timeout,
+                )
+                response.raise_for_status()
+                response.raw.decode_content = True
+                try:
+                    return self.parse_articles(response.raw)
+                finally:
+                    response.close()
+
+            articles.update(self._call(fetch))
+
+        return articles
+
+    @staticmethod
+    def parse_articles(source) -> Dict[str, Dict[str, str]]:
+        """
+        Incrementally parses a PubmedArticleSet XML document.
+
+        Each article element is cleared once read, so memory use does not grow
+        with the size of the response.
+
+        Args:
+            source: A file-like object or path with the EFetch XML.
+
+        Returns:
+            A dictionary mapping each PMID to an article with title, abstract, and URL.
+        """
+        articles = {}
+        for _, element in ET.iterparse(source, events=("end",)):
+            if element.tag != "PubmedArticle":
+                continue
+
+            pmid = element.findtext("MedlineCitation/PMID")
+            if pmid:
+                title = element.find("MedlineCitation/Article/ArticleTitle")
+                abstract_parts = [
+                    "".join(part.itertext()).strip()
+                    for part in element.findall(
+                        "MedlineCitation/Article/Abstract/AbstractText"
+                    )
+                ]
+                articles[pmid] = {
+                    "title": (
+                        "".join(title.itertext()).strip() if title is not None else ""
+                    ),
+                    "abstract": "\n".join(part for part in abstract_parts if part),
+                    "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/",
+                }
+
+            element.clear()
+
+        return articles
+
+    def search_many(
+        self, queries: Iterable[str], max_results: int = 5
+    ) -> Dict[str, List[Dict[str, str]]]:
+        """
+        Searches PubMed for many queries, fetching every distinct article once.
+
+        Articles shared between queries are the same dictionary objects in the
+        returned lists.
+
+        Args:
+            queries: The search query strings.
+            max_results: The maximum number of articles per query.
+
+        Returns:
+            A dictionary mapping each query to its list of articles, in relevance order.
+
+        Raises:
+            Exception: Any ESearch or EFetch error. A failed search is not
+                reported as a query without articles.
+        """
+        queries = list(dict.fromkeys(queries))
+        pmids_by_query = {query: self.esearch(query, max_results) for query in queries}
+
+        all_pmids = [pmid for pmids in pmids_by_query.values() for pmid in pmids]
+        articles = self.efetch(all_pmids) if all_pmids else {}
+        current_app.logger.info(
+            f"Fetched {len(articles)} distinct PubMed articles for {len(queries)} queries"
+        )
+
+        return {
+            query: [articles[pmid] for pmid in pmids if pmid in articles]
+            for query, pmids in pmids_by_query.items()
+        }
@@ -0,0 +1,448 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+from flask import current_app
+from app.models import Influencer, Report, Score
+from app.utils.json_encoding import dumps
+
+
+def make_etag(report: dict) -> str:
+    """
+    Builds a strong ETag for a report from its canonical JSON form.
+    """
+    payload = dumps(report, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()[:32]
+
+
+def status_value(result: dict) -> str:
+    """
+    Returns the verification status of a result as a plain string.
+    """
+    status = result.get("verification_status", "")
+    # Results fresh from the verification service hold VerificationStatus members
+    return str(getattr(status, "value", status))
+
+
+def count_statuses(verification_results: dict) -> Dict[str, int]:
+    """
+    Counts the verification statuses in a verification results dict.
+    """
+    counts = {"verified": 0, "questionable": 0, "debunked": 0}
+    for result in verification_results.values():
+        status = status_value(result).lower()
+        if status in counts:
+            counts[status] += 1
+    return counts
+
+
+class StorageBackend(ABC):
+    """
+    Interface for persisting influencers, tweets, claims, verifications, scores
+    and the rendered influencer reports.
+    """
+
+    @abstractmethod
+    def save_report(self, username: str, report: dict) -> Report:
+        """Persists a full influencer report and everything it contains."""
+
+    @abstractmethod
+    def append_verifications(
+        self, username: str, verification_results: Dict[str, dict], reset: bool = False
+    ):
+        """
+        Adds verification results for an influencer without a full report,
+        replacing all previous ones when reset is set. Used by streaming analyses.
+        """
+
+    @abstractmethod
+    def save_score(self, score: Score, influencer: Influencer = None):
+        """Persists an influencer's score, and profile if given, without a report."""
+
+    @abstractmethod
+    def delete_report(self, username: str):
+        """
+        Removes an influencer's stored report, e.g. once a streaming analysis
+        has replaced its verifications and score, so it is not served anymore.
+        """
+
+    @abstractmethod
+    def get_report(self, username: str) -> Optional[Report]:
+        """Returns the stored report for an influencer, or None."""
+
+    @abstractmethod
+    def get_influencer(self, username: str) -> Optional[Influencer]:
+        """Returns the stored profile of an influencer, or None."""
+
+    @abstractmethod
+    def get_tweets(self, username: str) -> List[str]:
+        """Returns the stored tweets of an influencer."""
+
+    @abstractmethod
+    def get_verifications(self, username: str) -> Dict[str, dict]:
+        """Returns the stored verification results of an influencer by claim."""
+
+    @abstractmethod
+    def get_scores(self) -> List[Score]:
+        """Returns the stored scores of every influencer."""
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Stores everything in a single SQLite database file.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS influencers (
+            username TEXT PRIMARY KEY,
+            profile_image TEXT,
+            follower_count INTEGER,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS tweets (
+            username TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            text TEXT NOT NULL,
+            PRIMARY KEY (username, position)
+        );
+        CREATE TABLE IF NOT EXISTS claims (
+            username TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            claim TEXT NOT NULL,
+            PRIMARY KEY (username, position)
+        );
+        CREATE TABLE IF NOT EXISTS verifications (
+            username TEXT NOT NULL,
+            claim TEXT NOT NULL,
+            verification_status TEXT,
+            result TEXT NOT NULL,
+            PRIMARY KEY (username, claim)
+        );
+        CREATE TABLE IF NOT EXISTS scores (
+            username TEXT PRIMARY KEY,
+            trust_score INTEGER NOT NULL,
+            total_claims INTEGER NOT NULL,
+            verified INTEGER NOT NULL,
+            questionable INTEGER NOT NULL,
+            debunked INTEGER NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS reports (
+            username TEXT PRIMARY KEY,
+            report TEXT NOT NULL,
+            etag TEXT NOT NULL,
+            updated_at REAL NOT NULL
+        );
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(self.SCHEMA)
+        self._connection.commit()
+
+    def save_report(self, username: str, report: dict) -> Report:
+        now = time.time()
+        etag = make_etag(report)
+        verification_results = report.get("verification_results") or {}
+        counts = count_statuses(verification_results)
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO influencers VALUES (?, ?, ?, ?)",
+                (
+                    username,
+                    report.get("profile_image"),
+                    report.get("follower_count"),
+                    now,
+                ),
+            )
+
+            self._connection.execute(
+                "DELETE FROM tweets WHERE username = ?", (username,)
+            )
+            self._connection.executemany(
+                "INSERT INTO tweets VALUES (?, ?, ?)",
+                [
+                    (username, position, text)
+                    for position, text in enumerate(report.get("tweets") or [])
+                ],
+            )
+
+            self._connection.execute(
+                "DELETE FROM claims WHERE username = ?", (username,)
+            )
+            self._connection.executemany(
+                "INSERT INTO claims VALUES (?, ?, ?)",
+                [
+                    (username, position, claim)
+                    for position, claim in enumerate(report.get("health_claims") or [])
+                ],
+            )
+
+            self._connection.execute(
+                "DELETE FROM verifications WHERE username = ?", (username,)
+            )
+            self._connection.executemany(
+                "INSERT INTO verifications VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        username,
+                        claim,
+                        status_value(result),
+                        dumps(result),
+                    )
+                    for claim, result in verification_results.items()
+                ],
+            )
+
+            self._connection.execute(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    username,
+                    report.get("trust_score", 0),
+                    report.get("total_claims", 0),
+                    counts["verified"],
+                    counts["questionable"],
+                    counts["debunked"],
+                    now,
+                ),
+            )
+
+            self._connection.execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?)",
+                (username, dumps(report), etag, now),
+            )
+
+        return Report(username=username, report=report, etag=etag, updated_at=now)
+
+    def append_verifications(
+        self, username: str, verification_results: Dict[str, dict], reset: bool = False
+    ):
+        with self._lock, self._connection:
+            if reset:
+                self._connection.execute(
+                    "DELETE FROM verifications WHERE username = ?", (username,)
+                )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO verifications VALUES (?, ?, ?, ?)",
+                [
+                    (
+                        username,
+                        claim,
+                        status_value(result),
+                        dumps(result),
+                    )
+                    for claim, result in verification_results.items()
+                ],
+            )
+
+    def save_score(self, score: Score, influencer: Influencer = None):
+        with self._lock, self._connection:
+            if influencer is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO influencers VALUES (?, ?, ?, ?)",
+                    (
+                        influencer.username,
+                        influencer.profile_image,
+                        influencer.follower_count,
+                        score.updated_at,
+                    ),
+                )
+            self._connection.execute(
+                "INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    score.username,
+                    score.trust_score,
+                    score.total_claims,
+                    score.verified,
+                    score.questionable,
+                    score.debunked,
+                    score.updated_at,
+                ),
+            )
+
+    def delete_report(self, username: str):
+        with self._lock, self._connection:
+            self._connection.execute(
+                "DELETE FROM reports WHERE username = ?", (username,)
+            )
+
+    def get_report(self, username: str) -> Optional[Report]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT report, etag, updated_at FROM reports WHERE username = ?",
+                (username,),
+            ).fetchone()
+        if row is None:
+            return None
+        return Report(
+            username=username, report=json.loads(row[0]), etag=row[1], updated_at=row[2]
+        )
+
+    def get_influencer(self, username: str) -> Optional[Influencer]:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT profile_image, follower_count FROM influencers WHERE username = ?",
+                (username,),
+            ).fetchone()
+        if row is None:
+            return None
+        return Influencer(
+            username=username, profile_image=row[0], follower_count=row[1]
+        )
+
+    def get_tweets(self, username: str) -> List[str]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT text FROM tweets WHERE username = ? ORDER BY position",
+                (username,),
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def get_verifications(self, username: str) -> Dict[str, dict]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT claim, result FROM verifications WHERE username = ?",
+                (username,),
+            ).fetchall()
+        return {claim: json.loads(result) for claim, result in rows}
+
+    def get_scores(self) -> List[Score]:
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT username, trust_score, total_claims, verified, questionable, "
+                "debunked, updated_at FROM scores"
+            ).fetchall()
+        return [
+            Score(
+                username=row[0],
+                trust_score=row[1],
+                total_claims=row[2],
+                verified=row[3],
+                questionable=row[4],
+                debunked=row[5],
+                updated_at=row[6],
+            )
+            for row in rows
+        ]
+
+
+class MemoryStorage(StorageBackend):
+    """
+    Keeps everything in process memory. Useful for tests and single-process runs.
+    """
+
+    def __init__(self, path: str = None):
+        self._lock = threading.Lock()
+        self._reports = {}
+        self._scores = {}
+        self._influencers = {}
+        self._verifications = {}
+
+    def save_report(self, username: str, report: dict) -> Report:
+        now = time.time()
+        counts = count_statuses(report.get("verification_results") or {})
+        record = Report(
+            username=username, report=report, etag=make_etag(report), updated_at=now
+        )
+        with self._lock:
+            self._reports[username] = record
+            self._influencers[username] = Influencer(
+                username=username,
+                profile_image=report.get("profile_image"),
+                follower_count=report.get("follower_count"),
+            )
+            self._verifications[username] = dict(
+                report.get("verification_results") or {}
+            )
+            self._scores[username] = Score(
+                username=username,
+                trust_score=report.get("trust_score", 0),
+                total_claims=report.get("total_claims", 0),
+                updated_at=now,
+                **counts,
+            )
+        return record
+
+    def get_report(self, username: str) -> Optional[Report]:
+        with self._lock:
+            return self._reports.get(username)
+
+    def delete_report(self, username: str):
+        with self._lock:
+            self._reports.pop(username, None)
+
+    def append_verifications(
+        self, username: str, verification_results: Dict[str, dict], reset: bool = False
+    ):
+        with self._lock:
+            if reset or username not in self._verifications:
+                self._verifications[username] = {}
+            self._verifications[username].update(verification_results)
+
+    def save_score(self, score: Score, influencer: Influencer = None):
+        with self._lock:
+            if influencer is not None:
+                self._influencers[influencer.username] = influencer
+            self._scores[score.username] = score
+
+    def get_influencer(self, username: str) -> Optional[Influencer]:
+        with self._lock:
+            return self._influencers.get(username)
+
+    def get_tweets(self, username: str) -> List[str]:
+        record = self.get_report(username)
+        return list(record.report.get("tweets") or []) if record else []
+
+    def get_verifications(self, username: str) -> Dict[str, dict]:
+        with self._lock:
+            return dict(self._verifications.get(username) or {})
+
+    def get_scores(self) -> List[Score]:
+        with self._lock:
+            return list(self._scores.values())
+
+
+BACKENDS = {
+    "sqlite": SQLiteStorage,
+    "memory": MemoryStorage,
+}
+
+_storages = {}
+_storages_lock = threading.Lock()
+
+
+def register_backend(name: str, backend_class):
+    """
+    Registers a storage backend class under a name usable in STORAGE_BACKEND.
+    """
+    BACKENDS[name] = backend_class
+
+
+def get_storage() -> StorageBackend:
+    """
+    Returns the shared storage backend configured for the current app.
+    """
+    backend = current_app.config.get("STORAGE_BACKEND", "sqlite")
+    path = current_app.config.get("STORAGE_PATH", "data/verify_influencers.sqlite3")
+
+    with _storages_lock:
+        storage = _storages.get((backend, path))
+        if storage is None:
+            if backend not in BACKENDS:
+                raise ValueError(f"Unknown storage backend: {backend}")
+            storage = BACKENDS[backend](path)
+            _storages[(backend, path)] = storage
+    return storage
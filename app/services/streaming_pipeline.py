@@ -0,0 +1,262 @@
+import queue
+import threading
+import time
+from typing import Callable, Iterable, Iterator
+from flask import current_app
+from app.models import Influencer, Score
+from app.services.analysis_service import InfluencerAnalysisService
+from app.services.twitter_service import TimelineInterruptedError, TwitterService
+from app.services.claim_extraction_service import ClaimExtractionService
+from app.services.claim_verification_service import ClaimVerificationService
+from app.services.claim_index import ClaimIndex, get_claim_index
+from app.services.embedding_service import get_embedding_batcher
+from app.services.storage_service import count_statuses, get_storage
+from app.services.leaderboard import record_score
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+def bounded_stage(
+    app, transform: Callable[[Iterable], Iterable], source: Iterable, buffer_size: int
+) -> Iterator:
+    """
+    Runs a pipeline stage on a background thread, handing its output over
+    through a bounded queue.
+
+    The stage blocks once buffer_size outputs are waiting, which in turn stops
+    it from pulling more input, so backpressure propagates up the pipeline.
+    Closing the returned generator stops the stage and closes its source.
+
+    Args:
+        app: The Flask application the stage runs in.
+        transform: Maps the source iterator to the stage's output iterator.
+        source: The input iterator.
+        buffer_size: The maximum number of outputs waiting to be consumed.
+
+    Yields:
+        The stage's outputs. Exceptions raised by the stage are re-raised here.
+    """
+    buffer = queue.Queue(maxsize=buffer_size)
+    stopped = threading.Event()
+
+    def put(item) -> bool:
+        while not stopped.is_set():
+            try:
+                buffer.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        try:
+            with app.app_context():
+                for output in transform(source):
+                    if not put(output):
+                        break
+        except Exception as e:
+            put(_Failure(e))
+        finally:
+            close = getattr(source, "close", None)
+            if close is not None:
+                close()
+            put(_DONE)
+
+    threading.Thread(target=run, name="pipeline-stage", daemon=True).start()
+
+    try:
+        while True:
+            item = buffer.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+    finally:
+        stopped.set()
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    """Groups an iterator into lists of up to size items."""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+class StreamingAnalysisPipeline:
+    """
+    Analyzes an influencer's timeline as a stream with bounded memory.
+
+    Tweets are paged in from Twitter and flow through extraction, online
+    deduplication and batched verification, each stage on its own thread with
+    at most STREAM_BUFFER_SIZE items in flight between stages. Results are
+    persisted in batches and yielded to the caller as they are produced, so
+    peak memory depends on the buffer and batch sizes rather than on the
+    length of the timeline. Deduplication state grows only with the number
+    of distinct claims.
+    """
+
+    def __init__(self, analysis_service=None):
+        self.analysis_service = analysis_service or InfluencerAnalysisService()
+        self.buffer_size = current_app.config.get("STREAM_BUFFER_SIZE", 32)
+        self.batch_size = current_app.config.get("STREAM_VERIFICATION_BATCH_SIZE", 10)
+        self.max_tweets = current_app.config.get("STREAM_MAX_TWEETS", 3200)
+
+    def run(self, username: str, details: bool = False, persist: bool = True):
+        """
+        Streams the analysis of an influencer's timeline.
+
+        Args:
+            username: The Twitter handle of the influencer (without the @).
+            details: Whether two-phase verification should always generate explanations.
+            persist: Whether verifications and the final score are stored.
+
+        Yields:
+            Event dictionaries: one "influencer" event, a "verification" event
+            per unique claim and a final "summary" event. If paging through
+            the timeline fails, an "error" event replaces the summary, no
+            score is saved and the previously stored verifications are kept.
+            Yields nothing if the influencer could not be found.
+        """
+        app = current_app._get_current_object()
+        twitter_service = TwitterService()
+        user_info = twitter_service.get_user_info(username)
+        if user_info is None:
+            return
+
+        influencer = Influencer(username=username, **user_info)
+        yield {"type": "influencer", **influencer.model_dump()}
+
+        extraction_service = ClaimExtractionService()
+        verification_service = ClaimVerificationService()
+        claim_index = get_claim_index()
+        # Without the shared index, deduplicate against a private in-memory one.
+        # An empty shared index is falsy (it has a length), so test for None
+        dedup_index = (
+            claim_index
+            if claim_index is not None
+            else ClaimIndex(
+                ":memory:",
+                get_embedding_batcher().encode,
+                similarity_threshold=current_app.config.get(
+                    "CLAIM_INDEX_THRESHOLD", 0.8
+                ),
+            )
+        )
+
+        progress = {"tweets": 0, "claims": 0}
+
+        def extract(tweets):
+            for tweet in tweets:
+                progress["tweets"] += 1
+                for claim in extraction_service.extract_health_claims([tweet]):
+                    progress["claims"] += 1
+                    yield claim
+
+        def deduplicate(claims):
+            seen = set()
+            for claim in claims:
+                canonical_id = dedup_index.assign([claim])[0]
+                if canonical_id not in seen:
+                    seen.add(canonical_id)
+                    yield claim
+
+        def verify(claims):
+            for batch in chunked(claims, self.batch_size):
+                if claim_index is not None:
+                    results, _ = self.analysis_service.verify_canonical_claims(
+                        claim_index, verification_service, username, batch, details
+                    )
+                else:
+                    results = self.analysis_service.verify_claims(
+                        verification_service, batch, details
+                    )
+                yield results
+
+        tweets = bounded_stage(
+            app,
+            lambda _: twitter_service.iter_tweets(username, self.max_tweets),
+            (),
+            self.buffer_size,
+        )
+        claims = bounded_stage(app, extract, tweets, self.buffer_size)
+        unique_claims = bounded_stage(app, deduplicate, claims, self.buffer_size)
+        batches = bounded_stage(app, verify, unique_claims, self.buffer_size)
+
+        storage = get_storage() if persist else None
+        counts = {"verified": 0, "questionable": 0, "debunked": 0}
+        total_claims = 0
+        # The stored verifications from before this run, restored if it does
+        # not complete so they keep matching the stored score
+        previous = None
+        completed = False
+        try:
+            for results in batches:
+                if storage is not None:
+                    if previous is None:
+                        previous = storage.get_verifications(username)
+                    storage.append_verifications(
+                        username, results, reset=total_claims == 0
+                    )
+                for status, count in count_statuses(results).items():
+                    counts[status] += count
+                total_claims += len(results)
+
+                for claim, result in results.items():
+                    yield {
+                        "type": "verification",
+                        "claim": claim,
+                        "verification_result": result,
+                    }
+            completed = True
+        except TimelineInterruptedError as e:
+            # A partial timeline must not be scored as if it were complete
+            yield {
+                "type": "error",
+                "error": str(e),
+                "tweets_processed": progress["tweets"],
+            }
+            return
+        finally:
+            batches.close()
+            if previous is not None and not completed:
+                storage.append_verifications(username, previous, reset=True)
+
+        trust_score, total_claims = verification_service.trust_score_from_counts(
+            counts["verified"], counts["debunked"], total_claims
+        )
+        if storage is not None:
+            if total_claims == 0:
+                storage.append_verifications(username, {}, reset=True)
+            score = Score(
+                username=username,
+                trust_score=trust_score,
+                total_claims=total_claims,
+                updated_at=time.time(),
+                **counts,
+            )
+            storage.save_score(score, influencer)
+            # The stored report predates these verifications and this score;
+            # drop it so it is not served (with its old ETag) any longer
+            storage.delete_report(username)
+            record_score(score)
+
+        yield {
+            "type": "summary",
+            "username": username,
+            "tweets_processed": progress["tweets"],
+            "claims_extracted": progress["claims"],
+            "trust_score": trust_score,
+            "total_claims": total_claims,
+            **counts,
+        }
@@ -1,19 +1,69 @@
-import tweepy
 from flask import current_app
-from app import create_app
+from app.utils.resilience import (
+    CircuitOpenError,
+    UpstreamTimeoutError,
+    get_upstream,
+)
+
+TWITTER_API_BASE_URL = "https://api.twitter.com"
+
+
+class TimelineInterruptedError(Exception):
+    """Raised when paging through a user's tweets fails before the end."""
+
+
+def mount_upstream_adapter(session, base_url: str = None, upstream=None):
+    """
+    Routes a requests session's Twitter API calls through an adapter that can
+    redirect them to another base URL and apply the upstream's adaptive timeout.
+
+    tweepy hard-codes the API host and sets no timeout, so this is how the
+    client is pointed at a proxy or a local stand-in server and kept from
+    hanging on a stalled connection.
+    """
+    from requests.adapters import HTTPAdapter
+
+    class UpstreamAdapter(HTTPAdapter):
+        def send(self, request, **kwargs):
+            if base_url and base_url.rstrip("/") != TWITTER_API_BASE_URL:
+                request.url = (
+                    base_url.rstrip("/") + request.url[len(TWITTER_API_BASE_URL) :]
+                )
+            if kwargs.get("timeout") is None and upstream is not None:
+                kwargs["timeout"] = upstream.timeout()
+            return super().send(request, **kwargs)
+
+    session.mount(TWITTER_API_BASE_URL, UpstreamAdapter())
 
 
 class TwitterService:
     def __init__(self):
-        # Use the app's configuration to get the API keys
-        app = create_app()  # Create app context to access config
-        self.api_key = app.config["TWITTER_API_KEY"]
-        self.api_secret = app.config["TWITTER_API_SECRET"]
-        self.bearer_token = app.config["TWITTER_BEARER_TOKEN"]
+        import tweepy
+
+        # Use the current app's configuration to get the API keys
+        self.api_key = current_app.config["TWITTER_API_KEY"]
+        self.api_secret = current_app.config["TWITTER_API_SECRET"]
+        self.bearer_token = current_app.config["TWITTER_BEARER_TOKEN"]
 
         # Initialize the Tweepy client
         self.client = tweepy.Client(bearer_token=self.bearer_token)
 
+        self.upstream = get_upstream("twitter")
+        mount_upstream_adapter(
+            self.client.session,
+            current_app.config.get("TWITTER_API_BASE_URL"),
+            self.upstream,
+        )
+
+    def _lookup(self, fn):
+        import tweepy
+
+        # Lookups are idempotent reads, so slow ones are hedged; a missing
+        # user says nothing about the health of the API
+        return self.upstream.call(
+            lambda timeout: fn(), hedge=True, ignore=(tweepy.NotFound,)
+        )
+
     def get_tweets(self, username: str, num_tweets: int = 50) -> list[str] | None:
         """
         Fetches the most recent tweets from a given user.
@@ -26,9 +76,12 @@ class TwitterService:
             A list of strings, where each string is a tweet.
             Returns None if there's an error.
         """
+        import requests
+        import tweepy
+
         try:
             # The new Twitter v2 API uses user ID instead of screen name
-            user = self.client.get_user(username=username)
+            user = self._lookup(lambda: self.client.get_user(username=username))
             if user.data is None:
                 current_app.logger.error(f"No user found with username '{username}'")
                 return None
@@ -36,10 +89,15 @@ class TwitterService:
 
             current_app.logger.info(f"Fetching {num_tweets} tweets for user {username}")
 
-            response = self.client.get_users_tweets(
-                id=user_id,
-                max_results=num_tweets,
-                exclude=["retweets", "replies"],  # Exclude retweets and replies for now
+            response = self._lookup(
+                lambda: self.client.get_users_tweets(
+                    id=user_id,
+                    max_results=num_tweets,
+                    exclude=[
+                        "retweets",
+                        "replies",
+                    ],  # Exclude retweets and replies for now
+                )
             )
 
             tweets = [tweet.text for tweet in response.data]
@@ -55,6 +113,61 @@ class TwitterService:
         except tweepy.TweepyException as e:
             current_app.logger.error(f"Twitter API error: {e}")
             return None
+        except (CircuitOpenError, UpstreamTimeoutError, requests.RequestException) as e:
+            current_app.logger.error(f"Twitter API unavailable: {e}")
+            return None
+
+    def iter_tweets(self, username: str, max_tweets: int = 3200, page_size: int = 100):
+        """
+        Streams a user's tweets page by page, newest first.
+
+        Only one page is held at a time. Errors are logged like in get_tweets,
+        and then raised so a partial timeline is not mistaken for a whole one.
+
+        Args:
+            username: The Twitter handle of the user (without the @).
+            max_tweets: The maximum number of tweets to yield.
+            page_size: The number of tweets requested per page (5-100).
+
+        Yields:
+            Tweet texts. Nothing if the user does not exist.
+
+        Raises:
+            TimelineInterruptedError: If fetching a page failed, e.g. on a rate limit.
+        """
+        import requests
+        import tweepy
+
+        try:
+            user = self._lookup(lambda: self.client.get_user(username=username))
+            if user.data is None:
+                current_app.logger.error(f"No user found with username '{username}'")
+                return
+
+            current_app.logger.info(
+                f"Streaming up to {max_tweets} tweets for user {username}"
+            )
+            paginator = tweepy.Paginator(
+                self.client.get_users_tweets,
+                id=user.data.id,
+                max_results=min(max(page_size, 5), 100),
+                exclude=["retweets", "replies"],
+            )
+            for tweet in paginator.flatten(limit=max_tweets):
+                yield tweet.text
+
+        except tweepy.TooManyRequests as e:
+            current_app.logger.error(f"Rate limit exceeded: {e}")
+            raise TimelineInterruptedError(f"Rate limit exceeded: {e}") from e
+        except tweepy.NotFound as e:
+            current_app.logger.error(f"User '{username}' not found: {e}")
+            raise TimelineInterruptedError(f"User '{username}' not found") from e
+        except tweepy.TweepyException as e:
+            current_app.logger.error(f"Twitter API error: {e}")
+            raise TimelineInterruptedError(f"Twitter API error: {e}") from e
+        except (CircuitOpenError, UpstreamTimeoutError, requests.RequestException) as e:
+            current_app.logger.error(f"Twitter API unavailable: {e}")
+            raise TimelineInterruptedError(f"Twitter API unavailable: {e}") from e
 
     def get_user_info(self, username: str) -> dict:
         """
@@ -67,8 +180,11 @@ class TwitterService:
             Dictionary containing user information including profile image and follower count
         """
         try:
-            user = self.client.get_user(
-                username=username, user_fields=["profile_image_url", "public_metrics"]
+            user = self._lookup(
+                lambda: self.client.get_user(
+                    username=username,
+                    user_fields=["profile_image_url", "public_metrics"],
+                )
             )
 
             current_app.logger.info(f"User info: {user.data}")
@@ -89,10 +205,13 @@ class TwitterService:
 
 # Example usage (you can test this outside the class for now)
 if __name__ == "__main__":
-    twitter_service = TwitterService()
-    tweets = twitter_service.get_tweets(
-        "hubermanlab", 10
-    )  # Replace with your influencer
+    from app import create_app
+
+    with create_app().app_context():
+        twitter_service = TwitterService()
+        tweets = twitter_service.get_tweets(
+            "hubermanlab", 10
+        )  # Replace with your influencer
 
     if tweets:
         for i, tweet in enumerate(tweets):
@@ -0,0 +1,67 @@
+from unittest.mock import patch
+from app.services.bulk_scoring import run_bulk_scoring
+from app.utils.task_queue import TaskQueue
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    STORAGE_BACKEND = "memory"
+    EXTRACTION_CACHE_PATH = ""
+    CLAIM_INDEX_PATH = ""
+    ANALYSIS_LEASE_PATH = ""
+    BULK_MAX_ATTEMPTS = 2
+    BULK_POLL_INTERVAL = 0.01
+
+
+def test_run_bulk_scoring_retries_and_merges(tmp_path):
+    """Test that failed shards are retried and results merged by username"""
+    attempts = {}
+
+    def score(task):
+        attempts[task.username] = attempts.get(task.username, 0) + 1
+        if task.username == "flaky" and attempts["flaky"] == 1:
+            raise RuntimeError("Rate limited")
+        if task.username == "broken":
+            raise RuntimeError("Unable to fetch tweets")
+        return {"username": task.username, "trust_score": 50}
+
+    with patch("app.services.bulk_scoring.score_task", side_effect=score), patch(
+        "app.services.model_registry.preload_models"
+    ):
+        summary = run_bulk_scoring(
+            ["zed", "flaky", "broken", "alice", "zed"],
+            workers=0,
+            queue_path=str(tmp_path / "queue.sqlite3"),
+            config_path="app.tests.test_bulk_scoring.TestConfig",
+        )
+
+    assert [result["username"] for result in summary["results"]] == [
+        "alice",
+        "flaky",
+        "zed",
+    ]
+    assert attempts == {"alice": 1, "broken": 2, "flaky": 2, "zed": 1}
+    assert summary["failed"][0]["username"] == "broken"
+    assert summary["unfinished"] == 0
+
+
+def test_run_bulk_scoring_ignores_other_jobs(tmp_path):
+    """Test that a job's workers stop once their own job is finished"""
+    queue_path = str(tmp_path / "queue.sqlite3")
+    TaskQueue(queue_path).enqueue("other-job", ["bob"])
+
+    with patch(
+        "app.services.bulk_scoring.score_task",
+        side_effect=lambda task: {"username": task.username},
+    ) as score, patch("app.services.model_registry.preload_models"):
+        summary = run_bulk_scoring(
+            ["alice"],
+            workers=0,
+            queue_path=queue_path,
+            config_path="app.tests.test_bulk_scoring.TestConfig",
+        )
+
+    assert [call.args[0].username for call in score.call_args_list] == ["alice"]
+    assert summary["results"] == [{"username": "alice"}]
+    assert TaskQueue(queue_path).unfinished("other-job") == 1
@@ -5,6 +5,7 @@ from app.services.claim_extraction_service import (
     ClaimExtractionService,
     HealthClaimsResponse,
 )
+from app.services.extraction_cache import ExtractionCache
 
 
 @pytest.fixture
@@ -58,7 +59,7 @@ def test_extract_health_claims_successful(app, service, mock_ollama_response):
     tweets = ["Exercise daily reduces heart disease risk by 30%"]
 
     with app.app_context():
-        with patch("ollama.chat", return_value=mock_ollama_response):
+        with patch("ollama.Client.chat", return_value=mock_ollama_response):
             results = service.extract_health_claims(tweets)
 
     assert len(results) == 1
@@ -92,7 +93,7 @@ def test_extract_health_claims_filters_low_confidence(app, service):
     tweets = ["Maybe exercise is good for you"]
 
     with app.app_context():
-        with patch("ollama.chat", return_value=low_confidence_response):
+        with patch("ollama.Client.chat", return_value=low_confidence_response):
             results = service.extract_health_claims(tweets)
 
     assert len(results) == 0
@@ -103,7 +104,7 @@ def test_extract_health_claims_handles_error(app, service, mock_app_context):
     tweets = ["Some tweet"]
 
     with app.app_context():
-        with patch("ollama.chat", side_effect=Exception("API Error")):
+        with patch("ollama.Client.chat", side_effect=Exception("API Error")):
             results = service.extract_health_claims(tweets)
 
     assert len(results) == 0
@@ -119,7 +120,73 @@ def test_extract_health_claims_multiple_tweets(app, service, mock_ollama_respons
     ]
 
     with app.app_context():
-        with patch("ollama.chat", return_value=mock_ollama_response):
+        with patch("ollama.Client.chat", return_value=mock_ollama_response):
             results = service.extract_health_claims(tweets)
 
     assert len(results) > 0
+
+
+@pytest.fixture
+def cached_service(mock_app_context, tmp_path):
+    """Create ClaimExtractionService instance backed by a temporary cache"""
+    cache = ExtractionCache(str(tmp_path / "extraction_cache.sqlite3"))
+    return ClaimExtractionService(cache=cache)
+
+
+@pytest.fixture
+def mixed_confidence_response():
+    """Mock ollama response with claims on both sides of the cutoff"""
+    return {
+        "message": {
+            "content": """
+            {
+                "claims": [
+                    {"claim": "Exercise reduces heart disease risk", "confidence": 0.9},
+                    {"claim": "Running improves mood", "confidence": 0.6}
+                ]
+            }
+            """
+        }
+    }
+
+
+def test_extraction_cache_avoids_repeat_llm_calls(
+    app, cached_service, mixed_confidence_response
+):
+    """Test that identical tweets are only sent to the model once"""
+    tweets = ["Exercise daily reduces heart disease risk by 30%"]
+
+    with app.app_context():
+        with patch("ollama.Client.chat", return_value=mixed_confidence_response) as chat:
+            first = cached_service.extract_health_claims(tweets)
+            second = cached_service.extract_health_claims(tweets)
+
+    assert chat.call_count == 1
+    assert first == second == ["Exercise reduces heart disease risk"]
+
+
+def test_extraction_cache_keeps_sub_threshold_claims(
+    app, cached_service, mixed_confidence_response
+):
+    """Test that changing the cutoff reuses the cached response"""
+    tweets = ["Exercise daily reduces heart disease risk by 30%"]
+
+    with app.app_context():
+        with patch("ollama.Client.chat", return_value=mixed_confidence_response) as chat:
+            cached_service.extract_health_claims(tweets)
+            results = cached_service.extract_health_claims(
+                tweets, confidence_threshold=0.5
+            )
+
+    assert chat.call_count == 1
+    assert "Running improves mood" in results
+
+
+def test_extraction_cache_key_includes_call_parameters():
+    """Test that the cache key changes with model, prompt version and temperature"""
+    base = ExtractionCache.make_key("tweet", "llama3.2:3b", "1", 0.1)
+
+    assert base == ExtractionCache.make_key("tweet", "llama3.2:3b", "1", 0.1)
+    assert base != ExtractionCache.make_key("tweet", "llama3.2:1b", "1", 0.1)
+    assert base != ExtractionCache.make_key("tweet", "llama3.2:3b", "2", 0.1)
+    assert base != ExtractionCache.make_key("tweet", "llama3.2:3b", "1", 0.2)
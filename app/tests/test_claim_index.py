@@ -0,0 +1,233 @@
+import numpy as np
+import pytest
+from unittest.mock import Mock
+from flask import Flask
+from app.services.analysis_service import InfluencerAnalysisService
+from app.services.claim_index import ClaimIndex
+
+SUNLIGHT = "Sunlight boosts vitamin D"
+MORNING_SUN = "Morning sun raises vitamin D levels"
+COLD_SHOWERS = "Cold showers increase dopamine"
+SUGAR = "Sugar causes hyperactivity"
+
+VECTORS = {
+    SUNLIGHT: [1.0, 0.0, 0.0],
+    MORNING_SUN: [0.95, 0.3, 0.0],
+    COLD_SHOWERS: [0.0, 1.0, 0.0],
+    SUGAR: [0.0, 0.0, 1.0],
+}
+
+
+class FakeEncoder:
+    """Embeds the known claims as fixed normalized vectors"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        vectors = np.array([VECTORS[text] for text in texts], dtype=np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.fixture
+def encoder():
+    return FakeEncoder()
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return str(tmp_path / "claim_index.sqlite3")
+
+
+@pytest.fixture
+def index(index_path, encoder):
+    return ClaimIndex(index_path, encoder, similarity_threshold=0.8)
+
+
+def test_assign_groups_similar_claims(index):
+    """Test that paraphrases share a canonical id and unrelated claims do not"""
+    ids = index.assign([SUNLIGHT, COLD_SHOWERS, MORNING_SUN])
+
+    assert ids[0] == ids[2]
+    assert ids[0] != ids[1]
+    assert len(index) == 2
+
+
+def test_assign_reuses_known_claims(index, encoder):
+    """Test that claims already in the index are not encoded again"""
+    first = index.assign([SUNLIGHT, COLD_SHOWERS])
+    second = index.assign(["  sunlight boosts vitamin d", COLD_SHOWERS])
+
+    assert first == second
+    assert encoder.calls == [[SUNLIGHT, COLD_SHOWERS]]
+
+
+def test_index_persists_across_instances(index, index_path, encoder):
+    """Test that clusters are reloaded from the database"""
+    sunlight_id = index.assign([SUNLIGHT])[0]
+
+    reopened = ClaimIndex(index_path, encoder, similarity_threshold=0.8)
+
+    assert reopened.assign([MORNING_SUN]) == [sunlight_id]
+
+
+def test_merge_and_split(index):
+    """Test that clusters can be merged and split again"""
+    sunlight_id, showers_id = index.assign([SUNLIGHT, COLD_SHOWERS])
+
+    index.merge(sunlight_id, showers_id)
+    assert len(index) == 1
+    assert index.members(sunlight_id) == [SUNLIGHT, COLD_SHOWERS]
+
+    new_id = index.split(sunlight_id, [COLD_SHOWERS])
+    assert index.members(new_id) == [COLD_SHOWERS]
+    assert index.members(sunlight_id) == [SUNLIGHT]
+    assert index.assign([COLD_SHOWERS]) == [new_id]
+
+
+def test_split_must_leave_members(index):
+    """Test that a split cannot empty a cluster"""
+    sunlight_id = index.assign([SUNLIGHT])[0]
+
+    with pytest.raises(ValueError):
+        index.split(sunlight_id, [SUNLIGHT])
+
+
+def test_merge_candidates(index_path, encoder):
+    """Test that clusters with similar centroids are proposed for merging"""
+    strict = ClaimIndex(index_path, encoder, similarity_threshold=0.99)
+    sunlight_id, morning_id, _ = strict.assign([SUNLIGHT, MORNING_SUN, SUGAR])
+
+    assert sunlight_id != morning_id
+    assert strict.merge_candidates() == []
+    assert strict.merge_candidates(0.9) == [
+        (sunlight_id, morning_id, pytest.approx(0.954, abs=0.01))
+    ]
+
+
+def test_cluster_stats(index):
+    """Test that mentions and influencers are counted per canonical claim"""
+    sunlight_id = index.assign([SUNLIGHT, SUNLIGHT], username="alice")[0]
+    index.assign([MORNING_SUN, COLD_SHOWERS], username="bob")
+    # Re-analyzing an influencer replaces its mention counts
+    index.assign([MORNING_SUN], username="bob")
+
+    stats = index.cluster_stats(sunlight_id)
+
+    assert stats["size"] == 2
+    assert stats["mentions"] == 3
+    assert stats["influencers"] == 2
+    assert index.top_clusters()[0]["id"] == sunlight_id
+
+
+def test_verifications_are_stored_per_canonical_claim(index):
+    """Test that verifications are reused until they expire"""
+    sunlight_id = index.assign([SUNLIGHT])[0]
+    index.record_verification(sunlight_id, {"verification_status": "Verified"})
+
+    assert index.get_verifications([sunlight_id]) == {
+        sunlight_id: {"verification_status": "Verified"}
+    }
+    assert index.get_verifications([sunlight_id], max_age=-1) == {}
+    assert index.cluster_stats(sunlight_id)["verification_status"] == "Verified"
+
+
+def test_analysis_verifies_once_per_canonical_claim(index):
+    """Test that analyses share verifications of the same canonical claim"""
+    app = Flask(__name__)
+    app.logger = Mock()
+    service = InfluencerAnalysisService()
+    verified = {"verification_status": "Verified"}
+
+    with app.app_context():
+        service.verify_claims = Mock(
+            side_effect=lambda _, claims, details: {claim: verified for claim in claims}
+        )
+        first, canonical = service.verify_canonical_claims(
+            index, Mock(), "alice", [SUNLIGHT, MORNING_SUN, COLD_SHOWERS]
+        )
+        second, _ = service.verify_canonical_claims(
+            index, Mock(), "bob", [MORNING_SUN, COLD_SHOWERS]
+        )
+
+    assert service.verify_claims.call_count == 1
+    assert set(first) == {SUNLIGHT, COLD_SHOWERS}
+    assert canonical[SUNLIGHT] == canonical[MORNING_SUN]
+    assert second == {MORNING_SUN: verified, COLD_SHOWERS: verified}
+
+
+def test_instances_see_each_others_clusters(index_path, encoder):
+    """Test that processes sharing the file reload changed centroids"""
+    first = ClaimIndex(index_path, encoder, similarity_threshold=0.8)
+    second = ClaimIndex(index_path, encoder, similarity_threshold=0.8)
+
+    sunlight_id = first.assign([SUNLIGHT])[0]
+    assert second.assign([MORNING_SUN]) == [sunlight_id]
+
+    # A cluster merged away by the other instance is not used any more
+    showers_id = second.assign([COLD_SHOWERS])[0]
+    first.merge(sunlight_id, showers_id)
+    assert second.assign([COLD_SHOWERS]) == [sunlight_id]
+    assert len(second) == 1
+
+
+def test_invalid_merge_changes_nothing(index, index_path, encoder):
+    """Test that merges of unknown or identical clusters are rejected and rolled back"""
+    sunlight_id, showers_id = index.assign([SUNLIGHT, COLD_SHOWERS])
+
+    with pytest.raises(ValueError):
+        index.merge(999, sunlight_id)
+    with pytest.raises(ValueError):
+        index.merge(sunlight_id, sunlight_id)
+    with pytest.raises(ValueError):
+        index.split(999, [SUNLIGHT])
+
+    # Nothing was left pending for the next commit to persist
+    index.record_verification(showers_id, {"verification_status": "Verified"})
+    reopened = ClaimIndex(index_path, encoder, similarity_threshold=0.8)
+    assert len(reopened) == 2
+    assert reopened.members(sunlight_id) == [SUNLIGHT]
+
+
+def test_fallback_verifications_are_not_reused(index):
+    """Test that failed verifications are not recorded for the canonical claim"""
+    app = Flask(__name__)
+    app.logger = Mock()
+    service = InfluencerAnalysisService()
+    failed = {"verification_status": "Questionable", "fallback": True}
+
+    with app.app_context():
+        service.verify_claims = Mock(
+            side_effect=lambda _, claims, details: {claim: failed for claim in claims}
+        )
+        service.verify_canonical_claims(index, Mock(), "alice", [SUNLIGHT])
+        service.verify_canonical_claims(index, Mock(), "bob", [SUNLIGHT])
+
+    assert service.verify_claims.call_count == 2
+    assert index.get_verifications(index.assign([SUNLIGHT])) == {}
+
+
+def test_verifications_during_pubmed_outage_are_not_recorded(index):
+    """Test that claims PubMed could not be searched for are not cached"""
+    from unittest.mock import patch
+    from app.services.claim_verification_service import ClaimVerificationService
+
+    app = Flask(__name__)
+    app.logger = Mock()
+
+    with app.app_context(), patch("pymed.PubMed"), patch(
+        "sentence_transformers.SentenceTransformer"
+    ):
+        verifier = ClaimVerificationService()
+        verifier.pubmed.query.side_effect = RuntimeError("503 Service Unavailable")
+        with patch.object(
+            verifier.pubmed_client, "search_many", side_effect=RuntimeError("503")
+        ), patch("ollama.Client.chat") as chat:
+            results, _ = InfluencerAnalysisService().verify_canonical_claims(
+                index, verifier, "alice", [SUNLIGHT, COLD_SHOWERS]
+            )
+
+    chat.assert_not_called()
+    assert all(result["fallback"] for result in results.values())
+    assert index.get_verifications(index.assign([SUNLIGHT, COLD_SHOWERS])) == {}
@@ -1,4 +1,6 @@
+import json
 import pytest
+import torch
 from unittest.mock import Mock, patch, MagicMock
 from flask import Flask
 from app.services.claim_verification_service import ClaimVerificationService
@@ -118,3 +120,277 @@ def test_calculate_trust_score(app, service):
 
     assert 0 <= score <= 100
     assert total_claims == 3
+
+
+@pytest.fixture
+def pubmed_results():
+    """PubMed articles shared by a cluster of claims"""
+    return [
+        {
+            "title": "Test Article",
+            "abstract": "This is a test abstract about exercise and health.",
+            "url": "https://pubmed.ncbi.nlm.nih.gov/12345/",
+        }
+    ]
+
+
+def verification_result(status):
+    """Build a verification result as returned by the model"""
+    return {
+        "verification_status": status,
+        "explanation": "Test explanation",
+        "supporting_points": [],
+        "contradicting_points": [],
+        "pubmed_results": [],
+    }
+
+
+def batch_response(*statuses):
+    """Build a mocked ollama response for a batched verification call"""
+    results = [verification_result(status) for status in statuses]
+    return {"message": {"content": json.dumps({"results": results})}}
+
+
+def single_response(status):
+    """Build a mocked ollama response for a single verification call"""
+    return {"message": {"content": json.dumps(verification_result(status))}}
+
+
+def test_cluster_claims(app, service):
+    """Test that similar claims share a cluster"""
+    claims = ["Exercise helps the heart", "Workouts help the heart", "Sugar is bad"]
+    similarities = torch.tensor([[1.0, 0.9, 0.1], [0.9, 1.0, 0.1], [0.1, 0.1, 1.0]])
+
+    with app.app_context():
+        with patch(
+            "sentence_transformers.util.pytorch_cos_sim", return_value=similarities
+        ):
+            clusters = service.cluster_claims(claims)
+
+    assert clusters == [claims[:2], claims[2:]]
+
+
+def test_verify_claims_batch_single_call_per_cluster(app, service, pubmed_results):
+    """Test that a cluster of claims is verified in one LLM call"""
+    claims = ["Exercise helps the heart", "Workouts help the heart"]
+
+    with app.app_context():
+        with patch.object(service, "cluster_claims", return_value=[claims]):
+            with patch.object(
+                service, "search_pubmed", return_value=pubmed_results
+            ) as search:
+                with patch(
+                    "ollama.Client.chat",
+                    return_value=batch_response("Verified", "Questionable"),
+                ) as chat:
+                    results = service.verify_claims_batch(claims)
+
+    assert search.call_count == 1
+    assert chat.call_count == 1
+    assert results[claims[0]]["verification_status"] == "Verified"
+    assert results[claims[1]]["verification_status"] == "Questionable"
+    assert results[claims[1]]["pubmed_results"] == pubmed_results
+
+
+def test_verify_claims_batch_falls_back_per_claim(app, service, pubmed_results):
+    """Test that a mismatched batched response falls back to per-claim calls"""
+    claims = ["Exercise helps the heart", "Workouts help the heart"]
+    responses = [
+        batch_response("Verified"),  # One result for two claims
+        single_response("Verified"),
+        single_response("Debunked"),
+    ]
+
+    with app.app_context():
+        with patch.object(service, "cluster_claims", return_value=[claims]):
+            with patch.object(service, "search_pubmed", return_value=pubmed_results):
+                with patch("ollama.Client.chat", side_effect=responses) as chat:
+                    results = service.verify_claims_batch(claims)
+
+    assert chat.call_count == 3
+    assert results[claims[0]]["verification_status"] == "Verified"
+    assert results[claims[1]]["verification_status"] == "Debunked"
+
+
+def test_verify_claims_batch_searches_only_cluster_leaders(
+    app, service, pubmed_results
+):
+    """Test that a batched search looks up one claim per cluster"""
+    claims = ["Exercise helps the heart", "Workouts help the heart", "Sugar is bad"]
+
+    with app.app_context():
+        with patch.object(
+            service, "cluster_claims", return_value=[claims[:2], claims[2:]]
+        ):
+            with patch.object(
+                service,
+                "search_pubmed_many",
+                return_value={claims[0]: pubmed_results, claims[2]: pubmed_results},
+            ) as search_many:
+                with patch("ollama.Client.chat") as chat:
+                    chat.side_effect = [
+                        batch_response("Verified", "Verified"),
+                        single_response("Debunked"),
+                    ]
+                    results = service.verify_claims_batch(claims, batch_search=True)
+
+    search_many.assert_called_once_with([claims[0], claims[2]], 5)
+    assert results[claims[1]]["pubmed_results"] == pubmed_results
+    assert results[claims[2]]["verification_status"] == "Debunked"
+
+
+def status_response(status, confidence):
+    """Build a mocked ollama response for a status-only verification call"""
+    return {
+        "message": {
+            "content": json.dumps(
+                {"verification_status": status, "confidence": confidence}
+            )
+        }
+    }
+
+
+def test_verify_claim_status_skips_details_when_confident(app, service, pubmed_results):
+    """Test that a confident status does not trigger the full explanation"""
+    with app.app_context():
+        with patch.object(service, "search_pubmed", return_value=pubmed_results):
+            with patch(
+                "ollama.Client.chat", return_value=status_response("Verified", 0.95)
+            ) as chat:
+                result = service.verify_claim_status("Exercise is good for health")
+
+    assert chat.call_count == 1
+    assert result["verification_status"] == "Verified"
+    assert result["confidence"] == 0.95
+    assert result["details_available"] is False
+    assert result["pubmed_results"] == pubmed_results
+
+
+def test_verify_claim_status_generates_details_when_unsure(
+    app, service, pubmed_results
+):
+    """Test that a low-confidence status escalates to the full verification"""
+    responses = [status_response("Verified", 0.4), single_response("Questionable")]
+
+    with app.app_context():
+        with patch.object(service, "search_pubmed", return_value=pubmed_results):
+            with patch("ollama.Client.chat", side_effect=responses) as chat:
+                result = service.verify_claim_status("Exercise is good for health")
+
+    assert chat.call_count == 2
+    assert result["verification_status"] == "Questionable"
+    # The status-only confidence was for "Verified"
+    assert result["confidence"] is None
+    assert result["details_available"] is True
+
+
+def test_verify_claim_status_details_requested(app, service, pubmed_results):
+    """Test that details are generated when the caller asks for them"""
+    responses = [status_response("Verified", 0.95), single_response("Verified")]
+
+    with app.app_context():
+        with patch.object(service, "search_pubmed", return_value=pubmed_results):
+            with patch("ollama.Client.chat", side_effect=responses) as chat:
+                result = service.verify_claim_status(
+                    "Exercise is good for health", details=True
+                )
+
+    assert chat.call_count == 2
+    assert 'assessed as "Verified"' in chat.call_args.kwargs["messages"][0]["content"]
+    assert result["verification_status"] == "Verified"
+    assert result["confidence"] == 0.95
+    assert result["explanation"] == "Test explanation"
+    assert result["details_available"] is True
+
+
+def test_verify_claim_status_escalates_unsupported_verdict(app, pubmed_results):
+    """Test that a verdict unsupported by similar articles goes to a larger model"""
+    app.config["MODEL_CASCADE"] = "small,large"
+    app.logger = Mock()
+    responses = [
+        status_response("Verified", 0.95),
+        status_response("Questionable", 0.9),
+    ]
+
+    with app.app_context():
+        with patch("pymed.PubMed"):
+            service = ClaimVerificationService()
+        with patch.object(service, "search_pubmed", return_value=pubmed_results):
+            with patch.object(service, "calculate_similarity", return_value=0.1):
+                with patch("ollama.Client.chat", side_effect=responses) as chat:
+                    result = service.verify_claim_status("Exercise is good for health")
+
+    assert [call.kwargs["model"] for call in chat.call_args_list] == ["small", "large"]
+    assert result["verification_status"] == "Questionable"
+
+
+def test_verify_claim_fails_fast_when_llm_circuit_open(app, service, pubmed_results):
+    """Test that an open circuit returns the questionable fallback without calling ollama"""
+    from app.utils.resilience import get_upstream
+
+    with app.app_context():
+        breaker = get_upstream("ollama").breaker
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        with patch("ollama.Client.chat") as chat:
+            result = service.verify_claim(
+                "Exercise is good", pubmed_results=pubmed_results
+            )
+
+    chat.assert_not_called()
+    assert result["verification_status"] == "Questionable"
+    assert result["fallback"] is True
+    assert result["pubmed_results"] == pubmed_results
+
+
+def test_search_pubmed_many_falls_back_per_claim(app, service, pubmed_results):
+    """Test that a failed batched lookup searches each claim separately"""
+    with app.app_context():
+        with patch.object(
+            service.pubmed_client, "search_many", side_effect=RuntimeError("EFetch")
+        ):
+            with patch.object(
+                service, "search_pubmed", return_value=pubmed_results
+            ) as search:
+                results = service.search_pubmed_many(["Claim A", "Claim B"])
+
+    assert search.call_count == 2
+    assert results == {"Claim A": pubmed_results, "Claim B": pubmed_results}
+
+
+def test_failed_searches_fall_back_instead_of_finding_nothing(app, service):
+    """Test that a PubMed outage never reads as a claim without research"""
+    with app.app_context():
+        with patch.object(
+            service.pubmed_client, "search_many", side_effect=RuntimeError("429")
+        ):
+            with patch.object(service.pubmed, "query", side_effect=RuntimeError("429")):
+                results = service.search_pubmed_many(["Claim A"])
+                result = service.verify_claim("Claim A")
+
+    assert results == {}
+    assert result["fallback"] is True
+    assert result["explanation"] == "Research articles are temporarily unavailable"
+
+
+def test_verify_claims_fail_fast_when_pubmed_circuit_open(app, service):
+    """Test that an open PubMed circuit gives fallbacks without any request"""
+    from app.utils.resilience import get_upstream
+
+    with app.app_context():
+        breaker = get_upstream("pubmed").breaker
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        with patch.object(service.pubmed_client.session, "get") as get:
+            with patch("ollama.Client.chat") as chat:
+                results = service.search_pubmed_many(["Claim A"])
+                result = service.verify_claim("Claim A")
+
+    get.assert_not_called()
+    service.pubmed.query.assert_not_called()
+    chat.assert_not_called()
+    assert results == {}
+    assert result["verification_status"] == "Questionable"
+    assert result["fallback"] is True
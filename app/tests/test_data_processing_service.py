@@ -0,0 +1,25 @@
+import numpy as np
+from unittest.mock import Mock, patch
+from flask import Flask
+from app.services.data_processing_service import DataProcessingService
+
+
+def test_remove_duplicate_claims_encodes_claims_once():
+    """Test that batched deduplication encodes every claim in one call"""
+    app = Flask(__name__)
+    app.logger = Mock()
+    app.config["EMBEDDING_BATCHING"] = True
+    claims = ["Exercise helps", "Workouts help", "Sugar is bad"]
+    embeddings = np.array([[1.0, 0.0], [0.9, 0.1], [0.0, 1.0]])
+    embeddings /= np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+    with app.app_context(), patch(
+        "app.services.data_processing_service.get_sentence_transformer"
+    ), patch(
+        "app.services.data_processing_service.get_embedding_batcher"
+    ) as get_batcher:
+        get_batcher.return_value.encode.return_value = embeddings
+        unique = DataProcessingService().remove_duplicate_claims(claims)
+
+    get_batcher.return_value.encode.assert_called_once_with(claims)
+    assert unique == ["Exercise helps", "Sugar is bad"]
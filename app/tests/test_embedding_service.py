@@ -0,0 +1,87 @@
+import threading
+import numpy as np
+import pytest
+from app.services.embedding_service import EmbeddingBatcher
+
+
+class FakeModel:
+    """Sentence model stand-in that embeds a text as its length"""
+
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kwargs):
+        self.calls.append(list(texts))
+        return np.array([[float(len(text)), 1.0] for text in texts])
+
+
+@pytest.fixture
+def model():
+    return FakeModel()
+
+
+def test_encode_returns_rows_per_text(model):
+    """Test that each caller gets its own slice of the batch"""
+    batcher = EmbeddingBatcher(model, max_batch_size=8, max_wait_ms=1)
+
+    embeddings = batcher.encode(["a", "abc"])
+
+    assert embeddings.shape == (2, 2)
+    assert embeddings[:, 0].tolist() == [1.0, 3.0]
+
+
+def test_concurrent_requests_share_batches(model):
+    """Test that concurrent callers are coalesced into few model calls"""
+    batcher = EmbeddingBatcher(model, max_batch_size=64, max_wait_ms=50)
+    results = {}
+
+    def worker(i):
+        results[i] = batcher.encode(["x" * i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(1, 21)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(model.calls) < 20
+    assert all(results[i][0][0] == float(i) for i in results)
+
+    metrics = batcher.metrics()
+    assert metrics["requests"] == 20
+    assert metrics["texts"] == 20
+    assert metrics["avg_batch_size"] > 1
+
+
+def test_batch_flushes_at_max_size(model):
+    """Test that a full batch is encoded without waiting for the deadline"""
+    batcher = EmbeddingBatcher(model, max_batch_size=2, max_wait_ms=10000)
+
+    embeddings = batcher.submit(["a", "b"]).result(timeout=1)
+
+    assert len(embeddings) == 2
+
+
+class FailingModel:
+    def encode(self, texts, **kwargs):
+        raise RuntimeError("Encoding failed")
+
+
+def test_model_errors_propagate():
+    """Test that a failed encode fails every waiting future"""
+    batcher = EmbeddingBatcher(FailingModel(), max_batch_size=8, max_wait_ms=1)
+
+    with pytest.raises(RuntimeError):
+        batcher.encode(["a"])
+
+
+def test_cancelled_request_does_not_stop_the_worker(model):
+    """Test that a future cancelled by its caller is skipped"""
+    batcher = EmbeddingBatcher(model, max_batch_size=64, max_wait_ms=50)
+
+    cancelled = batcher.submit(["a"])
+    assert cancelled.cancel()
+    embeddings = batcher.submit(["abc"]).result(timeout=1)
+
+    assert embeddings[0][0] == 3.0
+    assert batcher.encode(["ab"])[0][0] == 2.0
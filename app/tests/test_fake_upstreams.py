@@ -0,0 +1,123 @@
+import pytest
+from unittest.mock import Mock
+from flask import Flask
+from app.services.claim_extraction_service import HealthClaimsResponse
+from app.services.claim_verification_service import (
+    BatchVerificationResponse,
+    VerificationResponse,
+    VerificationStatusResponse,
+)
+from app.services.pubmed_client import PubMedClient
+from app.services.twitter_service import TwitterService
+from loadtest.fake_upstreams import (
+    FakeEutils,
+    FakeTwitter,
+    LatencyModel,
+    UpstreamBehavior,
+    sample_from_schema,
+)
+from loadtest.load_generator import LoadTestResult
+
+
+@pytest.fixture
+def app():
+    """Create a Flask app for testing"""
+    app = Flask(__name__)
+    app.logger = Mock()
+    return app
+
+
+@pytest.fixture
+def twitter():
+    upstream = FakeTwitter().start()
+    yield upstream
+    upstream.stop()
+
+
+@pytest.fixture
+def eutils():
+    upstream = FakeEutils().start()
+    yield upstream
+    upstream.stop()
+
+
+@pytest.mark.parametrize(
+    "model",
+    [
+        HealthClaimsResponse,
+        VerificationResponse,
+        VerificationStatusResponse,
+        BatchVerificationResponse,
+    ],
+)
+def test_sample_from_schema_validates(model):
+    """Test that simulated LLM output matches the services' schemas"""
+    model.model_validate(sample_from_schema(model.model_json_schema()))
+
+
+def test_latency_model_parse():
+    assert LatencyModel.parse("fixed:50").sample(None) == 0.05
+    assert LatencyModel.parse("lognormal:800:0.5").params == (800.0, 0.5)
+
+
+def test_twitter_service_against_fake(app, twitter):
+    """Test that TwitterService can be pointed at the fake Twitter API"""
+    app.config.update(
+        TWITTER_API_KEY=None,
+        TWITTER_API_SECRET=None,
+        TWITTER_BEARER_TOKEN="test",
+        TWITTER_API_BASE_URL=twitter.url,
+    )
+
+    with app.app_context():
+        service = TwitterService()
+        tweets = service.get_tweets("drhealth", 5)
+        user_info = service.get_user_info("drhealth")
+
+    assert len(tweets) == 5
+    assert user_info["follower_count"] >= 0
+    assert twitter.stats["requests"] == 3
+
+
+def test_twitter_rate_limit_injection(app):
+    """Test that injected 429s surface as a failed fetch"""
+    twitter = FakeTwitter(UpstreamBehavior(rate_limit_rate=1.0)).start()
+    app.config.update(
+        TWITTER_API_KEY=None,
+        TWITTER_API_SECRET=None,
+        TWITTER_BEARER_TOKEN="test",
+        TWITTER_API_BASE_URL=twitter.url,
+    )
+
+    try:
+        with app.app_context():
+            tweets = TwitterService().get_tweets("drhealth", 5)
+    finally:
+        twitter.stop()
+
+    assert tweets is None
+    assert twitter.stats["rate_limited"] == 1
+
+
+def test_pubmed_client_against_fake(app, eutils):
+    """Test a batched PubMed search against the fake E-utilities"""
+    client = PubMedClient(
+        tool="test", email="test@example.com", base_url=eutils.url, min_interval=0
+    )
+
+    with app.app_context():
+        results = client.search_many(["exercise", "sleep"], max_results=3)
+
+    assert all(len(articles) == 3 for articles in results.values())
+    assert eutils.stats["requests"] == 3
+
+
+def test_load_test_result_summary():
+    result = LoadTestResult(duration=2.0, latencies=[0.1, 0.2, 0.3, 0.4])
+    result.statuses.update({200: 3, 429: 1})
+
+    summary = result.summary()
+
+    assert summary["throughput_rps"] == 2.0
+    assert summary["error_rate"] == 0.25
+    assert summary["latency_ms"]["p50"] == 300.0
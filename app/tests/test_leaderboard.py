@@ -0,0 +1,162 @@
+import time
+import numpy as np
+import pytest
+from app.models import Score
+from app.services.claim_verification_service import ClaimVerificationService
+from app.services.leaderboard import Leaderboard, trust_scores
+
+
+def make_score(username, verified=0, questionable=0, debunked=0):
+    return Score(
+        username=username,
+        trust_score=0,
+        total_claims=verified + questionable + debunked,
+        verified=verified,
+        questionable=questionable,
+        debunked=debunked,
+        updated_at=1.0,
+    )
+
+
+def test_trust_scores_match_single_influencer_formula():
+    """Test that the vectorized scores match calculate_trust_score"""
+    rng = np.random.default_rng(0)
+    counts = rng.integers(0, 20, size=(200, 3))
+    scores, lower, upper = trust_scores(counts[:, 0], counts[:, 1], counts[:, 2])
+
+    for (verified, questionable, debunked), score in zip(counts, scores):
+        expected, _ = ClaimVerificationService.trust_score_from_counts(
+            verified, debunked, verified + questionable + debunked
+        )
+        assert round(score) == expected
+    assert np.all(lower <= scores) and np.all(scores <= upper)
+
+
+def test_confidence_interval_narrows_with_more_claims():
+    """Test that influencers with more claims get tighter intervals"""
+    _, lower, upper = trust_scores([3, 300], [1, 100], [1, 100])
+    widths = upper - lower
+    assert widths[1] < widths[0]
+
+
+def test_rank_filters_pages_and_keeps_overall_rank():
+    """Test ranking, filtering and paging"""
+    leaderboard = Leaderboard(capacity=2)
+    leaderboard.update(
+        [
+            make_score("alice", verified=9, debunked=1),
+            make_score("bob", verified=1),
+            make_score("carol", debunked=4),
+            make_score("dave", verified=5, questionable=5),
+        ]
+    )
+
+    ranking = leaderboard.rank()
+    assert ranking["total"] == 4
+    assert [i["username"] for i in ranking["influencers"]] == [
+        "bob",
+        "alice",
+        "dave",
+        "carol",
+    ]
+
+    # Ranking by the interval's lower bound favours many consistent claims
+    by_bound = leaderboard.rank(sort="lower_bound")
+    assert by_bound["influencers"][0]["username"] == "alice"
+
+    filtered = leaderboard.rank(min_claims=2, offset=1, limit=1)
+    assert filtered["total"] == 3
+    assert filtered["influencers"][0]["username"] == "dave"
+    assert filtered["influencers"][0]["rank"] == 3
+
+    with pytest.raises(ValueError):
+        leaderboard.rank(weighting="bogus")
+
+
+def test_update_replaces_counts_and_reorders():
+    """Test that an updated influencer moves in the ranking"""
+    leaderboard = Leaderboard()
+    leaderboard.update([make_score("alice", verified=1), make_score("bob")])
+    assert leaderboard.rank()["influencers"][0]["username"] == "alice"
+
+    leaderboard.update([make_score("alice", debunked=3), make_score("bob", verified=2)])
+    assert len(leaderboard) == 2
+    assert leaderboard.rank()["influencers"][0]["username"] == "bob"
+
+
+def test_rank_many_influencers_quickly():
+    """Test that tens of thousands of influencers are ranked in one pass"""
+    rng = np.random.default_rng(1)
+    counts = rng.integers(0, 50, size=(50_000, 3))
+    leaderboard = Leaderboard()
+    leaderboard.load(
+        [
+            make_score(f"user{i}", int(v), int(q), int(d))
+            for i, (v, q, d) in enumerate(counts)
+        ]
+    )
+
+    started = time.perf_counter()
+    ranking = leaderboard.rank(weighting="strict", min_claims=10, limit=100)
+    elapsed = time.perf_counter() - started
+
+    assert len(ranking["influencers"]) == 100
+    scores = [i["trust_score"] for i in ranking["influencers"]]
+    assert scores == sorted(scores, reverse=True)
+    assert elapsed < 1.0
+
+
+def test_reload_runs_once_and_keeps_concurrent_updates():
+    """Test that concurrent readers share one reload that loses no updates"""
+    import threading
+
+    leaderboard = Leaderboard()
+    started = threading.Event()
+    release = threading.Event()
+    loads = []
+
+    def get_scores():
+        loads.append(1)
+        started.set()
+        release.wait(5)
+        return [make_score("alice", verified=1)]
+
+    readers = [
+        threading.Thread(target=leaderboard.reload, args=(get_scores, 60))
+        for _ in range(3)
+    ]
+    for reader in readers:
+        reader.start()
+    started.wait(5)
+    # Written after the storage snapshot was taken
+    leaderboard.update([make_score("bob", verified=2)])
+    release.set()
+    for reader in readers:
+        reader.join()
+
+    assert len(loads) == 1
+    assert leaderboard.loaded
+    usernames = {i["username"] for i in leaderboard.rank()["influencers"]}
+    assert usernames == {"alice", "bob"}
+
+
+def test_record_score_skips_unloaded_leaderboard():
+    """Test that writers never trigger a storage scan"""
+    from unittest.mock import patch
+    from flask import Flask
+    from app.services.leaderboard import get_leaderboard, record_score
+
+    app = Flask(__name__)
+    app.config.update(STORAGE_BACKEND="memory", STORAGE_PATH="record-score-test")
+    with app.app_context(), patch(
+        "app.services.leaderboard.get_storage"
+    ) as get_storage:
+        get_storage.return_value.get_scores.return_value = [make_score("alice", 1)]
+        record_score(make_score("bob", verified=1))
+        get_storage.assert_not_called()
+
+        leaderboard = get_leaderboard()
+        record_score(make_score("bob", verified=1))
+
+    assert get_storage.return_value.get_scores.call_count == 1
+    assert len(leaderboard) == 2
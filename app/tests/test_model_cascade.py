@@ -0,0 +1,134 @@
+import json
+import math
+import pytest
+from unittest.mock import Mock, patch
+from flask import Flask
+from pydantic import BaseModel, ValidationError
+from app.services.model_cascade import ModelCascade, get_cascade
+
+
+class Answer(BaseModel):
+    answer: str
+    confidence: float
+
+
+def chat_response(content):
+    return {"message": {"content": content}}
+
+
+def answer(text, confidence):
+    return chat_response(json.dumps({"answer": text, "confidence": confidence}))
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.logger = Mock()
+    with app.app_context():
+        yield app
+
+
+def low_confidence(response):
+    return "low_confidence" if response.confidence < 0.5 else None
+
+
+def test_small_model_answer_is_accepted(app):
+    """Test that a confident small-model answer never reaches the large model"""
+    cascade = ModelCascade("test", ["small", "large"])
+
+    with patch("ollama.Client.chat", return_value=answer("yes", 0.9)) as chat:
+        result = cascade.chat("prompt", Answer, escalate=low_confidence)
+
+    assert result.answer == "yes"
+    assert [call.kwargs["model"] for call in chat.call_args_list] == ["small"]
+    assert cascade.stats()["tiers"][0]["hit_rate"] == 1.0
+
+
+def test_escalates_on_escalate_reason(app):
+    """Test that a borderline answer is escalated to the next tier"""
+    cascade = ModelCascade("test", ["small", "large"])
+
+    with patch(
+        "ollama.Client.chat", side_effect=[answer("maybe", 0.3), answer("no", 0.9)]
+    ) as chat:
+        result = cascade.chat("prompt", Answer, escalate=low_confidence)
+
+    assert result.answer == "no"
+    assert [call.kwargs["model"] for call in chat.call_args_list] == ["small", "large"]
+    tiers = cascade.stats()["tiers"]
+    assert tiers[0]["escalated"] == {"low_confidence": 1}
+    assert tiers[1]["accepted"] == 1
+
+
+def test_escalates_on_invalid_output(app):
+    """Test that a response failing validation is escalated"""
+    cascade = ModelCascade("test", ["small", "large"])
+
+    with patch(
+        "ollama.Client.chat",
+        side_effect=[chat_response("not json"), answer("yes", 0.9)],
+    ):
+        result = cascade.chat("prompt", Answer)
+
+    assert result.answer == "yes"
+    assert cascade.stats()["tiers"][0]["escalated"] == {"invalid": 1}
+
+
+def test_last_tier_is_always_accepted(app):
+    """Test that the last tier's valid answer is not escalated"""
+    cascade = ModelCascade("test", ["only"])
+    escalate = Mock(return_value="low_confidence")
+
+    with patch("ollama.Client.chat", return_value=answer("maybe", 0.1)):
+        result = cascade.chat("prompt", Answer, escalate=escalate)
+
+    assert result.answer == "maybe"
+    escalate.assert_not_called()
+
+
+def test_last_tier_invalid_output_raises(app):
+    """Test that invalid output from the last tier raises"""
+    cascade = ModelCascade("test", ["small", "large"])
+
+    with patch("ollama.Client.chat", return_value=chat_response("{}")):
+        with pytest.raises(ValidationError):
+            cascade.chat("prompt", Answer)
+
+    assert [tier["calls"] for tier in cascade.stats()["tiers"]] == [1, 1]
+
+
+def test_get_cascade_reads_config(app):
+    """Test that the configured models are used smallest first"""
+    app.config["MODEL_CASCADE"] = "small, large"
+
+    cascade = get_cascade("configured", "default")
+
+    assert cascade.models == ["small", "large"]
+    assert cascade.signature == "small>large"
+    assert get_cascade("configured", "default") is cascade
+
+
+def test_get_cascade_defaults_to_single_model(app):
+    """Test that the default model is used when no cascade is configured"""
+    cascade = get_cascade("unconfigured", "default")
+
+    assert cascade.models == ["default"]
+
+
+def test_client_applies_the_timeout_per_tier(app):
+    """Test that calls get their timeout from a shared, cached client"""
+    from app.utils.resilience import get_upstream
+
+    cascade = ModelCascade("test", ["small", "large"])
+    with patch("ollama.Client") as client:
+        client.return_value.chat.side_effect = [
+            answer("maybe", 0.3),
+            answer("no", 0.9),
+        ]
+        cascade.chat("prompt", Answer, escalate=low_confidence)
+
+    upstream = get_upstream("ollama")
+    # Both tiers' timeouts round to the same second, so they share a client
+    client.assert_called_once_with(timeout=math.ceil(upstream.timeout("Answer:large")))
+    assert client.return_value.chat.call_count == 2
+    assert {"Answer:small", "Answer:large"} <= set(upstream.stats()["kinds"])
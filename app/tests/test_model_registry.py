@@ -0,0 +1,60 @@
+import sys
+import pytest
+from unittest.mock import Mock, patch
+from flask import Flask
+from app.services import model_registry
+
+
+@pytest.fixture
+def app():
+    """Create a Flask app for testing"""
+    app = Flask(__name__)
+    return app
+
+
+@pytest.fixture(autouse=True)
+def clear_registry():
+    """Start every test with an empty model cache"""
+    model_registry.clear_models()
+    yield
+    model_registry.clear_models()
+
+
+def test_importing_services_does_not_load_heavy_dependencies():
+    """Test that importing the routes does not import sentence_transformers"""
+    import subprocess
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, app.routes; "
+            "print('sentence_transformers' in sys.modules, 'torch' in sys.modules)",
+        ],
+        capture_output=True,
+        text=True,
+    )
+
+    assert result.stdout.strip() == "False False"
+
+
+def test_get_sentence_transformer_loads_once(app):
+    """Test that the model is loaded on first use and then shared"""
+    with app.app_context():
+        with patch("sentence_transformers.SentenceTransformer") as mock_model_class:
+            mock_model_class.return_value = Mock()
+            first = model_registry.get_sentence_transformer()
+            second = model_registry.get_sentence_transformer()
+
+    assert first is second
+    mock_model_class.assert_called_once_with(model_registry.DEFAULT_SIMILARITY_MODEL)
+
+
+def test_preload_models(app):
+    """Test that preloading populates the model cache"""
+    with app.app_context():
+        with patch("sentence_transformers.SentenceTransformer") as mock_model_class:
+            model_registry.preload_models()
+            model_registry.get_sentence_transformer()
+
+    mock_model_class.assert_called_once()
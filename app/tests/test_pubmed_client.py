@@ -0,0 +1,127 @@
+import io
+import pytest
+from unittest.mock import Mock
+from flask import Flask
+from app.services.pubmed_client import PubMedClient
+
+EFETCH_XML = b"""<?xml version="1.0" ?>
+<PubmedArticleSet>
+  <PubmedArticle>
+    <MedlineCitation>
+      <PMID>111</PMID>
+      <Article>
+        <ArticleTitle>Exercise and <i>heart</i> health</ArticleTitle>
+        <Abstract>
+          <AbstractText Label="BACKGROUND">Exercise matters.</AbstractText>
+          <AbstractText Label="RESULTS">Risk fell by 30%.</AbstractText>
+        </Abstract>
+      </Article>
+    </MedlineCitation>
+  </PubmedArticle>
+  <PubmedArticle>
+    <MedlineCitation>
+      <PMID>222</PMID>
+      <Article>
+        <ArticleTitle>Sleep and memory</ArticleTitle>
+      </Article>
+    </MedlineCitation>
+  </PubmedArticle>
+</PubmedArticleSet>
+"""
+
+
+@pytest.fixture
+def app():
+    """Create a Flask app for testing"""
+    app = Flask(__name__)
+    app.logger = Mock()
+    return app
+
+
+def make_response(json_data=None, content=None):
+    """Build a mocked requests response"""
+    response = Mock()
+    response.json.return_value = json_data
+    response.raw = io.BytesIO(content or b"")
+    return response
+
+
+@pytest.fixture
+def session():
+    """Mocked requests session answering ESearch and EFetch"""
+    session = Mock()
+    session.get.side_effect = lambda url, params, timeout: make_response(
+        {
+            "esearchresult": {
+                "idlist": ["111", "222"] if "exercise" in params["term"] else ["111"]
+            }
+        }
+    )
+    session.post.side_effect = lambda url, data, stream, timeout: make_response(
+        content=EFETCH_XML
+    )
+    return session
+
+
+@pytest.fixture
+def client(session):
+    return PubMedClient(
+        tool="test", email="test@example.com", session=session, min_interval=0
+    )
+
+
+def test_parse_articles():
+    """Test incremental parsing of EFetch XML"""
+    articles = PubMedClient.parse_articles(io.BytesIO(EFETCH_XML))
+
+    assert set(articles) == {"111", "222"}
+    assert articles["111"]["title"] == "Exercise and heart health"
+    assert articles["111"]["abstract"] == "Exercise matters.\nRisk fell by 30%."
+    assert articles["111"]["url"] == "https://pubmed.ncbi.nlm.nih.gov/111/"
+    assert articles["222"]["abstract"] == ""
+
+
+def test_search_many_fetches_union_once(app, client, session):
+    """Test that shared articles are fetched once and deduplicated"""
+    with app.app_context():
+        results = client.search_many(["exercise helps", "fasting helps"])
+
+    assert session.get.call_count == 2
+    assert session.post.call_count == 1
+    assert session.post.call_args.kwargs["data"]["id"] == "111,222"
+    assert [a["title"] for a in results["exercise helps"]] == [
+        "Exercise and heart health",
+        "Sleep and memory",
+    ]
+    assert results["fasting helps"][0] is results["exercise helps"][0]
+
+
+def test_search_many_raises_search_errors(app, client, session):
+    """Test that a failed search is not reported as a query without articles"""
+    session.get.side_effect = RuntimeError("429 Too Many Requests")
+
+    with app.app_context(), pytest.raises(RuntimeError):
+        client.search_many(["exercise helps"])
+
+    session.post.assert_not_called()
+
+
+def test_efetch_batches_large_id_lists(client, session):
+    """Test that EFetch is split into batches"""
+    client.efetch_batch_size = 2
+    client.efetch(["1", "2", "3", "1"])
+
+    assert session.post.call_count == 2
+
+
+def test_clients_share_the_ncbi_throttle(session):
+    """Test that separate clients are throttled together"""
+    first = PubMedClient(tool="test", email="test@example.com", session=session)
+    second = PubMedClient(tool="test", email="test@example.com", session=session)
+    keyed = PubMedClient(
+        tool="test", email="test@example.com", api_key="key", session=session
+    )
+
+    assert first.throttle is second.throttle
+    assert keyed.throttle is not first.throttle
+    assert keyed.throttle.min_interval < first.throttle.min_interval
@@ -0,0 +1,160 @@
+import threading
+import time
+import pytest
+from app.utils.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    Upstream,
+    UpstreamTimeoutError,
+)
+
+
+def warmed_up(upstream, latency=0.05, samples=20):
+    """Record enough latencies for the adaptive behaviour to kick in"""
+    for _ in range(samples):
+        upstream.latency.record(latency)
+    return upstream
+
+
+def test_circuit_breaker_opens_and_recovers():
+    """Test that the breaker opens after repeated failures and closes after a trial"""
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert not breaker.allow()  # One trial call at a time
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_failed_trial_reopens_circuit():
+    """Test that a failing half-open trial opens the circuit again"""
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+
+    assert breaker.allow()
+    breaker.record_failure()
+    assert not breaker.allow()
+
+
+def test_upstream_rejects_calls_when_open():
+    """Test that calls fail fast without reaching an unhealthy upstream"""
+    upstream = Upstream("test", default_timeout=1.0)
+    upstream.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    calls = []
+
+    def fail(timeout):
+        calls.append(timeout)
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        upstream.call(fail)
+    with pytest.raises(CircuitOpenError):
+        upstream.call(fail)
+
+    assert len(calls) == 1
+    assert upstream.stats()["rejected"] == 1
+
+
+def test_ignored_errors_do_not_open_circuit():
+    """Test that expected errors such as "not found" keep the circuit closed"""
+    upstream = Upstream("test", default_timeout=1.0)
+    upstream.breaker = CircuitBreaker(failure_threshold=1)
+
+    for _ in range(3):
+        with pytest.raises(KeyError):
+            upstream.call(lambda timeout: {}["missing"], ignore=(KeyError,))
+
+    assert upstream.breaker.state == "closed"
+
+
+def test_adaptive_timeout_follows_p95():
+    """Test that the timeout is derived from observed latencies within bounds"""
+    upstream = Upstream(
+        "test", default_timeout=10.0, min_timeout=0.5, timeout_multiplier=3.0
+    )
+    assert upstream.timeout() == 10.0
+
+    warmed_up(upstream, latency=1.0)
+    assert upstream.timeout() == pytest.approx(3.0)
+
+    warmed_up(upstream, latency=0.01, samples=200)
+    assert upstream.timeout() == 0.5
+
+
+def test_hedged_call_uses_faster_duplicate():
+    """Test that a stalled request is hedged and the duplicate's answer used"""
+    upstream = warmed_up(Upstream("test", default_timeout=5.0, hedge_budget=1.0))
+    release = threading.Event()
+    attempts = []
+
+    def request(timeout):
+        attempts.append(timeout)
+        if len(attempts) == 1:
+            release.wait(5)  # The first request stalls
+            return "slow"
+        return "fast"
+
+    started = time.monotonic()
+    assert upstream.call(request, hedge=True) == "fast"
+    release.set()
+
+    assert time.monotonic() - started < 1.0
+    assert upstream.stats()["hedges"] == upstream.stats()["hedge_wins"] == 1
+
+
+def test_hedging_waits_for_latency_samples():
+    """Test that nothing is hedged before the latency is known"""
+    upstream = Upstream("test", default_timeout=5.0, hedge_budget=1.0)
+
+    assert upstream.hedge_delay() is None
+
+
+def test_enforced_timeout_abandons_stalled_call():
+    """Test that a call without its own timeout is abandoned after the timeout"""
+    upstream = Upstream("test", default_timeout=0.05)
+    release = threading.Event()
+
+    with pytest.raises(UpstreamTimeoutError):
+        upstream.call(lambda timeout: release.wait(5), enforce_timeout=True)
+    release.set()
+
+    assert upstream.stats()["timeouts"] == 1
+
+
+def test_http_client_timeouts_count_as_timeouts():
+    """Test that requests.Timeout, which is not a TimeoutError, is counted"""
+    import requests
+
+    upstream = Upstream("test", default_timeout=5.0)
+
+    def request(timeout):
+        raise requests.ReadTimeout("Read timed out")
+
+    with pytest.raises(requests.Timeout):
+        upstream.call(request)
+
+    assert upstream.stats()["timeouts"] == 1
+    assert len(upstream.latency) == 1
+
+
+def test_kinds_of_call_have_their_own_timeouts():
+    """Test that short and long calls to one upstream do not share a timeout"""
+    upstream = Upstream(
+        "test", default_timeout=60.0, min_timeout=0.1, timeout_multiplier=2.0
+    )
+    for _ in range(20):
+        upstream.latency_for("status").record(0.5)
+        upstream.latency_for("details").record(10.0)
+
+    assert upstream.timeout("status") == pytest.approx(1.0)
+    assert upstream.timeout("details") == pytest.approx(20.0)
+    assert upstream.timeout() == 60.0
+    assert set(upstream.stats()["kinds"]) == {"status", "details"}
@@ -0,0 +1,101 @@
+import pytest
+from app.utils.response_shaping import (
+    normalize_articles,
+    paginate_claims,
+    parse_fields,
+    pmid_from_url,
+    shape_report,
+)
+
+
+def article(pmid):
+    return {
+        "title": f"Article {pmid}",
+        "abstract": "Abstract",
+        "url": f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/",
+    }
+
+
+@pytest.fixture
+def report():
+    """A report whose claims share a PubMed article"""
+    return {
+        "username": "drhealth",
+        "trust_score": 50,
+        "tweets": ["tweet"],
+        "verification_results": {
+            "claim 1": {
+                "verification_status": "Verified",
+                "explanation": "Supported",
+                "pubmed_results": [article("1"), article("2")],
+            },
+            "claim 2": {
+                "verification_status": "Debunked",
+                "explanation": "Contradicted",
+                "pubmed_results": [article("2")],
+            },
+            "claim 3": {
+                "verification_status": "Questionable",
+                "explanation": "Mixed",
+                "pubmed_results": [],
+            },
+        },
+    }
+
+
+def test_pmid_from_url():
+    assert pmid_from_url("https://pubmed.ncbi.nlm.nih.gov/12345/") == "12345"
+    assert pmid_from_url("https://example.com") is None
+
+
+def test_normalize_articles(report):
+    """Test that shared articles are stored once and referenced by PMID"""
+    shaped = normalize_articles(report)
+
+    assert set(shaped["articles"]) == {"1", "2"}
+    assert shaped["verification_results"]["claim 1"]["pubmed_ids"] == ["1", "2"]
+    assert shaped["verification_results"]["claim 2"]["pubmed_ids"] == ["2"]
+    assert "pubmed_results" not in shaped["verification_results"]["claim 1"]
+    # The original report is left untouched
+    assert "pubmed_results" in report["verification_results"]["claim 1"]
+
+
+def test_paginate_claims(report):
+    """Test that claims are paginated in order"""
+    shaped = paginate_claims(report, page=2, per_page=2)
+
+    assert list(shaped["verification_results"]) == ["claim 3"]
+    assert shaped["pagination"] == {"page": 2, "per_page": 2, "total": 3, "pages": 2}
+
+
+def test_parse_fields():
+    assert parse_fields("username, verification_results.verification_status") == {
+        "username": {},
+        "verification_results": {"verification_status": {}},
+    }
+
+
+def test_shape_report_projection(report):
+    """Test field projection into each verification result"""
+    shaped = shape_report(
+        report, fields="username,verification_results.verification_status"
+    )
+
+    assert shaped == {
+        "username": "drhealth",
+        "verification_results": {
+            "claim 1": {"verification_status": "Verified"},
+            "claim 2": {"verification_status": "Debunked"},
+            "claim 3": {"verification_status": "Questionable"},
+        },
+    }
+
+
+def test_shape_report_page_only_includes_page_articles(report):
+    """Test that the article map only covers the requested page"""
+    shaped = shape_report(report, page=2, per_page=1, fields="articles")
+
+    assert shaped == {
+        "articles": {"2": article("2")},
+        "pagination": {"page": 2, "per_page": 1, "total": 3, "pages": 3},
+    }
@@ -0,0 +1,298 @@
+import gzip
+import json
+import time
+import pytest
+from unittest.mock import patch
+from app import create_app
+from app.services.storage_service import get_storage
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    STORAGE_BACKEND = "memory"
+    EXTRACTION_CACHE_PATH = ""
+    CLAIM_INDEX_PATH = ""
+    ANALYSIS_LEASE_PATH = ""
+    REPORT_MAX_AGE = 3600
+
+
+@pytest.fixture
+def app(tmp_path):
+    """Create the application with in-memory storage"""
+    app = create_app(TestConfig)
+    app.config["STORAGE_PATH"] = str(tmp_path / "storage")
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def report():
+    """A minimal influencer report"""
+    return {
+        "username": "drhealth",
+        "profile_image": None,
+        "follower_count": None,
+        "tweets": [],
+        "health_claims": [],
+        "verification_results": {},
+        "trust_score": 0,
+        "total_claims": 0,
+    }
+
+
+def test_influencer_detail_serves_stored_report(client, report):
+    """Test that repeat lookups are served from storage"""
+    with patch(
+        "app.services.analysis_service.InfluencerAnalysisService.analyze",
+        return_value=report,
+    ) as analyze:
+        first = client.get("/api/influencer/drhealth")
+        second = client.get("/api/influencer/drhealth")
+
+    assert analyze.call_count == 1
+    assert first.status_code == second.status_code == 200
+    assert second.get_json()["username"] == "drhealth"
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert "Last-Modified" in second.headers
+
+
+def test_influencer_detail_not_modified(client, report):
+    """Test that a matching If-None-Match returns 304"""
+    with patch(
+        "app.services.analysis_service.InfluencerAnalysisService.analyze",
+        return_value=report,
+    ):
+        etag = client.get("/api/influencer/drhealth").headers["ETag"]
+        response = client.get(
+            "/api/influencer/drhealth", headers={"If-None-Match": etag}
+        )
+
+    assert response.status_code == 304
+
+
+def test_influencer_detail_refreshes_stale_report(app, client, report):
+    """Test that a stale report is served while a refresh is started"""
+    app.config["REPORT_MAX_AGE"] = 0
+    with patch(
+        "app.services.analysis_service.InfluencerAnalysisService.analyze",
+        return_value=report,
+    ):
+        client.get("/api/influencer/drhealth")
+        time.sleep(0.01)
+        with patch("app.routes.refresh_in_background") as refresh:
+            response = client.get("/api/influencer/drhealth")
+
+    assert response.status_code == 200
+    assert response.headers["X-Report-Stale"] == "true"
+    refresh.assert_called_once()
+
+
+def test_influencer_detail_rate_limited(client):
+    """Test that a failed tweet fetch returns 429"""
+    with patch(
+        "app.services.analysis_service.InfluencerAnalysisService.analyze",
+        return_value=None,
+    ):
+        response = client.get("/api/influencer/drhealth")
+
+    assert response.status_code == 429
+
+
+def test_influencer_detail_coalesces_concurrent_requests(app, report):
+    """Test that simultaneous requests share one analysis"""
+    import threading
+
+    def slow_analyze(*args, **kwargs):
+        time.sleep(0.2)
+        return report
+
+    statuses = []
+
+    def request_report():
+        statuses.append(app.test_client().get("/api/influencer/drhealth").status_code)
+
+    with patch(
+        "app.services.analysis_service.InfluencerAnalysisService.analyze",
+        side_effect=slow_analyze,
+    ) as analyze:
+        threads = [threading.Thread(target=request_report) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    assert analyze.call_count == 1
+    assert statuses == [200] * 5
+
+
+def test_influencer_detail_shapes_and_compresses(client, report):
+    """Test field projection and gzip compression of large reports"""
+    report = dict(report, tweets=["Exercise is good for you"] * 200)
+    with patch(
+        "app.services.analysis_service.InfluencerAnalysisService.analyze",
+        return_value=report,
+    ):
+        full = client.get(
+            "/api/influencer/drhealth", headers={"Accept-Encoding": "gzip"}
+        )
+        projected = client.get("/api/influencer/drhealth?fields=username,trust_score")
+
+    assert full.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(full.data).startswith(b"{")
+    assert projected.get_json() == {"username": "drhealth", "trust_score": 0}
+    assert projected.headers["ETag"] != full.headers["ETag"]
+
+
+def test_influencer_stream_returns_ndjson(client):
+    """Test that streamed analysis events are sent one JSON object per line"""
+    events = [{"type": "influencer"}, {"type": "summary", "trust_score": 50}]
+    with patch("app.routes.StreamingAnalysisPipeline.run", return_value=iter(events)):
+        response = client.get("/api/influencer/drhealth/stream")
+
+    assert response.mimetype == "application/x-ndjson"
+    lines = response.get_data(as_text=True).splitlines()
+    assert [json.loads(line) for line in lines] == events
+
+
+def test_leaderboard_ranks_analyzed_influencers(client, report):
+    """Test that analyzed influencers appear on the leaderboard"""
+    reliable = {
+        **report,
+        "verification_results": {
+            "Exercise helps": {"verification_status": "Verified"},
+            "Sleep helps": {"verification_status": "Verified"},
+        },
+        "trust_score": 100,
+        "total_claims": 2,
+    }
+    with patch(
+        "app.services.analysis_service.InfluencerAnalysisService.analyze",
+        side_effect=[reliable, report],
+    ):
+        client.get("/api/influencer/drhealth")
+        client.get("/api/influencer/quack")
+
+    response = client.get("/api/leaderboard")
+    assert response.status_code == 200
+    ranking = response.get_json()
+    assert ranking["total"] == 2
+    assert [i["username"] for i in ranking["influencers"]] == ["drhealth", "quack"]
+    assert ranking["influencers"][0]["trust_score"] == 100
+
+    filtered = client.get("/api/leaderboard?min_claims=1").get_json()
+    assert [i["username"] for i in filtered["influencers"]] == ["drhealth"]
+    assert client.get("/api/leaderboard?weighting=bogus").status_code == 400
+
+
+def test_claim_details_reuses_stored_verification(app, client, report):
+    """Test that details explain the stored status with the stored articles"""
+    articles = [{"title": "Fasting", "abstract": "No effect.", "url": "u"}]
+    with app.app_context():
+        get_storage().save_report(
+            "drhealth",
+            {
+                **report,
+                "verification_results": {
+                    "Fasting cures colds": {
+                        "verification_status": "Debunked",
+                        "explanation": "",
+                        "supporting_points": [],
+                        "contradicting_points": [],
+                        "pubmed_results": articles,
+                        "confidence": 0.9,
+                        "details_available": False,
+                    }
+                },
+            },
+        )
+
+    explained = {
+        "verification_status": "Debunked",
+        "explanation": "Trials found no effect",
+        "supporting_points": [],
+        "contradicting_points": [],
+        "pubmed_results": articles,
+    }
+    with patch("app.routes.ClaimVerificationService") as service:
+        service.return_value.verify_claim.return_value = dict(explained)
+        response = client.get(
+            "/api/claim/details?claim=Fasting cures colds&username=drhealth"
+        )
+        again = client.get(
+            "/api/claim/details?claim=Fasting cures colds&username=drhealth"
+        )
+
+    service.return_value.verify_claim.assert_called_once_with(
+        "Fasting cures colds", pubmed_results=articles, verification_status="Debunked"
+    )
+    result = response.get_json()["verification_result"]
+    assert result["confidence"] == 0.9
+    assert result["details_available"] is True
+    assert again.get_json()["verification_result"]["explanation"] == (
+        "Trials found no effect"
+    )
+
+
+def test_influencer_detail_recomputes_report_without_details(client, report):
+    """Test that ?details=true is not served a status-only report"""
+    status_only = {
+        **report,
+        "verification_results": {
+            "Exercise helps": {
+                "verification_status": "Verified",
+                "explanation": "",
+                "details_available": False,
+            }
+        },
+    }
+    detailed = {
+        **report,
+        "verification_results": {
+            "Exercise helps": {
+                "verification_status": "Verified",
+                "explanation": "Strong evidence",
+                "details_available": True,
+            }
+        },
+    }
+    with patch(
+        "app.services.analysis_service.InfluencerAnalysisService.analyze",
+        side_effect=[status_only, detailed],
+    ) as analyze:
+        client.get("/api/influencer/drhealth")
+        response = client.get("/api/influencer/drhealth?details=true")
+        # The detailed report now serves both variants
+        plain = client.get("/api/influencer/drhealth")
+
+    assert analyze.call_count == 2
+    assert analyze.call_args.args == ("drhealth", True)
+    for served in (response, plain):
+        results = served.get_json()["verification_results"]
+        assert results["Exercise helps"]["explanation"] == "Strong evidence"
+
+
+def test_influencer_detail_gives_up_waiting_for_other_worker(app, client, tmp_path):
+    """Test that waiting on another worker's lease is capped"""
+    from app.utils.single_flight import LeaseStore
+
+    path = str(tmp_path / "leases.sqlite3")
+    app.config.update(
+        ANALYSIS_LEASE_PATH=path,
+        ANALYSIS_LEASE_POLL_INTERVAL=0.01,
+        ANALYSIS_LEASE_WAIT_TIMEOUT=0.05,
+    )
+    assert LeaseStore(path).acquire("drhealth|details=False", ttl=600)
+
+    with patch(
+        "app.services.analysis_service.InfluencerAnalysisService.analyze"
+    ) as analyze:
+        response = client.get("/api/influencer/drhealth")
+
+    analyze.assert_not_called()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
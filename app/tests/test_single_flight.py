@@ -0,0 +1,68 @@
+import threading
+import time
+import pytest
+from app.utils.single_flight import LeaseStore, SingleFlight
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    """Test that concurrent calls with one key run the function once"""
+    flights = SingleFlight()
+    calls = []
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.1)
+        return "report"
+
+    threads = [
+        threading.Thread(target=lambda: results.append(flights.do("user", compute)))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert [result for result, _ in results] == ["report"] * 10
+    assert sum(shared for _, shared in results) == 9
+    assert flights.in_flight() == 0
+
+
+def test_single_flight_shares_exceptions():
+    """Test that the leader's exception reaches every caller"""
+    flights = SingleFlight()
+
+    def fail():
+        raise RuntimeError("Analysis failed")
+
+    with pytest.raises(RuntimeError):
+        flights.do("user", fail)
+    assert flights.in_flight() == 0
+
+
+def test_lease_is_exclusive_between_owners(tmp_path):
+    """Test that a held lease blocks other owners until released"""
+    path = str(tmp_path / "leases.sqlite3")
+    first, second = LeaseStore(path), LeaseStore(path)
+
+    assert first.acquire("user", ttl=60)
+    assert not second.acquire("user", ttl=60)
+    assert second.is_held("user")
+
+    first.release("user")
+
+    assert not second.is_held("user")
+    assert second.acquire("user", ttl=60)
+
+
+def test_expired_lease_can_be_taken_over(tmp_path):
+    """Test that a lease from a crashed holder expires"""
+    path = str(tmp_path / "leases.sqlite3")
+    first, second = LeaseStore(path), LeaseStore(path)
+
+    assert first.acquire("user", ttl=0.01)
+    time.sleep(0.02)
+
+    assert second.acquire("user", ttl=60)
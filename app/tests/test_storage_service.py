@@ -0,0 +1,103 @@
+import pytest
+from app.models import Influencer, Score
+from app.services.claim_verification_service import VerificationStatus
+from app.services.storage_service import (
+    MemoryStorage,
+    SQLiteStorage,
+    count_statuses,
+    make_etag,
+)
+
+
+@pytest.fixture
+def report():
+    """A minimal influencer report"""
+    return {
+        "username": "drhealth",
+        "profile_image": "https://example.com/image.png",
+        "follower_count": 1000,
+        "tweets": ["Exercise is good for you", "Nice weather today"],
+        "health_claims": ["Exercise is good for you"],
+        "verification_results": {
+            "Exercise is good for you": {
+                "verification_status": "Verified",
+                "explanation": "Supported",
+                "supporting_points": [],
+                "contradicting_points": [],
+                "pubmed_results": [],
+            }
+        },
+        "trust_score": 100,
+        "total_claims": 1,
+    }
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def storage(request, tmp_path):
+    """Create each storage backend"""
+    if request.param == "sqlite":
+        return SQLiteStorage(str(tmp_path / "storage.sqlite3"))
+    return MemoryStorage()
+
+
+def test_save_and_get_report(storage, report):
+    """Test that a saved report round-trips with its ETag"""
+    saved = storage.save_report("drhealth", report)
+    loaded = storage.get_report("drhealth")
+
+    assert loaded.report == report
+    assert loaded.etag == saved.etag == make_etag(report)
+    assert storage.get_report("unknown") is None
+
+
+def test_save_report_persists_components(storage, report):
+    """Test that the report's parts are stored individually"""
+    storage.save_report("drhealth", report)
+
+    assert storage.get_influencer("drhealth").follower_count == 1000
+    assert storage.get_tweets("drhealth") == report["tweets"]
+    assert storage.get_verifications("drhealth") == report["verification_results"]
+
+    [score] = storage.get_scores()
+    assert score.trust_score == 100
+    assert score.verified == 1
+    assert score.debunked == 0
+
+
+def test_append_verifications_and_save_score(storage):
+    """Test that streamed verifications and scores are stored without a report"""
+    storage.append_verifications("drhealth", {"Old claim": {}}, reset=True)
+    storage.append_verifications(
+        "drhealth", {"Claim A": {"verification_status": "Verified"}}, reset=True
+    )
+    storage.append_verifications(
+        "drhealth", {"Claim B": {"verification_status": "Debunked"}}
+    )
+    storage.save_score(
+        Score(username="drhealth", trust_score=25, total_claims=2, updated_at=1.0),
+        Influencer(username="drhealth", follower_count=10),
+    )
+
+    assert set(storage.get_verifications("drhealth")) == {"Claim A", "Claim B"}
+    assert storage.get_influencer("drhealth").follower_count == 10
+    assert storage.get_scores()[0].trust_score == 25
+    assert storage.get_report("drhealth") is None
+
+
+def test_count_statuses_accepts_enum_members():
+    """Test that statuses straight from the verification service are counted"""
+    counts = count_statuses(
+        {
+            "a": {"verification_status": VerificationStatus.VERIFIED},
+            "b": {"verification_status": "Debunked"},
+        }
+    )
+
+    assert counts == {"verified": 1, "questionable": 0, "debunked": 1}
+
+
+def test_etag_changes_with_report(report):
+    """Test that different reports get different ETags"""
+    changed = dict(report, trust_score=50)
+
+    assert make_etag(report) != make_etag(changed)
@@ -0,0 +1,206 @@
+import threading
+import time
+import zlib
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+from app import create_app
+from app.services.streaming_pipeline import (
+    StreamingAnalysisPipeline,
+    bounded_stage,
+    chunked,
+)
+from app.services.storage_service import get_storage
+from config import Config
+
+
+class TestConfig(Config):
+    TESTING = True
+    STORAGE_BACKEND = "memory"
+    EXTRACTION_CACHE_PATH = ""
+    CLAIM_INDEX_PATH = ""
+    ANALYSIS_LEASE_PATH = ""
+    STREAM_BUFFER_SIZE = 2
+    STREAM_VERIFICATION_BATCH_SIZE = 2
+
+
+@pytest.fixture
+def app(tmp_path):
+    app = create_app(TestConfig)
+    app.config["STORAGE_PATH"] = str(tmp_path / "storage")
+    with app.app_context():
+        yield app
+
+
+def test_bounded_stage_applies_backpressure(app):
+    """Test that a stage stops pulling input while its buffer is full"""
+    pulled = []
+
+    def source():
+        for i in range(100):
+            pulled.append(i)
+            yield i
+
+    stage = bounded_stage(app, lambda items: items, source(), buffer_size=2)
+    assert next(stage) == 0
+    time.sleep(0.2)
+
+    # One item consumed, two buffered and one waiting to be put
+    assert len(pulled) <= 4
+    assert list(stage) == list(range(1, 100))
+
+
+def test_bounded_stage_reraises_errors(app):
+    """Test that an exception in a stage reaches the consumer"""
+
+    def fail(items):
+        yield 1
+        raise ValueError("stage failed")
+
+    stage = bounded_stage(app, fail, [], buffer_size=2)
+
+    assert next(stage) == 1
+    with pytest.raises(ValueError):
+        next(stage)
+
+
+def test_bounded_stage_close_stops_source(app):
+    """Test that closing the consumer stops the stage and closes its source"""
+    closed = threading.Event()
+
+    def source():
+        try:
+            while True:
+                yield 1
+        finally:
+            closed.set()
+
+    stage = bounded_stage(app, lambda items: items, source(), buffer_size=2)
+    next(stage)
+    stage.close()
+
+    assert closed.wait(2)
+
+
+def test_chunked():
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def encode(texts):
+    """Embeds claims by their first word, so paraphrases collide"""
+    vectors = []
+    for text in texts:
+        vector = np.zeros(8, dtype=np.float32)
+        vector[zlib.crc32(text.split()[0].encode()) % 8] = 1.0
+        vectors.append(vector)
+    return np.array(vectors)
+
+
+def make_services(tweets):
+    """Mocked services for a timeline, verifying "Sun..." claims and debunking others"""
+    twitter = Mock()
+    twitter.get_user_info.return_value = {"profile_image": None, "follower_count": 5}
+    twitter.iter_tweets.side_effect = lambda username, max_tweets: iter(tweets)
+    extraction = Mock()
+    extraction.extract_health_claims.side_effect = lambda batch: [
+        tweet for tweet in batch if tweet != "Hello"
+    ]
+    verification = Mock()
+    verification.trust_score_from_counts.return_value = (25, 2)
+
+    def verify(claims):
+        return {
+            claim: {"verification_status": "Verified" if "Sun" in claim else "Debunked"}
+            for claim in claims
+        }
+
+    analysis = Mock()
+    analysis.verify_claims.side_effect = lambda service, claims, details: verify(claims)
+    analysis.verify_canonical_claims.side_effect = (
+        lambda index, service, username, claims, details: (verify(claims), {})
+    )
+    return twitter, extraction, verification, analysis
+
+
+def run_pipeline(services, claim_index=None):
+    twitter, extraction, verification, analysis = services
+    with patch(
+        "app.services.streaming_pipeline.TwitterService", return_value=twitter
+    ), patch(
+        "app.services.streaming_pipeline.ClaimExtractionService",
+        return_value=extraction,
+    ), patch(
+        "app.services.streaming_pipeline.ClaimVerificationService",
+        return_value=verification,
+    ), patch(
+        "app.services.streaming_pipeline.get_embedding_batcher",
+        return_value=Mock(encode=encode),
+    ), patch(
+        "app.services.streaming_pipeline.get_claim_index", return_value=claim_index
+    ):
+        return list(StreamingAnalysisPipeline(services[3]).run("drhealth"))
+
+
+def test_pipeline_streams_and_persists(app):
+    """Test that the timeline flows through every stage into storage"""
+    tweets = ["Sunlight helps", "Sunlight really helps", "Sugar hurts", "Hello"]
+    services = make_services(tweets)
+    storage = get_storage()
+    storage.save_report("drhealth", {"verification_results": {}})
+
+    events = run_pipeline(services)
+
+    assert events[0]["type"] == "influencer"
+    claims = [event["claim"] for event in events if event["type"] == "verification"]
+    assert claims == ["Sunlight helps", "Sugar hurts"]
+    summary = events[-1]
+    assert summary["tweets_processed"] == 4
+    assert summary["claims_extracted"] == 3
+    assert (summary["verified"], summary["debunked"]) == (1, 1)
+    services[2].trust_score_from_counts.assert_called_once_with(1, 1, 2)
+
+    assert set(storage.get_verifications("drhealth")) == set(claims)
+    assert storage.get_scores()[0].trust_score == 25
+    assert storage.get_influencer("drhealth").follower_count == 5
+    # The old report no longer matches the stored verifications
+    assert storage.get_report("drhealth") is None
+
+
+def test_pipeline_fills_an_empty_shared_index(app):
+    """Test that an empty shared claim index is used rather than a private one"""
+    from app.services.claim_index import ClaimIndex
+
+    claim_index = ClaimIndex(":memory:", encode)
+    services = make_services(["Sunlight helps", "Sugar hurts"])
+
+    run_pipeline(services, claim_index)
+
+    assert len(claim_index) == 2
+    services[3].verify_canonical_claims.assert_called()
+
+
+def test_pipeline_does_not_score_an_interrupted_timeline(app):
+    """Test that a failure while paging ends the stream with an error event"""
+    from app.services.twitter_service import TimelineInterruptedError
+
+    def timeline():
+        yield "Sunlight helps"
+        raise TimelineInterruptedError("Rate limit exceeded")
+
+    services = make_services([])
+    services[0].iter_tweets.side_effect = lambda username, max_tweets: timeline()
+    # Verify each claim as soon as it is extracted, before the timeline fails
+    app.config["STREAM_VERIFICATION_BATCH_SIZE"] = 1
+    previous = {"Sugar hurts": {"verification_status": "Debunked"}}
+    get_storage().append_verifications("drhealth", previous, reset=True)
+
+    events = run_pipeline(services)
+
+    assert events[-1]["type"] == "error"
+    assert events[-1]["error"] == "Rate limit exceeded"
+    assert events[-1]["tweets_processed"] == 1
+    assert events[-2]["claim"] == "Sunlight helps"
+    services[2].trust_score_from_counts.assert_not_called()
+    assert get_storage().get_scores() == []
+    # The stored verifications still match the stored score
+    assert get_storage().get_verifications("drhealth") == previous
@@ -0,0 +1,82 @@
+import pytest
+from app.utils.task_queue import TaskQueue
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return TaskQueue(str(tmp_path / "queue.sqlite3"))
+
+
+def test_claim_is_exclusive(queue):
+    """Test that each task is handed to one worker at a time"""
+    queue.enqueue("job", ["alice", "bob"])
+
+    first = queue.claim("worker-1", lease_ttl=60)
+    second = queue.claim("worker-2", lease_ttl=60)
+
+    assert {first.username, second.username} == {"alice", "bob"}
+    assert queue.claim("worker-3", lease_ttl=60) is None
+    assert queue.counts("job")["running"] == 2
+
+
+def test_failed_task_is_retried(queue):
+    """Test that a failed task returns to the queue until max_attempts"""
+    queue.enqueue("job", ["alice"])
+
+    task = queue.claim("worker", lease_ttl=60)
+    queue.fail(task.id, "worker", "boom", max_attempts=2)
+    retry = queue.claim("worker", lease_ttl=60)
+    assert retry.attempts == 2
+
+    queue.fail(retry.id, "worker", "boom again", max_attempts=2)
+    assert queue.claim("worker", lease_ttl=60) is None
+    assert queue.results("job")["failed"] == [
+        {"username": "alice", "error": "boom again", "attempts": 2}
+    ]
+
+
+def test_expired_lease_is_reclaimed(queue):
+    """Test that a task held by a dead worker is picked up again"""
+    queue.enqueue("job", ["alice"])
+    queue.claim("dead-worker", lease_ttl=-1)
+
+    task = queue.claim("worker", lease_ttl=60)
+
+    assert task.username == "alice"
+    assert task.attempts == 2
+
+
+def test_results_are_ordered_by_username(queue):
+    """Test that results merge deterministically regardless of finish order"""
+    queue.enqueue("job", ["carol", "alice", "bob"])
+    tasks = [queue.claim("worker", lease_ttl=60) for _ in range(3)]
+
+    for task in reversed(tasks):
+        queue.complete(task.id, "worker", {"username": task.username})
+
+    results = queue.results("job")["results"]
+    assert [result["username"] for result in results] == ["alice", "bob", "carol"]
+    assert queue.unfinished("job") == 0
+
+
+def test_expired_worker_cannot_overwrite_the_task(queue):
+    """Test that only the worker holding a task can finish it"""
+    queue.enqueue("job", ["alice"])
+    stale = queue.claim("slow-worker", lease_ttl=-1)
+    task = queue.claim("worker", lease_ttl=60)
+
+    assert not queue.complete(stale.id, "slow-worker", {"username": "stale"})
+    assert queue.complete(task.id, "worker", {"username": "alice"})
+    # A late failure report does not put the finished task back in the queue
+    assert not queue.fail(stale.id, "slow-worker", "timed out")
+    assert queue.results("job")["results"] == [{"username": "alice"}]
+    assert queue.unfinished("job") == 0
+
+
+def test_claim_can_be_limited_to_a_job(queue):
+    """Test that a job's workers only take that job's tasks"""
+    queue.enqueue("other", ["bob"])
+    queue.enqueue("job", ["alice"])
+
+    assert queue.claim("worker", lease_ttl=60, job_id="job").username == "alice"
+    assert queue.claim("worker", lease_ttl=60, job_id="job") is None
@@ -0,0 +1,69 @@
+import gzip
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is optional
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/html", "text/plain"}
+
+
+def choose_encoding(accept_encoding) -> str | None:
+    """
+    Picks the best supported content encoding the client accepts.
+
+    Args:
+        accept_encoding: The request's parsed Accept-Encoding header.
+
+    Returns:
+        "br", "gzip" or None.
+    """
+    if brotli is not None and accept_encoding["br"]:
+        return "br"
+    if accept_encoding["gzip"]:
+        return "gzip"
+    return None
+
+
+def init_compression(app):
+    """
+    Compresses large responses with brotli or gzip according to Accept-Encoding.
+
+    Controlled by the COMPRESS_RESPONSES and COMPRESS_MIN_SIZE config values.
+    """
+    from flask import request
+
+    @app.after_request
+    def compress_response(response):
+        if not app.config.get("COMPRESS_RESPONSES", True):
+            return response
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        data = response.get_data()
+        if len(data) < app.config.get("COMPRESS_MIN_SIZE", 1024):
+            return response
+
+        encoding = choose_encoding(request.accept_encodings)
+        if encoding is None:
+            return response
+
+        if encoding == "br":
+            compressed = brotli.compress(data, quality=4)
+        else:
+            compressed = gzip.compress(data, compresslevel=6)
+
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = encoding
+        # The encoded body differs byte for byte, so the validator becomes weak
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
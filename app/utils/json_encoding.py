@@ -0,0 +1,48 @@
+import json
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def dumps(obj, sort_keys: bool = False) -> str:
+    """
+    Serializes obj to a JSON string, using orjson when it is installed.
+
+    Values orjson does not handle natively are converted with str().
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=str, option=option).decode("utf-8")
+    return json.dumps(obj, sort_keys=sort_keys, default=str)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Flask JSON provider that serializes responses with orjson when available.
+
+    Falls back to the default provider for arguments orjson does not support
+    or when orjson is not installed. Keys keep their insertion order, so claims
+    stay in the order they were found.
+    """
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs) -> str:
+        # orjson output is always compact, so "separators" needs no handling
+        supported = {"sort_keys", "indent", "default", "separators"}
+        if orjson is None or set(kwargs) - supported:
+            return super().dumps(obj, **kwargs)
+
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(
+            obj, default=kwargs.get("default", self.default), option=option
+        ).decode("utf-8")
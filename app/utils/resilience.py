@@ -0,0 +1,357 @@
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Tuple
+
+# Default timeouts in seconds, used until enough latencies have been observed
+# and as the upper bound of the adaptive timeouts afterwards
+DEFAULT_TIMEOUTS = {"ollama": 120.0, "pubmed": 15.0, "twitter": 15.0}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+class UpstreamTimeoutError(TimeoutError):
+    """Raised when an upstream call does not finish within its timeout."""
+
+
+def is_timeout(error: Exception) -> bool:
+    """
+    Returns True if an exception is a timeout, including those of HTTP clients
+    that do not subclass TimeoutError (requests.Timeout, httpx.TimeoutException).
+    """
+    if isinstance(error, TimeoutError):
+        return True
+    # Only clients that are already imported can have raised their exceptions
+    for module, name in (("requests", "Timeout"), ("httpx", "TimeoutException")):
+        timeout_class = getattr(sys.modules.get(module), name, None)
+        if timeout_class is not None and isinstance(error, timeout_class):
+            return True
+    return False
+
+
+class LatencyTracker:
+    """
+    Keeps the most recent latencies of an upstream for percentile estimates.
+    """
+
+    def __init__(self, window: int = 200):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._samples)
+
+    def percentile(self, fraction: float) -> float:
+        with self._lock:
+            values = sorted(self._samples)
+        if not values:
+            return 0.0
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class CircuitBreaker:
+    """
+    Stops calls to an upstream after consecutive failures.
+
+    After failure_threshold consecutive failures the circuit opens and calls
+    fail fast. Once reset_timeout seconds have passed, one trial call is let
+    through (half-open): its success closes the circuit, its failure opens it
+    again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if (
+                self._state == self.OPEN
+                and time.monotonic() - self._opened_at >= self.reset_timeout
+            ):
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Returns True if a call may be made now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # Half-open: a single trial call at a time
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class Upstream:
+    """
+    Guards calls to one upstream service with an adaptive timeout, optional
+    request hedging and a circuit breaker.
+
+    The timeout is timeout_multiplier times the observed p95 latency, bounded
+    by min_timeout and default_timeout, once min_samples calls have been
+    timed. Latencies are tracked per kind of call, so short and long calls to
+    the same service (e.g. a status-only LLM call and a full verification)
+    each get a timeout that fits them; the circuit breaker is shared. Hedged
+    calls send a duplicate request when the first one has not answered within
+    the p95 latency and use whichever answers first; hedges are limited to
+    hedge_budget of all calls so they cannot double the load.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        default_timeout: float,
+        min_timeout: float = 1.0,
+        timeout_multiplier: float = 3.0,
+        min_samples: int = 20,
+        hedge_budget: float = 0.1,
+        breaker: CircuitBreaker = None,
+        max_workers: int = 32,
+    ):
+        self.name = name
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.timeout_multiplier = timeout_multiplier
+        self.min_samples = min_samples
+        self.hedge_budget = hedge_budget
+        self.breaker = breaker or CircuitBreaker()
+        self.latency = LatencyTracker()
+        self._latencies = {None: self.latency}
+        self._latencies_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"upstream-{name}"
+        )
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "calls": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "rejected": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+        }
+
+    def _count(self, key: str, amount: int = 1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def latency_for(self, kind: str = None) -> LatencyTracker:
+        """Returns the latency tracker of a kind of call."""
+        with self._latencies_lock:
+            tracker = self._latencies.get(kind)
+            if tracker is None:
+                tracker = LatencyTracker()
+                self._latencies[kind] = tracker
+            return tracker
+
+    def timeout(self, kind: str = None) -> float:
+        """Returns the current timeout for a call of the given kind in seconds."""
+        latency = self.latency_for(kind)
+        if len(latency) < self.min_samples:
+            return self.default_timeout
+        adaptive = latency.percentile(0.95) * self.timeout_multiplier
+        return min(max(adaptive, self.min_timeout), self.default_timeout)
+
+    def hedge_delay(self, kind: str = None) -> float | None:
+        """Returns how long to wait before hedging, or None if hedging is off."""
+        latency = self.latency_for(kind)
+        if len(latency) < self.min_samples:
+            return None
+        with self._stats_lock:
+            if self._stats["hedges"] >= self.hedge_budget * self._stats["calls"]:
+                return None
+        return latency.percentile(0.95)
+
+    def call(
+        self,
+        fn: Callable[[float], object],
+        hedge: bool = False,
+        enforce_timeout: bool = False,
+        ignore: Tuple[type, ...] = (),
+        kind: str = None,
+    ):
+        """
+        Calls the upstream through the circuit breaker.
+
+        Args:
+            fn: Makes the request, given the timeout in seconds to apply to it.
+            hedge: Whether the request is idempotent and may be duplicated.
+            enforce_timeout: Whether to stop waiting after the timeout even if
+                fn does not apply it itself, e.g. for clients without a
+                timeout option. The abandoned request finishes in the background.
+            ignore: Exception types that do not indicate an unhealthy upstream,
+                such as a "not found" response.
+            kind: The kind of call, for its own latency statistics and timeout.
+
+        Returns:
+            The return value of fn.
+
+        Raises:
+            CircuitOpenError: If the circuit breaker is open.
+            UpstreamTimeoutError: If the call timed out.
+        """
+        if not self.breaker.allow():
+            self._count("rejected")
+            raise CircuitOpenError(f"The {self.name} circuit breaker is open")
+
+        self._count("calls")
+        latency = self.latency_for(kind)
+        timeout = self.timeout(kind)
+        started = time.monotonic()
+        try:
+            if hedge or enforce_timeout:
+                result = self._call_in_pool(fn, timeout, hedge, kind)
+            else:
+                result = fn(timeout)
+        except ignore:
+            self.breaker.record_success()
+            raise
+        except Exception as e:
+            self._count("failures")
+            if is_timeout(e):
+                self._count("timeouts")
+                latency.record(time.monotonic() - started)
+            self.breaker.record_failure()
+            raise
+
+        latency.record(time.monotonic() - started)
+        self.breaker.record_success()
+        return result
+
+    def _call_in_pool(self, fn, timeout, hedge, kind=None):
+        started = time.monotonic()
+        primary = self._executor.submit(fn, timeout)
+        futures = {primary}
+        deadline = started + timeout
+
+        hedge_delay = self.hedge_delay(kind) if hedge else None
+        if hedge_delay is not None and hedge_delay < timeout:
+            done, _ = wait(futures, timeout=hedge_delay)
+            if not done:
+                self._count("hedges")
+                futures.add(self._executor.submit(fn, timeout))
+                # The hedge gets its own full timeout
+                deadline = time.monotonic() + timeout
+
+        error = None
+        while futures:
+            done, futures = wait(
+                futures,
+                timeout=max(deadline - time.monotonic(), 0),
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                raise UpstreamTimeoutError(
+                    f"{self.name} did not answer within {timeout:.1f}s"
+                )
+            for future in done:
+                if future.exception() is None:
+                    if future is not primary:
+                        self._count("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    def stats(self) -> dict:
+        """Returns call counts, latency percentiles and the breaker state."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        with self._latencies_lock:
+            kinds = [kind for kind in self._latencies if kind is not None]
+        result = {
+            **stats,
+            "p50_ms": round(self.latency.percentile(0.5) * 1000, 1),
+            "p95_ms": round(self.latency.percentile(0.95) * 1000, 1),
+            "timeout_s": round(self.timeout(), 3),
+            "circuit": self.breaker.state,
+        }
+        if kinds:
+            result["kinds"] = {
+                kind: {
+                    "samples": len(self.latency_for(kind)),
+                    "p50_ms": round(self.latency_for(kind).percentile(0.5) * 1000, 1),
+                    "p95_ms": round(self.latency_for(kind).percentile(0.95) * 1000, 1),
+                    "timeout_s": round(self.timeout(kind), 3),
+                }
+                for kind in kinds
+            }
+        return result
+
+
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(name: str) -> Upstream:
+    """
+    Returns the current app's guard for an upstream, configured from
+    <NAME>_TIMEOUT, UPSTREAM_* and CIRCUIT_* config values.
+    """
+    from flask import current_app
+
+    upstreams = current_app.extensions.setdefault("upstreams", {})
+    with _upstreams_lock:
+        upstream = upstreams.get(name)
+        if upstream is None:
+            config = current_app.config
+            upstream = Upstream(
+                name,
+                default_timeout=config.get(
+                    f"{name.upper()}_TIMEOUT", DEFAULT_TIMEOUTS.get(name, 30.0)
+                ),
+                min_timeout=config.get("UPSTREAM_MIN_TIMEOUT", 1.0),
+                timeout_multiplier=config.get("UPSTREAM_TIMEOUT_MULTIPLIER", 3.0),
+                min_samples=config.get("UPSTREAM_MIN_SAMPLES", 20),
+                hedge_budget=config.get("UPSTREAM_HEDGE_BUDGET", 0.1),
+                breaker=CircuitBreaker(
+                    failure_threshold=config.get("CIRCUIT_FAILURE_THRESHOLD", 5),
+                    reset_timeout=config.get("CIRCUIT_RESET_TIMEOUT", 30.0),
+                ),
+            )
+            upstreams[name] = upstream
+    return upstream
+
+
+def upstream_stats() -> dict:
+    """Returns the stats of the current app's upstreams, by name."""
+    from flask import current_app
+
+    upstreams = dict(current_app.extensions.get("upstreams", {}))
+    return {name: upstream.stats() for name, upstream in upstreams.items()}
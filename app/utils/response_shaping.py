@@ -0,0 +1,147 @@
+import math
+import re
+
+PMID_PATTERN = re.compile(r"pubmed\.ncbi\.nlm\.nih\.gov/(\d+)")
+
+# Fields whose values are maps of entries; projections apply to each entry
+MAP_FIELDS = {"verification_results", "articles"}
+
+
+def pmid_from_url(url: str) -> str | None:
+    """
+    Extracts the PMID from a PubMed article URL.
+    """
+    match = PMID_PATTERN.search(url or "")
+    return match.group(1) if match else None
+
+
+def normalize_articles(report: dict) -> dict:
+    """
+    Moves PubMed articles out of the verification results into one map.
+
+    Each verification result gets a list of PMIDs in ``pubmed_ids`` instead of
+    its ``pubmed_results``, and the articles are stored once under the
+    report's ``articles`` key, so articles shared between claims are sent once.
+
+    Args:
+        report: The influencer report.
+
+    Returns:
+        A new report with normalized articles.
+    """
+    articles = {}
+    verification_results = {}
+
+    for claim, result in (report.get("verification_results") or {}).items():
+        result = dict(result)
+        pubmed_ids = []
+        for article in result.pop("pubmed_results", None) or []:
+            pmid = pmid_from_url(article.get("url")) or article.get("url", "")
+            articles.setdefault(pmid, article)
+            pubmed_ids.append(pmid)
+        result["pubmed_ids"] = pubmed_ids
+        verification_results[claim] = result
+
+    return dict(report, verification_results=verification_results, articles=articles)
+
+
+def paginate_claims(report: dict, page: int, per_page: int) -> dict:
+    """
+    Keeps one page of the report's verification results.
+
+    Args:
+        report: The influencer report.
+        page: The 1-based page number.
+        per_page: The number of claims per page.
+
+    Returns:
+        A new report with the page of claims and a ``pagination`` summary.
+    """
+    items = list((report.get("verification_results") or {}).items())
+    start = (page - 1) * per_page
+
+    return dict(
+        report,
+        verification_results=dict(items[start : start + per_page]),
+        pagination={
+            "page": page,
+            "per_page": per_page,
+            "total": len(items),
+            "pages": math.ceil(len(items) / per_page) if per_page else 0,
+        },
+    )
+
+
+def parse_fields(fields: str) -> dict:
+    """
+    Parses a comma-separated list of dotted field paths into a tree.
+
+    ``"username,verification_results.verification_status"`` becomes
+    ``{"username": {}, "verification_results": {"verification_status": {}}}``,
+    where an empty subtree means the whole field is kept.
+    """
+    tree = {}
+    for path in fields.split(","):
+        path = path.strip()
+        if not path:
+            continue
+        node = tree
+        for part in path.split("."):
+            node = node.setdefault(part, {})
+    return tree
+
+
+def project(data, tree: dict, is_map: bool = False):
+    """
+    Keeps only the fields of data selected by a tree from parse_fields.
+
+    Args:
+        data: The value to project.
+        tree: The selected fields; an empty tree keeps everything.
+        is_map: Whether data maps arbitrary keys to entries to project.
+
+    Returns:
+        The projected value.
+    """
+    if not tree or not isinstance(data, dict):
+        return data
+    if is_map:
+        return {key: project(value, tree) for key, value in data.items()}
+    return {
+        key: project(data[key], subtree, key in MAP_FIELDS)
+        for key, subtree in tree.items()
+        if key in data
+    }
+
+
+def shape_report(
+    report: dict,
+    fields: str = None,
+    page: int = None,
+    per_page: int = 50,
+    normalize: bool = True,
+) -> dict:
+    """
+    Applies pagination, article normalization and field projection to a report.
+
+    Args:
+        report: The influencer report.
+        fields: A comma-separated list of dotted field paths to keep.
+        page: The 1-based page of claims to return, or None for all claims.
+        per_page: The number of claims per page.
+        normalize: Whether to move articles into a separate map by PMID.
+
+    Returns:
+        The shaped report.
+    """
+    if page is not None:
+        report = paginate_claims(report, page, per_page)
+    if normalize:
+        report = normalize_articles(report)
+    if fields:
+        tree = parse_fields(fields)
+        # Keep the pagination summary whenever a page was requested
+        if page is not None:
+            tree.setdefault("pagination", {})
+        report = project(report, tree)
+    return report
@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import closing
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key within one process.
+
+    The first caller for a key runs the function. Callers that arrive while it
+    is still running wait for the same result (or exception) instead of
+    running the function again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        """
+        Runs fn unless a call with the same key is already in flight.
+
+        Args:
+            key: The key identifying equivalent calls.
+            fn: The function to run, called without arguments.
+
+        Returns:
+            A (result, shared) tuple, where shared is True if the result came
+            from another caller's in-flight call.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+        return future.result(), False
+
+    def in_flight(self) -> int:
+        """Returns the number of keys currently being computed."""
+        with self._lock:
+            return len(self._calls)
+
+
+class LeaseStore:
+    """
+    Time-limited exclusive leases shared between processes through SQLite.
+
+    A lease that is not released before its TTL expires (e.g. because the
+    holding process died) can be taken over by another process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._token = uuid.uuid4().hex[:8]
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        with self._connect() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS leases (
+                    key TEXT PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+                """)
+
+    @property
+    def owner(self) -> str:
+        # Includes the pid so processes forked after creation are distinct owners
+        return f"{os.getpid()}-{self._token}"
+
+    def _connect(self):
+        # A connection per call keeps the store safe to share between threads
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return closing(connection)
+
+    def acquire(self, key: str, ttl: float) -> bool:
+        """
+        Takes the lease for a key if it is free or expired.
+
+        Args:
+            key: The key to lease.
+            ttl: The number of seconds before the lease expires.
+
+        Returns:
+            True if this process now holds the lease.
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            row = connection.execute(
+                "SELECT owner, expires_at FROM leases WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[0] != self.owner and row[1] > now:
+                connection.execute("ROLLBACK")
+                return False
+            connection.execute(
+                "INSERT OR REPLACE INTO leases VALUES (?, ?, ?)",
+                (key, self.owner, now + ttl),
+            )
+            connection.execute("COMMIT")
+            return True
+
+    def release(self, key: str):
+        """Gives up the lease for a key if this process holds it."""
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner)
+            )
+
+    def is_held(self, key: str) -> bool:
+        """Returns True if any process holds an unexpired lease for the key."""
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT expires_at FROM leases WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None and row[0] > time.time()
@@ -0,0 +1,73 @@
+import re
+import subprocess
+import sys
+
+IMPORT_TIME_PATTERN = re.compile(
+    r"^import time:\s+(?P<self>\d+)\s+\|\s+(?P<cumulative>\d+)\s+\|(?P<indent>\s*)(?P<module>\S+)\s*$"
+)
+
+
+def profile_imports(target: str = "app.routes") -> list[dict]:
+    """
+    Measures the import time of every module pulled in by importing a target.
+
+    Runs a fresh interpreter with ``-X importtime`` so the numbers are not
+    skewed by modules already imported into the current process.
+
+    Args:
+        target: The dotted name of the module to import.
+
+    Returns:
+        A list of dictionaries with the module name, its own import time and
+        its cumulative import time (both in milliseconds), slowest first.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {target} failed:\n{result.stderr}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_TIME_PATTERN.match(line)
+        if not match:
+            continue
+        modules.append(
+            {
+                "module": match.group("module"),
+                "self_ms": int(match.group("self")) / 1000,
+                "cumulative_ms": int(match.group("cumulative")) / 1000,
+                "depth": len(match.group("indent")) // 2,
+            }
+        )
+
+    modules.sort(key=lambda module: module["cumulative_ms"], reverse=True)
+    return modules
+
+
+def format_report(modules: list[dict], limit: int = 25) -> str:
+    """
+    Formats the output of profile_imports as a plain-text table.
+
+    Args:
+        modules: The module timings returned by profile_imports.
+        limit: The maximum number of modules to include.
+
+    Returns:
+        The report as a string.
+    """
+    lines = [f"{'cumulative ms':>14} {'self ms':>10}  module"]
+    for module in modules[:limit]:
+        lines.append(
+            f"{module['cumulative_ms']:>14.1f} {module['self_ms']:>10.1f}  {module['module']}"
+        )
+    return "\n".join(lines)
+
+
+# Example usage: python -m app.utils.startup_profile [module] [limit]
+if __name__ == "__main__":
+    target = sys.argv[1] if len(sys.argv) > 1 else "app.routes"
+    limit = int(sys.argv[2]) if len(sys.argv) > 2 else 25
+    print(format_report(profile_imports(target), limit))
@@ -0,0 +1,206 @@
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from dataclasses import dataclass
+from typing import List, Optional
+
+
+@dataclass
+class Task:
+    id: int
+    job_id: str
+    username: str
+    details: bool
+    attempts: int
+
+
+class TaskQueue:
+    """
+    A durable work queue shared between the processes of one machine through
+    SQLite.
+
+    The database is in WAL mode, which relies on shared memory, so the file
+    must be on a local filesystem and cannot be shared between machines over
+    a network filesystem.
+
+    Workers claim a task with a lease. A task whose worker dies is claimed
+    again once the lease expires, and a failed task is retried until it has
+    been attempted max_attempts times.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        with self._connect() as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    job_id TEXT NOT NULL,
+                    username TEXT NOT NULL,
+                    details INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    lease_expires REAL,
+                    result TEXT,
+                    error TEXT,
+                    updated_at REAL NOT NULL
+                )
+                """)
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, job_id)"
+            )
+
+    def _connect(self):
+        # A connection per call keeps the queue safe to share between threads
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return closing(connection)
+
+    def enqueue(self, job_id: str, usernames: List[str], details: bool = False):
+        """Adds one task per influencer to a job."""
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany(
+                "INSERT INTO tasks (job_id, username, details, status, updated_at) "
+                "VALUES (?, ?, ?, 'pending', ?)",
+                [(job_id, username, int(details), now) for username in usernames],
+            )
+            connection.execute("COMMIT")
+
+    def claim(
+        self,
+        worker: str,
+        lease_ttl: float,
+        max_attempts: int = 3,
+        job_id: str = None,
+    ) -> Optional[Task]:
+        """
+        Claims the oldest pending task, or a running task whose lease expired.
+
+        Args:
+            worker: Identifies the claiming worker.
+            lease_ttl: Seconds before the task can be claimed by another worker.
+            max_attempts: Expired tasks that reached this many attempts fail instead.
+            job_id: Only claims tasks of this job, if given.
+
+        Returns:
+            The claimed Task, or None if there is nothing to do.
+        """
+        now = time.time()
+        with self._connect() as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            connection.execute(
+                "UPDATE tasks SET status = 'failed', error = 'Lease expired', "
+                "updated_at = ? WHERE status = 'running' AND lease_expires < ? "
+                "AND attempts >= ?",
+                (now, now, max_attempts),
+            )
+            row = connection.execute(
+                "SELECT id, job_id, username, details, attempts FROM tasks "
+                "WHERE (status = 'pending' "
+                "OR (status = 'running' AND lease_expires < ?)) "
+                "AND (? IS NULL OR job_id = ?) "
+                "ORDER BY id LIMIT 1",
+                (now, job_id, job_id),
+            ).fetchone()
+            if row is None:
+                connection.execute("COMMIT")
+                return None
+            connection.execute(
+                "UPDATE tasks SET status = 'running', attempts = attempts + 1, "
+                "worker = ?, lease_expires = ?, updated_at = ? WHERE id = ?",
+                (worker, now + lease_ttl, now, row[0]),
+            )
+            connection.execute("COMMIT")
+        return Task(
+            id=row[0],
+            job_id=row[1],
+            username=row[2],
+            details=bool(row[3]),
+            attempts=row[4] + 1,
+        )
+
+    def complete(self, task_id: int, worker: str, result: dict) -> bool:
+        """
+        Stores the result of a task still held by the worker.
+
+        Returns:
+            False if the worker's lease expired and the task was claimed again
+            or finished by another worker, in which case nothing is changed.
+        """
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE tasks SET status = 'done', result = ?, error = NULL, "
+                "lease_expires = NULL, updated_at = ? "
+                "WHERE id = ? AND worker = ? AND status = 'running'",
+                (json.dumps(result), time.time(), task_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def fail(
+        self, task_id: int, worker: str, error: str, max_attempts: int = 3
+    ) -> bool:
+        """
+        Returns a failed task still held by the worker to the queue, or fails
+        it for good.
+
+        Returns:
+            False if the worker no longer holds the task, as in complete.
+        """
+        with self._connect() as connection:
+            cursor = connection.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' "
+                "ELSE 'pending' END, error = ?, lease_expires = NULL, "
+                "updated_at = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (max_attempts, error, time.time(), task_id, worker),
+            )
+        return cursor.rowcount == 1
+
+    def counts(self, job_id: str = None) -> dict:
+        """Returns the number of tasks per status, for one job or all of them."""
+        query = "SELECT status, COUNT(*) FROM tasks"
+        params = ()
+        if job_id is not None:
+            query += " WHERE job_id = ?"
+            params = (job_id,)
+        with self._connect() as connection:
+            rows = connection.execute(query + " GROUP BY status", params).fetchall()
+        return {"pending": 0, "running": 0, "done": 0, "failed": 0, **dict(rows)}
+
+    def unfinished(self, job_id: str = None) -> int:
+        """Returns the number of pending and running tasks."""
+        counts = self.counts(job_id)
+        return counts["pending"] + counts["running"]
+
+    def results(self, job_id: str) -> dict:
+        """
+        Returns a job's results ordered by username, so the merged output does
+        not depend on which worker finished first.
+
+        Returns:
+            A dictionary with the "results" of completed tasks and the
+            "failed" tasks with their last error.
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT username, status, result, error, attempts FROM tasks "
+                "WHERE job_id = ? AND status IN ('done', 'failed') "
+                "ORDER BY username, id",
+                (job_id,),
+            ).fetchall()
+        return {
+            "results": [json.loads(row[2]) for row in rows if row[1] == "done"],
+            "failed": [
+                {"username": row[0], "error": row[3], "attempts": row[4]}
+                for row in rows
+                if row[1] == "failed"
+            ],
+        }
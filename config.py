@@ -12,4 +12,125 @@ class Config:
     TWITTER_API_KEY = os.environ.get("TWITTER_API_KEY")
     TWITTER_API_SECRET = os.environ.get("TWITTER_API_SECRET")
     TWITTER_BEARER_TOKEN = os.environ.get("TWITTER_BEARER_TOKEN")
+    TWITTER_API_BASE_URL = os.environ.get(
+        "TWITTER_API_BASE_URL", "https://api.twitter.com"
+    )
+    # Load the heavy models in create_app instead of on first use. Enable this
+    # for pre-forking servers (e.g. gunicorn --preload) so workers share them.
+    PRELOAD_MODELS = os.environ.get("PRELOAD_MODELS", "false").lower() == "true"
+    # SQLite file caching parsed LLM extraction responses (empty to disable)
+    EXTRACTION_CACHE_PATH = os.environ.get(
+        "EXTRACTION_CACHE_PATH", "data/extraction_cache.sqlite3"
+    )
+    # Verify related claims together, one LLM call per cluster of up to
+    # VERIFICATION_BATCH_SIZE claims sharing the same PubMed articles
+    BATCH_VERIFICATION = os.environ.get("BATCH_VERIFICATION", "false").lower() == "true"
+    VERIFICATION_BATCH_SIZE = int(os.environ.get("VERIFICATION_BATCH_SIZE", "5"))
+    # Ask for the verification status first and only generate the explanation
+    # when its confidence is below STATUS_CONFIDENCE_THRESHOLD or on ?details=true
+    TWO_PHASE_VERIFICATION = (
+        os.environ.get("TWO_PHASE_VERIFICATION", "false").lower() == "true"
+    )
+    STATUS_CONFIDENCE_THRESHOLD = float(
+        os.environ.get("STATUS_CONFIDENCE_THRESHOLD", "0.8")
+    )
+    # Persistence of influencers, claims, verifications, scores and reports
+    STORAGE_BACKEND = os.environ.get("STORAGE_BACKEND", "sqlite")
+    STORAGE_PATH = os.environ.get("STORAGE_PATH", "data/verify_influencers.sqlite3")
+    # Seconds before a stored report is refreshed in the background
+    REPORT_MAX_AGE = int(os.environ.get("REPORT_MAX_AGE", "3600"))
+    # PubMed E-utilities access; searches for all claims are batched together
+    PUBMED_EMAIL = os.environ.get("PUBMED_EMAIL", "sergiorobayoro@example.com")
+    NCBI_API_KEY = os.environ.get("NCBI_API_KEY")
+    PUBMED_BASE_URL = os.environ.get(
+        "PUBMED_BASE_URL", "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+    )
+    # Seconds between NCBI requests (defaults to NCBI's published rate limits)
+    PUBMED_MIN_INTERVAL = (
+        float(os.environ["PUBMED_MIN_INTERVAL"])
+        if os.environ.get("PUBMED_MIN_INTERVAL")
+        else None
+    )
+    PUBMED_BATCH_SEARCH = (
+        os.environ.get("PUBMED_BATCH_SEARCH", "true").lower() == "true"
+    )
+    # Coalesce concurrent sentence embedding requests into batched encode calls
+    EMBEDDING_BATCHING = os.environ.get("EMBEDDING_BATCHING", "true").lower() == "true"
+    EMBEDDING_MAX_BATCH_SIZE = int(os.environ.get("EMBEDDING_MAX_BATCH_SIZE", "64"))
+    EMBEDDING_MAX_WAIT_MS = float(os.environ.get("EMBEDDING_MAX_WAIT_MS", "5"))
+    # SQLite file of leases that stop worker processes from analyzing the same
+    # influencer at the same time (empty to coalesce within a process only)
+    ANALYSIS_LEASE_PATH = os.environ.get("ANALYSIS_LEASE_PATH", "data/leases.sqlite3")
+    ANALYSIS_LEASE_TTL = int(os.environ.get("ANALYSIS_LEASE_TTL", "600"))
+    # How often and how long (in seconds) a request waits for another worker's
+    # analysis; keep the wait below the server's request timeout
+    ANALYSIS_LEASE_POLL_INTERVAL = float(
+        os.environ.get("ANALYSIS_LEASE_POLL_INTERVAL", "0.5")
+    )
+    ANALYSIS_LEASE_WAIT_TIMEOUT = float(
+        os.environ.get("ANALYSIS_LEASE_WAIT_TIMEOUT", "25")
+    )
+    # Report responses: send PubMed articles once in a map keyed by PMID, and
+    # compress bodies larger than COMPRESS_MIN_SIZE bytes with brotli or gzip
+    NORMALIZE_ARTICLES = os.environ.get("NORMALIZE_ARTICLES", "true").lower() == "true"
+    COMPRESS_RESPONSES = os.environ.get("COMPRESS_RESPONSES", "true").lower() == "true"
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", "1024"))
+    # Comma-separated ollama models, smallest first. Each call escalates to the
+    # next model on invalid output, a confidence within CASCADE_CONFIDENCE_MARGIN
+    # of the extraction cutoff, a status confidence below
+    # CASCADE_MIN_STATUS_CONFIDENCE, or a verdict backed only by articles less
+    # similar than CASCADE_SIMILARITY_FLOOR. Empty means llama3.2:3b only.
+    MODEL_CASCADE = os.environ.get("MODEL_CASCADE", "")
+    CASCADE_CONFIDENCE_MARGIN = float(
+        os.environ.get("CASCADE_CONFIDENCE_MARGIN", "0.1")
+    )
+    CASCADE_MIN_STATUS_CONFIDENCE = float(
+        os.environ.get("CASCADE_MIN_STATUS_CONFIDENCE", "0.6")
+    )
+    CASCADE_SIMILARITY_FLOOR = float(os.environ.get("CASCADE_SIMILARITY_FLOOR", "0.3"))
+    # SQLite file of the cross-influencer canonical claim index (empty to disable).
+    # Claims join the nearest canonical claim at CLAIM_INDEX_THRESHOLD cosine
+    # similarity, and verifications are reused per canonical claim for
+    # CLAIM_VERIFICATION_MAX_AGE seconds.
+    CLAIM_INDEX_PATH = os.environ.get("CLAIM_INDEX_PATH", "data/claim_index.sqlite3")
+    CLAIM_INDEX_THRESHOLD = float(os.environ.get("CLAIM_INDEX_THRESHOLD", "0.8"))
+    CLAIM_VERIFICATION_MAX_AGE = int(
+        os.environ.get("CLAIM_VERIFICATION_MAX_AGE", "604800")
+    )
+    # Streaming timeline analysis: items in flight between pipeline stages,
+    # claims verified and persisted per batch, and tweets read per influencer
+    STREAM_BUFFER_SIZE = int(os.environ.get("STREAM_BUFFER_SIZE", "32"))
+    STREAM_VERIFICATION_BATCH_SIZE = int(
+        os.environ.get("STREAM_VERIFICATION_BATCH_SIZE", "10")
+    )
+    STREAM_MAX_TWEETS = int(os.environ.get("STREAM_MAX_TWEETS", "3200"))
+    # Bulk scoring workers (python -m app.services.bulk_scoring): seconds before a
+    # task held by a dead worker is retried, attempts before a task fails, and
+    # seconds between polls of an empty queue
+    BULK_TASK_LEASE_TTL = int(os.environ.get("BULK_TASK_LEASE_TTL", "900"))
+    BULK_MAX_ATTEMPTS = int(os.environ.get("BULK_MAX_ATTEMPTS", "3"))
+    BULK_POLL_INTERVAL = float(os.environ.get("BULK_POLL_INTERVAL", "1.0"))
+    # Upstream timeouts in seconds. Once UPSTREAM_MIN_SAMPLES calls are timed,
+    # each becomes UPSTREAM_TIMEOUT_MULTIPLIER x the observed p95 latency, within
+    # [UPSTREAM_MIN_TIMEOUT, <NAME>_TIMEOUT]. Slow idempotent reads are hedged
+    # after the p95 latency, for at most UPSTREAM_HEDGE_BUDGET of the calls.
+    OLLAMA_TIMEOUT = float(os.environ.get("OLLAMA_TIMEOUT", "120"))
+    PUBMED_TIMEOUT = float(os.environ.get("PUBMED_TIMEOUT", "15"))
+    TWITTER_TIMEOUT = float(os.environ.get("TWITTER_TIMEOUT", "15"))
+    UPSTREAM_MIN_TIMEOUT = float(os.environ.get("UPSTREAM_MIN_TIMEOUT", "1.0"))
+    UPSTREAM_TIMEOUT_MULTIPLIER = float(
+        os.environ.get("UPSTREAM_TIMEOUT_MULTIPLIER", "3.0")
+    )
+    UPSTREAM_MIN_SAMPLES = int(os.environ.get("UPSTREAM_MIN_SAMPLES", "20"))
+    UPSTREAM_HEDGE_BUDGET = float(os.environ.get("UPSTREAM_HEDGE_BUDGET", "0.1"))
+    # Consecutive failures that open an upstream's circuit breaker, and seconds
+    # before a trial call is let through again
+    CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get("CIRCUIT_FAILURE_THRESHOLD", "5"))
+    CIRCUIT_RESET_TIMEOUT = float(os.environ.get("CIRCUIT_RESET_TIMEOUT", "30"))
+    # Seconds between reloads of the leaderboard from storage, to pick up
+    # scores written by other processes, and its confidence interval level
+    LEADERBOARD_RELOAD_INTERVAL = float(
+        os.environ.get("LEADERBOARD_RELOAD_INTERVAL", "300")
+    )
+    LEADERBOARD_CONFIDENCE = float(os.environ.get("LEADERBOARD_CONFIDENCE", "0.95"))
     # Add other configuration variables as needed
@@ -0,0 +1,336 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+HEALTH_TWEETS = [
+    "Getting 15 minutes of morning sunlight boosts vitamin D and improves sleep.",
+    "Cold showers increase dopamine levels by 250% for hours.",
+    "Intermittent fasting improves insulin sensitivity in most adults.",
+    "Regular exercise reduces the risk of heart disease by 30%.",
+    "Seed oils are the main cause of chronic inflammation.",
+    "Magnesium before bed helps you fall asleep faster.",
+    "Just finished a great podcast episode, link in bio!",
+    "Creatine supplementation improves memory in older adults.",
+    "Blue light from screens at night disrupts melatonin production.",
+    "Great weather for a hike today.",
+]
+
+
+@dataclass
+class LatencyModel:
+    """
+    A latency distribution, parsed from specs such as ``fixed:50``,
+    ``uniform:10:100``, ``exponential:200`` or ``lognormal:800:0.5``
+    (milliseconds; the lognormal takes the median and sigma).
+    """
+
+    kind: str = "fixed"
+    params: tuple = (0.0,)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        kind, *params = spec.split(":")
+        return cls(kind, tuple(float(param) for param in params))
+
+    def sample(self, rng: random.Random) -> float:
+        """Returns a latency in seconds."""
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(self.params[0], self.params[1])
+        elif self.kind == "exponential":
+            ms = rng.expovariate(1 / self.params[0]) if self.params[0] else 0.0
+        elif self.kind == "lognormal":
+            median, sigma = self.params
+            ms = rng.lognormvariate(0, sigma) * median
+        else:
+            raise ValueError(f"Unknown latency distribution: {self.kind}")
+        return max(ms, 0.0) / 1000
+
+
+@dataclass
+class UpstreamBehavior:
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    error_rate: float = 0.0  # Fraction of requests answered with a 500
+    rate_limit_rate: float = 0.0  # Fraction of requests answered with a 429
+    seed: int = None
+
+
+class FakeUpstream:
+    """
+    Base class for a fake HTTP upstream running on a background thread.
+
+    Subclasses implement handle(method, path, query, body) and return a
+    (status, content_type, body_bytes) tuple.
+    """
+
+    name = "upstream"
+
+    def __init__(self, behavior: UpstreamBehavior = None, port: int = 0):
+        self.behavior = behavior or UpstreamBehavior()
+        self._rng = random.Random(self.behavior.seed)
+        self._rng_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.stats = {"requests": 0, "errors": 0, "rate_limited": 0}
+
+        upstream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes; avoid delayed-ACK stalls
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                upstream._serve(self, "GET")
+
+            def do_POST(self):
+                upstream._serve(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeUpstream":
+        self._thread = threading.Thread(
+            target=self.server.serve_forever, name=f"fake-{self.name}", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _serve(self, request, method):
+        length = int(request.headers.get("Content-Length") or 0)
+        body = request.rfile.read(length) if length else b""
+        parsed = urlparse(request.path)
+
+        with self._rng_lock:
+            delay = self.behavior.latency.sample(self._rng)
+            roll = self._rng.random()
+        time.sleep(delay)
+
+        with self._stats_lock:
+            self.stats["requests"] += 1
+
+        if roll < self.behavior.rate_limit_rate:
+            with self._stats_lock:
+                self.stats["rate_limited"] += 1
+            status, content_type, payload = (
+                429,
+                "application/json",
+                json.dumps({"error": "Too Many Requests"}).encode(),
+            )
+            extra_headers = {
+                "Retry-After": "1",
+                "x-rate-limit-reset": str(int(time.time()) + 1),
+            }
+        elif roll < self.behavior.rate_limit_rate + self.behavior.error_rate:
+            with self._stats_lock:
+                self.stats["errors"] += 1
+            status, content_type, payload = (
+                500,
+                "application/json",
+                json.dumps({"error": "Internal Server Error"}).encode(),
+            )
+            extra_headers = {}
+        else:
+            try:
+                status, content_type, payload = self.handle(
+                    method, parsed.path, parse_qs(parsed.query), body
+                )
+            except Exception as e:
+                status, content_type, payload = (
+                    500,
+                    "application/json",
+                    json.dumps({"error": str(e)}).encode(),
+                )
+            extra_headers = {}
+
+        request.send_response(status)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(payload)))
+        for name, value in extra_headers.items():
+            request.send_header(name, value)
+        request.end_headers()
+        request.wfile.write(payload)
+
+    def handle(self, method, path, query, body):
+        raise NotImplementedError
+
+
+def sample_from_schema(schema: dict, root: dict = None, array_length: int = 1):
+    """
+    Builds a small instance that validates against a JSON schema, as produced
+    by pydantic's model_json_schema().
+    """
+    root = root or schema
+    if "$ref" in schema:
+        name = schema["$ref"].split("/")[-1]
+        return sample_from_schema(root["$defs"][name], root, array_length)
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "anyOf" in schema:
+        return sample_from_schema(schema["anyOf"][0], root, array_length)
+
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            name: sample_from_schema(prop, root, array_length)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [
+            sample_from_schema(schema.get("items", {}), root)
+            for _ in range(array_length)
+        ]
+    if kind == "number":
+        return 0.9
+    if kind == "integer":
+        return 1
+    if kind == "boolean":
+        return True
+    if kind == "string":
+        return "Simulated response"
+    return None
+
+
+class FakeOllama(FakeUpstream):
+    """Answers POST /api/chat with a schema-conforming structured response."""
+
+    name = "ollama"
+
+    def handle(self, method, path, query, body):
+        if path != "/api/chat":
+            return 404, "application/json", b'{"error": "not found"}'
+
+        request = json.loads(body or b"{}")
+        prompt = " ".join(
+            message.get("content", "") for message in request.get("messages", [])
+        )
+        schema = request.get("format")
+
+        if isinstance(schema, dict):
+            # Batched verification prompts number their claims
+            claims = len(re.findall(r"Claim \d+:", prompt)) or 1
+            content = sample_from_schema(schema, array_length=claims)
+            # Extraction responses echo the tweet so claims differ between tweets
+            tweet = re.search(r"Tweet: (.*)", prompt)
+            if tweet and isinstance(content, dict) and "claims" in content:
+                for claim in content["claims"]:
+                    claim["claim"] = tweet.group(1).strip()
+            content = json.dumps(content)
+        else:
+            content = "Simulated response"
+
+        response = {
+            "model": request.get("model", "fake"),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "message": {"role": "assistant", "content": content},
+            "done": True,
+            "done_reason": "stop",
+        }
+        return 200, "application/json", json.dumps(response).encode()
+
+
+class FakeEutils(FakeUpstream):
+    """Answers ESearch (JSON) and EFetch (XML) requests for the pubmed database."""
+
+    name = "eutils"
+
+    def __init__(self, *args, pmid_pool: int = 500, **kwargs):
+        super().__init__(*args, **kwargs)
+        # A small pool makes different claims share articles, as real ones do
+        self.pmid_pool = pmid_pool
+
+    def handle(self, method, path, query, body):
+        if method == "POST":
+            query = {**query, **parse_qs(body.decode("utf-8"))}
+
+        if path.endswith("/esearch.fcgi"):
+            term = query.get("term", [""])[0]
+            retmax = int(query.get("retmax", ["5"])[0])
+            digest = int(hashlib.sha256(term.encode()).hexdigest(), 16)
+            ids = [
+                str(10_000_000 + (digest >> (i * 8)) % self.pmid_pool)
+                for i in range(retmax)
+            ]
+            payload = {"esearchresult": {"count": str(retmax), "idlist": ids}}
+            return 200, "application/json", json.dumps(payload).encode()
+
+        if path.endswith("/efetch.fcgi"):
+            ids = [pmid for pmid in query.get("id", [""])[0].split(",") if pmid]
+            articles = "".join(
+                f"<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article>"
+                f"<ArticleTitle>Simulated study {pmid}</ArticleTitle>"
+                "<Abstract><AbstractText>Participants who followed the "
+                "intervention showed moderate improvements in health outcomes "
+                "compared with controls.</AbstractText></Abstract>"
+                "</Article></MedlineCitation></PubmedArticle>"
+                for pmid in ids
+            )
+            xml = (
+                f'<?xml version="1.0" ?><PubmedArticleSet>{articles}</PubmedArticleSet>'
+            )
+            return 200, "text/xml", xml.encode()
+
+        return 404, "text/plain", b"not found"
+
+
+class FakeTwitter(FakeUpstream):
+    """Answers the Twitter v2 user lookup and user timeline endpoints."""
+
+    name = "twitter"
+
+    def handle(self, method, path, query, body):
+        match = re.fullmatch(r"/2/users/by/username/([^/]+)", path)
+        if match:
+            username = match.group(1)
+            user_id = str(int(hashlib.sha256(username.encode()).hexdigest()[:12], 16))
+            payload = {
+                "data": {
+                    "id": user_id,
+                    "name": username,
+                    "username": username,
+                    "profile_image_url": f"https://example.com/{username}.png",
+                    "public_metrics": {
+                        "followers_count": int(user_id) % 1_000_000,
+                        "following_count": 100,
+                        "tweet_count": 1000,
+                        "listed_count": 10,
+                    },
+                }
+            }
+            return 200, "application/json", json.dumps(payload).encode()
+
+        match = re.fullmatch(r"/2/users/(\d+)/tweets", path)
+        if match:
+            user_id = int(match.group(1))
+            count = int(query.get("max_results", ["10"])[0])
+            tweets = [
+                {
+                    "id": str(user_id * 1000 + i),
+                    "text": HEALTH_TWEETS[(user_id + i) % len(HEALTH_TWEETS)],
+                    "edit_history_tweet_ids": [str(user_id * 1000 + i)],
+                }
+                for i in range(count)
+            ]
+            payload = {"data": tweets, "meta": {"result_count": len(tweets)}}
+            return 200, "application/json", json.dumps(payload).encode()
+
+        return 404, "application/json", b'{"title": "Not Found Error"}'
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List
+
+
+class WorkerPoolMiddleware:
+    """
+    WSGI middleware that limits the app to a fixed number of concurrent
+    requests, like a pool of server workers, and measures how busy it is.
+
+    Requests beyond the limit wait for a free worker. Saturation is the
+    time-weighted fraction of workers busy while the load test runs.
+    """
+
+    def __init__(self, app, workers: int):
+        self.app = app
+        self.workers = workers
+        self._slots = threading.Semaphore(workers)
+        self._lock = threading.Lock()
+        self._busy = 0
+        self._waiting = 0
+        self.peak_waiting = 0
+        self._busy_time = 0.0  # Integral of busy workers over time
+        self._last_change = time.monotonic()
+        self._started = self._last_change
+
+    def _record(self, busy_delta=0, waiting_delta=0):
+        with self._lock:
+            now = time.monotonic()
+            self._busy_time += self._busy * (now - self._last_change)
+            self._last_change = now
+            self._busy += busy_delta
+            self._waiting += waiting_delta
+            self.peak_waiting = max(self.peak_waiting, self._waiting)
+
+    def reset(self):
+        with self._lock:
+            self._busy_time = 0.0
+            self._started = self._last_change = time.monotonic()
+            self.peak_waiting = self._waiting
+
+    def saturation(self) -> float:
+        self._record()
+        with self._lock:
+            elapsed = self._last_change - self._started
+            return self._busy_time / (elapsed * self.workers) if elapsed else 0.0
+
+    def __call__(self, environ, start_response):
+        self._record(waiting_delta=1)
+        self._slots.acquire()
+        self._record(busy_delta=1, waiting_delta=-1)
+        try:
+            # Materialize the body so the worker is held for the whole request
+            return list(self.app(environ, start_response))
+        finally:
+            self._record(busy_delta=-1)
+            self._slots.release()
+
+
+@dataclass
+class LoadTestResult:
+    duration: float
+    latencies: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    saturation: float = None
+    peak_queue: int = None
+
+    @property
+    def requests(self) -> int:
+        return sum(self.statuses.values())
+
+    def percentile(self, fraction: float) -> float:
+        if not self.latencies:
+            return 0.0
+        values = sorted(self.latencies)
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+    def summary(self) -> dict:
+        errors = sum(
+            count
+            for status, count in self.statuses.items()
+            if not isinstance(status, int) or status >= 400
+        )
+        return {
+            "requests": self.requests,
+            "duration_s": round(self.duration, 3),
+            "throughput_rps": (
+                round(self.requests / self.duration, 2) if self.duration else 0.0
+            ),
+            "latency_ms": {
+                "p50": round(self.percentile(0.50) * 1000, 1),
+                "p90": round(self.percentile(0.90) * 1000, 1),
+                "p95": round(self.percentile(0.95) * 1000, 1),
+                "p99": round(self.percentile(0.99) * 1000, 1),
+                "max": round(max(self.latencies, default=0.0) * 1000, 1),
+            },
+            "error_rate": round(errors / self.requests, 4) if self.requests else 0.0,
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "worker_saturation": (
+                round(self.saturation, 3) if self.saturation is not None else None
+            ),
+            "peak_queue": self.peak_queue,
+        }
+
+
+def run_load(
+    base_url: str,
+    paths: List[str],
+    concurrency: int = 8,
+    total_requests: int = 100,
+    timeout: float = 300,
+    pool: WorkerPoolMiddleware = None,
+) -> LoadTestResult:
+    """
+    Sends requests to the app from concurrent clients and records the outcome.
+
+    Args:
+        base_url: The base URL of the app under test.
+        paths: The request paths, used round-robin.
+        concurrency: The number of concurrent clients.
+        total_requests: The total number of requests to send.
+        timeout: The per-request timeout in seconds.
+        pool: The WorkerPoolMiddleware wrapping the app, for saturation stats.
+
+    Returns:
+        The LoadTestResult.
+    """
+    import requests
+
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+    result = LoadTestResult(duration=0.0)
+    local = threading.local()
+
+    def client():
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+
+        while True:
+            with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+
+            started = time.monotonic()
+            try:
+                response = session.get(
+                    base_url + paths[index % len(paths)], timeout=timeout
+                )
+                status = response.status_code
+            except requests.RequestException as e:
+                status = type(e).__name__
+            elapsed = time.monotonic() - started
+
+            with lock:
+                result.latencies.append(elapsed)
+                result.statuses[status] += 1
+
+    if pool is not None:
+        pool.reset()
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for _ in range(concurrency):
+            executor.submit(client)
+    result.duration = time.monotonic() - started
+
+    if pool is not None:
+        result.saturation = pool.saturation()
+        result.peak_queue = pool.peak_waiting
+    return result
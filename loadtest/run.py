@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import threading
+from werkzeug.serving import WSGIRequestHandler, make_server
+from loadtest.fake_upstreams import (
+    FakeEutils,
+    FakeOllama,
+    FakeTwitter,
+    LatencyModel,
+    UpstreamBehavior,
+)
+from loadtest.load_generator import WorkerPoolMiddleware, run_load
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def behavior(args, name) -> UpstreamBehavior:
+    return UpstreamBehavior(
+        latency=LatencyModel.parse(getattr(args, f"{name}_latency")),
+        error_rate=getattr(args, f"{name}_error_rate"),
+        rate_limit_rate=getattr(args, f"{name}_rate_limit_rate"),
+        seed=args.seed,
+    )
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Load-test the influencer endpoint against simulated upstreams."
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4, help="Simulated app workers")
+    parser.add_argument(
+        "--usernames", type=int, default=10, help="Distinct influencers"
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Bypass stored reports so every request runs the full analysis",
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--log-level", default="WARNING", help="App log level")
+
+    defaults = {
+        "ollama": "lognormal:800:0.5",
+        "eutils": "lognormal:300:0.4",
+        "twitter": "lognormal:150:0.3",
+    }
+    for name, latency in defaults.items():
+        parser.add_argument(f"--{name}-latency", default=latency)
+        parser.add_argument(f"--{name}-error-rate", type=float, default=0.0)
+        parser.add_argument(f"--{name}-rate-limit-rate", type=float, default=0.0)
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    ollama = FakeOllama(behavior(args, "ollama")).start()
+    eutils = FakeEutils(behavior(args, "eutils")).start()
+    twitter = FakeTwitter(behavior(args, "twitter")).start()
+
+    # ollama reads its host when first imported, which the app does lazily
+    os.environ["OLLAMA_HOST"] = ollama.url
+
+    from app import create_app
+    from config import Config
+
+    class LoadTestConfig(Config):
+        TWITTER_BEARER_TOKEN = "load-test"
+        TWITTER_API_BASE_URL = twitter.url
+        PUBMED_BASE_URL = eutils.url
+        PUBMED_MIN_INTERVAL = 0.0
+        STORAGE_BACKEND = "memory"
+        EXTRACTION_CACHE_PATH = ""
+        CLAIM_INDEX_PATH = ""
+        ANALYSIS_LEASE_PATH = ""
+
+    app = create_app(LoadTestConfig)
+    for handler in app.logger.handlers:
+        handler.setLevel(args.log_level)
+    pool = WorkerPoolMiddleware(app.wsgi_app, args.workers)
+    app.wsgi_app = pool
+
+    server = make_server(
+        "127.0.0.1", 0, app, threaded=True, request_handler=QuietRequestHandler
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    query = "?refresh=true" if args.refresh else ""
+    paths = [f"/api/influencer/loadtest_user_{i}{query}" for i in range(args.usernames)]
+
+    try:
+        result = run_load(
+            f"http://127.0.0.1:{server.server_port}",
+            paths,
+            concurrency=args.concurrency,
+            total_requests=args.requests,
+            pool=pool,
+        )
+    finally:
+        server.shutdown()
+        for upstream in (ollama, eutils, twitter):
+            upstream.stop()
+
+    report = result.summary()
+    report["upstreams"] = {
+        upstream.name: upstream.stats for upstream in (ollama, eutils, twitter)
+    }
+    print(json.dumps(report, indent=2))
+    return report
+
+
+# Example usage: python -m loadtest.run --concurrency 16 --requests 200 --refresh
+if __name__ == "__main__":
+    main()